@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -7,7 +8,9 @@ from galaxygen.config import DEFAULT_DISTRIBUTION
 
 
 class Settings(BaseSettings):
-    mongo_uri: str = Field(..., validation_alias="MONGO_URI")
+    storage_backend: str = Field("mongo", validation_alias="GALAXYGEN_STORAGE")
+    sqlite_path: Optional[Path] = Field(None, validation_alias="GALAXYGEN_SQLITE_PATH")
+    mongo_uri: Optional[str] = Field(None, validation_alias="MONGO_URI")
     mongo_db: str = Field("galaxygen", validation_alias="MONGO_DB")
     distribution_map: Path = DEFAULT_DISTRIBUTION
     render_output: Path = Path(__file__).resolve().parents[3] / "build" / "renders"
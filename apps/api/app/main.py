@@ -1,13 +1,33 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import os
+import time
+
+from galaxygen.backends import configure_backend
+from galaxygen.metrics import REGISTRY
 
 from .dependencies import get_settings
-from .routes import galaxy
+from .routes import galaxy, galaxy_async, galaxy_events, galaxy_graph, galaxy_territory, jobs
+from .services.jobs import job_manager
 
 settings = get_settings()
+if settings.storage_backend.lower() == "mongo" and not settings.mongo_uri:
+    raise RuntimeError("MONGO_URI is required when GALAXYGEN_STORAGE=mongo")
+backend = configure_backend(settings.storage_backend, path=settings.sqlite_path)
+
+
 
-app = FastAPI(title="Asarto API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Stop the job process pool (and its progress listener) with the app.
+    job_manager.shutdown()
+
+
+app = FastAPI(title="Asarto API", version="0.1.0", lifespan=lifespan)
 
 raw_origins = os.getenv("ASARTO_CORS_ORIGINS", "*")
 cors_origins = [origin.strip() for origin in raw_origins.split(",") if origin.strip()]
@@ -27,9 +47,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+REQUEST_SECONDS = REGISTRY.histogram(
+    "asarto_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template rather than raw path to keep cardinality bounded.
+    route = request.scope.get("route")
+    REQUEST_SECONDS.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=str(response.status_code),
+    )
+    return response
+
+
 app.include_router(galaxy.router)
+app.include_router(galaxy_async.router)
+app.include_router(galaxy_events.router)
+app.include_router(galaxy_graph.router)
+app.include_router(galaxy_territory.router)
+app.include_router(jobs.router)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "database": settings.mongo_db}
+    database = settings.mongo_db if backend.name == "mongo" else backend.path
+    return {"status": "ok", "storage": backend.name, "database": database}
@@ -1,21 +1,44 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional, Tuple
 
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+
+from galaxygen.connectivity import Connectivity
 from galaxygen.generation import generate_galaxy
+from galaxygen.geometry import encode_geometry
+from galaxygen.lod import DEFAULT_MAX_LEVEL, GalaxyLOD
+from galaxygen.models import Star
+from galaxygen.ownership import ADMIN_LEVELS
 from galaxygen.random_names import generate_random_word
 from galaxygen.rendering import render_galaxy
+from galaxygen.routing import RoutePlanner
+from galaxygen.spatial import BBox, ViewportIndex, normalize_bbox
+from galaxygen.stats import GalaxyStats
 from galaxygen.storage import (
+    BatchError,
     add_body as add_body_to_store,
     add_hyperlane as add_hyperlane_to_store,
     add_star as add_star_to_store,
+    apply_batch,
     delete_body as delete_body_from_store,
     delete_hyperlane as delete_hyperlane_from_store,
     delete_star as delete_star_from_store,
+    delete_stars as delete_stars_from_store,
+    get_changes,
+    get_galaxy_meta,
     get_star_count,
+    get_stars,
+    iter_resources,
+    iter_stars,
     load_country_definitions,
     load_galaxy,
+    load_hyperlane_pairs,
+    load_ownership_index,
     load_resource_definitions,
+    load_star_positions,
+    load_star_table,
     save_country_definitions,
     save_galaxy,
     update_body as update_body_in_store,
@@ -27,6 +50,8 @@ from galaxygen.system_generation import generate_system_profile
 from ..dependencies import get_settings
 from ..schemas.galaxy import (
     AddStarRequest,
+    BatchRequest,
+    DeleteStarsRequest,
     GalaxyResponse,
     GenerateRequest,
     GenerateSystemRequest,
@@ -38,16 +63,221 @@ from ..schemas.galaxy import (
     UpdateStarMetaRequest,
     UpdateStarRequest,
 )
+from ..services.galaxy_cache import VersionKey, galaxy_cache, version_headers
+from ..services.streaming import stream_galaxy_json
 
 router = APIRouter(prefix="/galaxy", tags=["galaxy"])
 
 
+def _build_galaxy_response() -> bytes:
+    response = GalaxyResponse(
+        galaxy=load_galaxy(),
+        resources=load_resource_definitions(),
+        countries=load_country_definitions(),
+    )
+    return response.model_dump_json().encode("utf-8")
+
+
 @router.get("", response_model=GalaxyResponse)
 def fetch_galaxy(settings=Depends(get_settings)):
-    galaxy = load_galaxy()
-    resource_defs = load_resource_definitions()
-    country_defs = load_country_definitions()
-    return {"galaxy": galaxy, "resources": resource_defs, "countries": country_defs}
+    key, body = galaxy_cache.get_versioned("galaxy_response", _build_galaxy_response)
+    return Response(content=body, media_type="application/json", headers=version_headers(key))
+
+
+@router.get("/stream", response_model=GalaxyResponse)
+def stream_galaxy(settings=Depends(get_settings)):
+    return StreamingResponse(stream_galaxy_json(), media_type="application/json")
+
+
+def _viewport_index() -> ViewportIndex:
+    return galaxy_cache.get(
+        "viewport_index", lambda: ViewportIndex(load_star_positions(), load_hyperlane_pairs())
+    )
+
+
+def _parse_bbox(bbox: str) -> BBox:
+    try:
+        return normalize_bbox([float(value) for value in bbox.split(",")])
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be four numbers: x0,y0,x1,y1")
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = sorted(set(requested) - set(Star.model_fields))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown star fields: {', '.join(unknown)}")
+    return requested
+
+
+@router.get("/stars")
+def fetch_stars_in_viewport(bbox: str, fields: Optional[str] = None, settings=Depends(get_settings)):
+    box = _parse_bbox(bbox)
+    requested = _parse_fields(fields)
+    index = _viewport_index()
+    hits = index.query_stars(box)
+    if requested is not None and set(requested) <= {"x", "y"}:
+        # Answer coordinate-only projections from the index without touching storage.
+        coords = index.positions[hits].tolist()
+        stars = [
+            {"idx": idx, **{field: xy[0 if field == "x" else 1] for field in requested}}
+            for idx, xy in zip(hits.tolist(), coords)
+        ]
+    else:
+        stars = get_stars(hits.tolist(), requested)
+    return {"bbox": list(box), "stars": stars}
+
+
+@router.get("/hyperlanes")
+def fetch_hyperlanes_in_viewport(bbox: str, settings=Depends(get_settings)):
+    box = _parse_bbox(bbox)
+    index = _viewport_index()
+    hits = index.query_lanes(box)
+    pairs = index.lanes[hits].tolist()
+    return {
+        "bbox": list(box),
+        "hyperlanes": [{"idx": idx, "a": a, "b": b} for idx, (a, b) in zip(hits.tolist(), pairs)],
+    }
+
+
+@router.get("/changes")
+def fetch_changes(
+    since: int,
+    epoch: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10_000),
+    settings=Depends(get_settings),
+):
+    return get_changes(since, limit=limit, epoch=epoch)
+
+
+def _build_lod() -> GalaxyLOD:
+    meta = get_galaxy_meta()
+    table = load_star_table()
+    return GalaxyLOD(
+        int(meta.get("width", 0)),
+        int(meta.get("height", 0)),
+        table[:, :2],
+        table[:, 2],
+        table[:, 3],
+        load_hyperlane_pairs(),
+    )
+
+
+@router.get("/lod")
+def fetch_level_of_detail(level: int = 0, settings=Depends(get_settings)):
+    if not 0 <= level <= DEFAULT_MAX_LEVEL:
+        raise HTTPException(status_code=400, detail=f"level must be between 0 and {DEFAULT_MAX_LEVEL}")
+    lod = galaxy_cache.get("lod", _build_lod, incremental=True)
+    return {
+        "level": level,
+        "cell_size": lod.cell_size(level),
+        "clusters": lod.clusters(level),
+        "bundles": lod.bundles(level),
+    }
+
+
+def _build_stats() -> GalaxyStats:
+    meta = get_galaxy_meta()
+    return GalaxyStats.from_star_docs(
+        int(meta.get("width", 0)),
+        int(meta.get("height", 0)),
+        iter_stars(fields=("x", "y", "star_type", "admin_levels", "bodies")),
+        iter_resources(),
+    )
+
+
+@router.get("/stats")
+def fetch_stats(settings=Depends(get_settings)):
+    """System, body, star-type and area totals per country and resource region."""
+    return galaxy_cache.get("stats", _build_stats, incremental=True).summary()
+
+
+def _build_geometry() -> bytes:
+    meta = get_galaxy_meta()
+    table = load_star_table()
+    return encode_geometry(
+        int(meta.get("width", 0)),
+        int(meta.get("height", 0)),
+        positions=table[:, :2],
+        star_types=table[:, 2],
+        countries=table[:, 3],
+        lanes=load_hyperlane_pairs(),
+    )
+
+
+@router.get("/geometry.bin")
+def fetch_geometry(settings=Depends(get_settings)):
+    body = galaxy_cache.get("geometry_bin", _build_geometry)
+    return Response(content=body, media_type="application/octet-stream")
+
+
+@router.get("/route")
+def fetch_route(
+    source: int = Query(..., alias="from"),
+    target: int = Query(..., alias="to"),
+    settings=Depends(get_settings),
+):
+    """Cheapest hyperlane route; lane cost is length over its infrastructure speed."""
+    planner = galaxy_cache.get(
+        "route_planner", lambda: RoutePlanner(load_star_positions(), load_hyperlane_pairs())
+    )
+    try:
+        route = planner.route(source, target)
+    except IndexError:
+        raise HTTPException(status_code=404, detail="Star not found")
+    if route is None:
+        raise HTTPException(status_code=404, detail="No route between these systems")
+    return {"from": source, "to": target, "stars": route.stars, "hops": route.hops, "cost": route.cost}
+
+
+def _connectivity() -> Tuple[VersionKey, Connectivity]:
+    return galaxy_cache.get_versioned(
+        "connectivity", lambda: Connectivity(get_star_count(), load_hyperlane_pairs()), incremental=True
+    )
+
+
+def _split_warnings(connectivity: Connectivity, key: VersionKey) -> List[dict]:
+    """Warnings for components split by changes made after ``key``."""
+    warnings = []
+    for split in connectivity.splits_since(key[1]):
+        sizes = [str(component["size"]) for component in split["components"]]
+        warnings.append(
+            {
+                "code": "component_split",
+                "detail": f"Connected systems were split into groups of {', '.join(sizes[:-1])} and {sizes[-1]}",
+                "components": split["components"],
+            }
+        )
+    return warnings
+
+
+@router.get("/connected")
+def fetch_connected(a: int, b: int, settings=Depends(get_settings)):
+    _, connectivity = _connectivity()
+    try:
+        return {"a": a, "b": b, "connected": connectivity.connected(a, b)}
+    except IndexError:
+        raise HTTPException(status_code=404, detail="Star not found")
+
+
+@router.get("/star/{star_idx}/component")
+def fetch_star_component(star_idx: int, settings=Depends(get_settings)):
+    _, connectivity = _connectivity()
+    try:
+        component, size = connectivity.component(star_idx), connectivity.component_size(star_idx)
+    except IndexError:
+        raise HTTPException(status_code=404, detail=f"Star {star_idx} not found")
+    return {"star": star_idx, "component": component, "size": size, "components": connectivity.components}
+
+
+@router.get("/countries/{country_id}/systems")
+def fetch_country_systems(country_id: int, level: int = 0, settings=Depends(get_settings)):
+    if not 0 <= level < ADMIN_LEVELS:
+        raise HTTPException(status_code=400, detail=f"level must be between 0 and {ADMIN_LEVELS - 1}")
+    ownership = galaxy_cache.get("ownership", load_ownership_index, incremental=True)
+    return {"country": country_id, "level": level, "systems": ownership.systems(country_id, level).tolist()}
 
 
 @router.post("", response_model=GalaxyResponse)
@@ -136,9 +366,19 @@ def add_star(payload: AddStarRequest, settings=Depends(get_settings)):
 
 @router.delete("/star/{star_idx}")
 def delete_star(star_idx: int, settings=Depends(get_settings)):
+    key, connectivity = _connectivity()
     if star_idx < 0 or not delete_star_from_store(star_idx):
         raise HTTPException(status_code=404, detail=f"Star {star_idx} not found")
-    return {"ok": True}
+    return {"ok": True, "warnings": _split_warnings(connectivity, key)}
+
+
+@router.post("/stars/delete")
+def delete_stars(payload: DeleteStarsRequest, settings=Depends(get_settings)):
+    key, connectivity = _connectivity()
+    deleted = delete_stars_from_store(payload.indices)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="None of the stars were found")
+    return {"deleted": deleted, "warnings": _split_warnings(connectivity, key)}
 
 
 @router.post("/hyperlane")
@@ -155,9 +395,20 @@ def add_hyperlane(payload: HyperlaneRequest, settings=Depends(get_settings)):
 
 @router.delete("/hyperlane/{lane_idx}")
 def delete_hyperlane(lane_idx: int, settings=Depends(get_settings)):
+    key, connectivity = _connectivity()
     if lane_idx < 0 or not delete_hyperlane_from_store(lane_idx):
         raise HTTPException(status_code=404, detail=f"Hyperlane {lane_idx} not found")
-    return {"ok": True}
+    return {"ok": True, "warnings": _split_warnings(connectivity, key)}
+
+
+@router.post("/batch")
+def apply_batch_operations(payload: BatchRequest, settings=Depends(get_settings)):
+    key, connectivity = _connectivity()
+    try:
+        results = apply_batch([operation.model_dump() for operation in payload.operations])
+    except BatchError as exc:
+        raise HTTPException(status_code=400, detail={"errors": exc.errors})
+    return {"results": results, "warnings": _split_warnings(connectivity, key)}
 
 
 @router.put("/countries")
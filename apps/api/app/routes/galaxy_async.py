@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response, StreamingResponse
+
+from galaxygen import async_storage
+
+from ..dependencies import get_settings
+from ..schemas.galaxy import GalaxyResponse
+from ..services.galaxy_cache import galaxy_cache, version_headers
+from ..services.streaming import astream_galaxy_json
+
+# Read-only twins of the /galaxy routes that run on the event loop instead of
+# the threadpool; they serve the same payloads and share the galaxy cache.
+router = APIRouter(prefix="/async/galaxy", tags=["galaxy"])
+
+
+async def _build_galaxy_response() -> bytes:
+    response = GalaxyResponse(
+        galaxy=await async_storage.load_galaxy(),
+        resources=await async_storage.load_resource_definitions(),
+        countries=await async_storage.load_country_definitions(),
+    )
+    return response.model_dump_json().encode("utf-8")
+
+
+@router.get("", response_model=GalaxyResponse)
+async def fetch_galaxy(settings=Depends(get_settings)):
+    key, body = await galaxy_cache.aget_versioned("galaxy_response", _build_galaxy_response)
+    return Response(content=body, media_type="application/json", headers=version_headers(key))
+
+
+@router.get("/stream", response_model=GalaxyResponse)
+async def stream_galaxy(settings=Depends(get_settings)):
+    return StreamingResponse(astream_galaxy_json(), media_type="application/json")
+
+
+@router.get("/star/{star_idx}")
+async def fetch_star(star_idx: int, settings=Depends(get_settings)):
+    star = await async_storage.get_star(star_idx) if star_idx >= 0 else None
+    if star is None:
+        raise HTTPException(status_code=404, detail=f"Star {star_idx} not found")
+    return {"star": star}
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import asyncio
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from galaxygen import async_storage
+
+from ..services.events import event_bus
+
+router = APIRouter(prefix="/galaxy", tags=["galaxy"])
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+
+@router.websocket("/events")
+async def galaxy_events(websocket: WebSocket):
+    """Push galaxy edits as they are applied.
+
+    The first message is ``{"op": "hello", "epoch", "version"}``; after that
+    each message is ``{"events": [...]}`` holding the change records described
+    in ``GET /galaxy/changes``, oldest first. A ``resync`` event means edits
+    were dropped for this connection and the galaxy must be reloaded.
+    """
+    await websocket.accept()
+    with event_bus.subscribe() as subscription:
+        epoch, version = await async_storage.get_galaxy_version()
+        await websocket.send_json({"op": "hello", "epoch": epoch, "version": version})
+        disconnected = asyncio.create_task(_wait_for_disconnect(websocket))
+        try:
+            while True:
+                batch = asyncio.create_task(subscription.next_batch())
+                await asyncio.wait({batch, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if disconnected.done():
+                    batch.cancel()
+                    return
+                await websocket.send_json({"events": batch.result()})
+        finally:
+            disconnected.cancel()
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from typing import Callable, Optional, Tuple, TypeVar
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from galaxygen.graph import GalaxyGraph
+from galaxygen.storage import get_star_count, load_hyperlane_pairs, load_star_table
+
+from ..dependencies import get_settings
+from ..services.galaxy_cache import galaxy_cache
+
+router = APIRouter(prefix="/galaxy/graph", tags=["galaxy"])
+
+T = TypeVar("T")
+
+
+def _graph(country: Optional[int] = None) -> Tuple[GalaxyGraph, np.ndarray]:
+    """The hyperlane graph (optionally one country's systems) and its star indices."""
+
+    def build():
+        graph = galaxy_cache.get("graph", lambda: GalaxyGraph(get_star_count(), load_hyperlane_pairs()))
+        if country is None:
+            return graph, np.arange(graph.node_count)
+        return graph.subgraph(np.flatnonzero(load_star_table()[:, 3] == country))
+
+    return galaxy_cache.get(f"graph:{country}", build)
+
+
+# Path centralities are cached only for the default sampling; other
+# ``samples``/``seed`` values are computed per request, so clients choosing
+# them cannot fill the cache with one array per value.
+_BETWEENNESS_SAMPLES = 64
+_CHOKEPOINT_SAMPLES = 256
+_DEFAULT_SEED = 0
+
+
+def _centrality(name: str, cacheable: bool, build: Callable[[], T]) -> T:
+    return galaxy_cache.get(name, build) if cacheable else build()
+
+
+def _ranking(mapping: np.ndarray, values: np.ndarray, top: int) -> list:
+    order = np.argsort(-values, kind="stable")[:top]
+    return [{"idx": int(mapping[i]), "value": float(values[i])} for i in order]
+
+
+@router.get("")
+def graph_summary(country: Optional[int] = None, settings=Depends(get_settings)):
+    graph, _ = _graph(country)
+    count, labels = graph.connected_components()
+    sizes = np.sort(np.bincount(labels, minlength=1))[::-1] if graph.node_count else np.zeros(0, dtype=int)
+    degree = graph.degree()
+    return {
+        "stars": graph.node_count,
+        "lanes": graph.edge_count,
+        "components": count,
+        "component_sizes": sizes.tolist(),
+        "degree": {
+            "min": int(degree.min()) if graph.node_count else 0,
+            "mean": float(degree.mean()) if graph.node_count else 0.0,
+            "max": int(degree.max()) if graph.node_count else 0,
+        },
+    }
+
+
+@router.get("/degree")
+def graph_degree(
+    country: Optional[int] = None, top: int = Query(50, ge=1, le=10_000), settings=Depends(get_settings)
+):
+    graph, mapping = _graph(country)
+    return {"systems": _ranking(mapping, graph.degree().astype(float), top)}
+
+
+@router.get("/betweenness")
+def graph_betweenness(
+    country: Optional[int] = None,
+    samples: int = Query(
+        _BETWEENNESS_SAMPLES, ge=0, le=4096, description="Sampled sources; 0 computes it exactly."
+    ),
+    seed: int = _DEFAULT_SEED,
+    top: int = Query(50, ge=1, le=10_000),
+    settings=Depends(get_settings),
+):
+    """Systems ranked by (approximate) betweenness centrality, normalized to [0, 1]."""
+    graph, mapping = _graph(country)
+    values = _centrality(
+        f"betweenness:{country}",
+        samples == _BETWEENNESS_SAMPLES and seed == _DEFAULT_SEED,
+        lambda: graph.betweenness(samples or None, seed),
+    )
+    return {"samples": min(samples or graph.node_count, graph.node_count), "systems": _ranking(mapping, values, top)}
+
+
+@router.get("/chokepoints")
+def graph_chokepoints(
+    country: Optional[int] = None,
+    samples: int = Query(
+        _CHOKEPOINT_SAMPLES, ge=0, le=4096, description="Sampled sources; 0 computes it exactly."
+    ),
+    seed: int = _DEFAULT_SEED,
+    top: int = Query(50, ge=1, le=10_000),
+    settings=Depends(get_settings),
+):
+    """Cut systems and cut lanes, plus systems ranked by betweenness with their stress.
+
+    ``stress`` is the (estimated) number of shortest paths through a system.
+    """
+    graph, mapping = _graph(country)
+    report = _centrality(
+        f"chokepoints:{country}",
+        samples == _CHOKEPOINT_SAMPLES and seed == _DEFAULT_SEED,
+        lambda: graph.chokepoints(samples or None, seed),
+    )
+    cuts = set(report.articulation_points.tolist())
+    order = np.argsort(-report.betweenness, kind="stable")[:top]
+    return {
+        "samples": min(samples or graph.node_count, graph.node_count),
+        "articulation_points": mapping[report.articulation_points].tolist(),
+        "bridges": mapping[report.bridges].tolist(),
+        "systems": [
+            {
+                "idx": int(mapping[i]),
+                "betweenness": float(report.betweenness[i]),
+                "stress": float(report.stress[i]),
+                "articulation": int(i) in cuts,
+            }
+            for i in order
+        ],
+    }
+
+
+@router.get("/distances")
+def graph_distances(
+    source: int,
+    max_distance: Optional[int] = Query(None, ge=0),
+    country: Optional[int] = None,
+    settings=Depends(get_settings),
+):
+    """Hop counts from ``source`` to every reachable system within ``max_distance``."""
+    graph, mapping = _graph(country)
+    local = np.flatnonzero(mapping == source)
+    if not len(local):
+        raise HTTPException(status_code=404, detail="Star not found")
+    dist = graph.bfs_distances(int(local[0]), max_distance)
+    reached = np.flatnonzero(dist >= 0)
+    return {
+        "source": source,
+        "distances": [{"idx": int(mapping[i]), "hops": int(dist[i])} for i in reached],
+    }
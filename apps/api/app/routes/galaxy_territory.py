@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException
+
+from galaxygen.ownership import ADMIN_LEVELS, UNOWNED
+from galaxygen.storage import get_galaxy_meta, load_ownership_index, load_star_positions
+from galaxygen.territory import Territory
+
+from ..dependencies import get_settings
+from ..services.galaxy_cache import galaxy_cache
+
+router = APIRouter(prefix="/galaxy/territory", tags=["galaxy"])
+
+
+def _build_territory() -> Territory:
+    meta = get_galaxy_meta()
+    return Territory(
+        load_star_positions(),
+        load_ownership_index().levels,
+        int(meta.get("width", 0)),
+        int(meta.get("height", 0)),
+    )
+
+
+def _territory(level: int) -> Territory:
+    if not 0 <= level < ADMIN_LEVELS:
+        raise HTTPException(status_code=400, detail=f"level must be between 0 and {ADMIN_LEVELS - 1}")
+    return galaxy_cache.get("territory", _build_territory, incremental=True)
+
+
+@router.get("/borders")
+def territory_borders(level: int = 0, country: Optional[int] = None, settings=Depends(get_settings)):
+    """Border polylines between owners, as flat ``points`` split by ``offsets``.
+
+    Polyline ``i`` is ``points[2 * offsets[i]:2 * offsets[i + 1]]`` (x, y
+    pairs) and separates the owners ``pairs[i]``; -1 is unclaimed space.
+    """
+    borders = _territory(level).borders(level)
+    selected = np.arange(len(borders.pairs))
+    if country is not None:
+        selected = np.flatnonzero((borders.pairs == country).any(axis=1))
+    sizes = np.diff(borders.offsets)[selected]
+    points = [borders.points[borders.offsets[i] : borders.offsets[i + 1]] for i in selected]
+    flat = np.concatenate(points) if points else np.zeros((0, 2))
+    return {
+        "level": level,
+        "unowned": UNOWNED,
+        "points": np.round(flat, 2).ravel().tolist(),
+        "offsets": np.concatenate([[0], np.cumsum(sizes)]).tolist(),
+        "pairs": borders.pairs[selected].tolist(),
+        "lengths": np.round(borders.lengths[selected], 2).tolist(),
+    }
+
+
+@router.get("/neighbors")
+def territory_neighbors(level: int = 0, settings=Depends(get_settings)):
+    """Bordering countries and total border length of every owned country."""
+    territory = _territory(level)
+    lengths = territory.border_lengths(level)
+    return {
+        "level": level,
+        "countries": [
+            {"id": country, "neighbors": neighbors, "border_length": round(lengths.get(country, 0.0), 2)}
+            for country, neighbors in sorted(territory.neighbors(level).items())
+        ],
+    }
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from galaxygen.backends import get_backend
+from galaxygen.models import Galaxy
+from galaxygen.storage import (
+    get_galaxy_version,
+    load_country_definitions,
+    load_resource_definitions,
+    save_galaxy,
+)
+
+from ..dependencies import get_settings
+from ..schemas.galaxy import GenerateRequest, RenderRequest
+from ..services.jobs import generate_task, job_manager, render_task
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _save_generated(galaxy: Galaxy) -> dict:
+    save_galaxy(None, galaxy)
+    return {
+        "star_count": len(galaxy.stars),
+        "hyperlane_count": len(galaxy.hyperlanes),
+        "resource_count": len(galaxy.resources),
+    }
+
+
+@router.post("/generate", status_code=202)
+def submit_generate(payload: GenerateRequest, settings=Depends(get_settings)):
+    distribution = payload.distribution_path or settings.distribution_map
+    if not distribution.exists():
+        raise HTTPException(status_code=400, detail=f"Distribution map not found: {distribution}")
+
+    resources = load_resource_definitions() if payload.use_resources else []
+    countries = load_country_definitions()
+    params = {**payload.model_dump(mode="json"), "distribution_path": str(distribution)}
+    job = job_manager.submit(
+        "generate",
+        params,
+        generate_task,
+        distribution,
+        payload.system_count,
+        resources,
+        payload.seed,
+        countries,
+        finish=_save_generated,
+    )
+    return job.to_dict()
+
+
+@router.post("/render", status_code=202)
+def submit_render(payload: RenderRequest, settings=Depends(get_settings)):
+    output_dir = payload.output_dir or settings.render_output
+    # Renders of the same galaxy version into the same directory are identical.
+    params = {"output_dir": str(output_dir), "version": list(get_galaxy_version())}
+    # The worker loads the galaxy itself; pass it only where to read it from.
+    backend = get_backend()
+    path = getattr(backend, "path", None)
+    job = job_manager.submit(
+        "render",
+        params,
+        render_task,
+        backend.name,
+        str(path) if path is not None else None,
+        output_dir,
+        settings.distribution_map,
+    )
+    return job.to_dict()
+
+
+@router.get("/{job_id}")
+def fetch_job(job_id: str, settings=Depends(get_settings)):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_dict()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional
+from typing import Annotated, Literal, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -51,6 +51,10 @@ class AddStarRequest(BaseModel):
     height: int = Field(..., ge=0)
 
 
+class DeleteStarsRequest(BaseModel):
+    indices: list[int] = Field(..., min_length=1)
+
+
 class HyperlaneRequest(BaseModel):
     a: int = Field(..., ge=0)
     b: int = Field(..., ge=0)
@@ -60,6 +64,69 @@ class UpdateCountriesRequest(BaseModel):
     countries: list[CountryDefinition]
 
 
+class StarMetaOperation(BaseModel):
+    op: Literal["update_star_meta"]
+    idx: int = Field(..., ge=0)
+    name: str | None = None
+    description: str | None = None
+    star_type: str | None = None
+
+
+class AdminLevelOperation(BaseModel):
+    op: Literal["set_admin_level"]
+    idx: int = Field(..., ge=0)
+    level: int = Field(..., ge=0, le=3)
+    country: int | None = None
+
+
+class AddBodyOperation(BaseModel):
+    op: Literal["add_body"]
+    idx: int = Field(..., ge=0)
+    body: CelestialBody
+
+
+class UpdateBodyOperation(BaseModel):
+    op: Literal["update_body"]
+    idx: int = Field(..., ge=0)
+    body_idx: int = Field(..., ge=0)
+    body: CelestialBody
+
+
+class DeleteBodyOperation(BaseModel):
+    op: Literal["delete_body"]
+    idx: int = Field(..., ge=0)
+    body_idx: int = Field(..., ge=0)
+
+
+class AddHyperlaneOperation(BaseModel):
+    op: Literal["add_hyperlane"]
+    a: int = Field(..., ge=0)
+    b: int = Field(..., ge=0)
+
+
+class DeleteHyperlaneOperation(BaseModel):
+    op: Literal["delete_hyperlane"]
+    idx: int = Field(..., ge=0)
+
+
+BatchOperation = Annotated[
+    Union[
+        StarMetaOperation,
+        AdminLevelOperation,
+        AddBodyOperation,
+        UpdateBodyOperation,
+        DeleteBodyOperation,
+        AddHyperlaneOperation,
+        DeleteHyperlaneOperation,
+    ],
+    Field(discriminator="op"),
+]
+
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation] = Field(..., min_length=1)
+
+
 class GalaxyResponse(BaseModel):
     galaxy: Galaxy
     resources: list[ResourceDefinition] | None = None
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Set
+
+from galaxygen.storage import add_change_listener
+
+DEFAULT_MAX_PENDING = 256
+
+_STAR_EDITS = ("star_updated", "star_fields_updated")
+
+
+def _coalesce(last: dict, event: dict) -> Optional[dict]:
+    """Fold ``event`` into ``last`` when both edit the same star, else return ``None``.
+
+    Only adjacent edits are merged: anything in between may shift indices.
+    The merged event carries the newest version.
+    """
+    if last["op"] not in _STAR_EDITS or event["op"] not in _STAR_EDITS or last["idx"] != event["idx"]:
+        return None
+    if event["op"] == "star_updated":
+        return event
+    if last["op"] == "star_updated":
+        return {**last, "version": event["version"], "star": {**last["star"], **event["fields"]}}
+    return {**last, "version": event["version"], "fields": {**last["fields"], **event["fields"]}}
+
+
+class Subscription:
+    """Pending events for one connection, owned by the event loop that serves it.
+
+    Events queue up while the connection is busy sending, so a slow client
+    receives rapid edits to the same star as one event. If more than
+    ``max_pending`` events pile up anyway, they are replaced by a single
+    ``resync`` event telling the client to reload from that version.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending: int) -> None:
+        self._loop = loop
+        self._max_pending = max_pending
+        self._pending: List[dict] = []
+        self._ready = asyncio.Event()
+
+    def publish(self, event: dict) -> None:
+        """Thread-safe: hand ``event`` to the subscription's event loop."""
+        self._loop.call_soon_threadsafe(self._push, event)
+
+    def _push(self, event: dict) -> None:
+        pending = self._pending
+        if pending and pending[-1]["op"] == "resync":
+            pending[-1] = {**pending[-1], "version": event["version"]}
+        elif pending and (merged := _coalesce(pending[-1], event)) is not None:
+            pending[-1] = merged
+        elif len(pending) >= self._max_pending:
+            self._pending = [{"op": "resync", "epoch": event["epoch"], "version": event["version"]}]
+        else:
+            pending.append(event)
+        self._ready.set()
+
+    async def next_batch(self) -> List[dict]:
+        """Wait for and take every pending event."""
+        await self._ready.wait()
+        self._ready.clear()
+        batch, self._pending = self._pending, []
+        return batch
+
+
+class EventBus:
+    """In-process fan-out of storage changes to connected clients."""
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING) -> None:
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._subscriptions: Set[Subscription] = set()
+
+    def publish(self, change: dict) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.publish(change)
+
+    @contextmanager
+    def subscribe(self) -> Iterator[Subscription]:
+        """Register a subscription on the running event loop for the duration of the block."""
+        subscription = Subscription(asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+
+event_bus = EventBus()
+add_change_listener(event_bus.publish)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from galaxygen import async_storage
+from galaxygen.metrics import REGISTRY
+from galaxygen.storage import add_change_listener, get_galaxy_version, write_lock
+
+T = TypeVar("T")
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "asarto_galaxy_cache_requests", "Galaxy cache lookups by entry and result.", ("entry", "result")
+)
+VersionKey = Tuple[str, int]
+
+
+def _is_newer(key: VersionKey, current: Optional[VersionKey]) -> bool:
+    return current is None or key[0] != current[0] or key[1] > current[1]
+
+
+class GalaxyCache:
+    """Read-through cache of artifacts derived from the stored galaxy.
+
+    Entries are valid for one ``(epoch, version)`` of the galaxy. A lookup costs
+    a single metadata read; when the version has moved on, every entry is
+    dropped and rebuilt lazily on the next request for it.
+
+    Entries exposing ``apply_change(change) -> bool`` survive changes made by
+    this process: they are patched from the storage change feed and carried to
+    the next version as long as they accept every change in sequence.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._key: Optional[VersionKey] = None
+        self._entries: Dict[str, Any] = {}
+        add_change_listener(self._on_change)
+
+    @property
+    def key(self) -> Optional[VersionKey]:
+        return self._key
+
+    def get(self, name: str, build: Callable[[], T], incremental: bool = False) -> T:
+        """Return the entry ``name``, building it for the current version if needed.
+
+        ``incremental`` entries are built under the storage write lock so that
+        no local change lands in both the built data and the change feed.
+        """
+        return self.get_versioned(name, build, incremental)[1]
+
+    def get_versioned(
+        self, name: str, build: Callable[[], T], incremental: bool = False
+    ) -> Tuple[VersionKey, T]:
+        """Like :meth:`get`, also returning the ``(epoch, version)`` the entry is valid for."""
+        if incremental:
+            with write_lock():
+                return self._get(name, build)
+        return self._get(name, build)
+
+    def _get(self, name: str, build: Callable[[], T]) -> Tuple[VersionKey, T]:
+        # Read the version before building so data written concurrently is
+        # never cached under a newer version than the one it was built from.
+        key = get_galaxy_version()
+        found, value = self._lookup(key, name)
+        if found:
+            return key, value
+        value = build()
+        self._store(key, name, value)
+        return key, value
+
+    async def aget(self, name: str, build: Callable[[], Awaitable[T]]) -> T:
+        """Async variant of :meth:`get`; shares entries with the sync path."""
+        return (await self.aget_versioned(name, build))[1]
+
+    async def aget_versioned(self, name: str, build: Callable[[], Awaitable[T]]) -> Tuple[VersionKey, T]:
+        key = await async_storage.get_galaxy_version()
+        found, value = self._lookup(key, name)
+        if found:
+            return key, value
+        value = await build()
+        self._store(key, name, value)
+        return key, value
+
+    def _lookup(self, key: VersionKey, name: str) -> Tuple[bool, Any]:
+        with self._lock:
+            if key == self._key and name in self._entries:
+                CACHE_REQUESTS.inc(entry=name, result="hit")
+                return True, self._entries[name]
+            if _is_newer(key, self._key):
+                self._key = key
+                self._entries = {}
+        CACHE_REQUESTS.inc(entry=name, result="miss")
+        return False, None
+
+    def _store(self, key: VersionKey, name: str, value: Any) -> None:
+        with self._lock:
+            if key == self._key:
+                self._entries[name] = value
+
+    def _on_change(self, change: dict) -> None:
+        with self._lock:
+            key = self._key
+            if key is None or change["epoch"] != key[0] or change["version"] != key[1] + 1:
+                # Missed a change (e.g. one made by another process); the next
+                # lookup sees the newer version and starts over.
+                return
+            carried = {}
+            for name, value in self._entries.items():
+                apply_change = getattr(value, "apply_change", None)
+                if apply_change is not None and apply_change(change):
+                    carried[name] = value
+            self._key = (key[0], change["version"])
+            self._entries = carried
+
+    def clear(self) -> None:
+        with self._lock:
+            self._key = None
+            self._entries = {}
+
+
+def version_headers(key: VersionKey) -> Dict[str, str]:
+    """Response headers telling clients which galaxy version a payload reflects."""
+    return {"X-Galaxy-Epoch": key[0], "X-Galaxy-Version": str(key[1])}
+
+
+galaxy_cache = GalaxyCache()
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from galaxygen.backends import configure_backend
+from galaxygen.generation import generate_galaxy
+from galaxygen.metrics import capture_stages, record_stages, stage
+from galaxygen.models import CountryDefinition, Galaxy, ResourceDefinition
+from galaxygen.rendering import render_galaxy
+from galaxygen.storage import load_country_definitions, load_galaxy, load_resource_definitions
+
+DEFAULT_HISTORY = 100
+
+# Set in pool workers by ``_init_worker``; progress messages travel back to
+# the API process through it.
+_progress_queue = None
+
+
+def _init_worker(queue) -> None:
+    global _progress_queue
+    _progress_queue = queue
+
+
+def worker_progress(job_id: str) -> Callable[[str, float], None]:
+    """Progress callback for code running inside a pool worker."""
+    last = {"stage": None, "percent": -1}
+
+    def progress(stage: str, fraction: float) -> None:
+        percent = int(fraction * 100)
+        if stage == last["stage"] and percent == last["percent"]:
+            return
+        last.update(stage=stage, percent=percent)
+        if _progress_queue is not None:
+            _progress_queue.put((job_id, stage, percent))
+
+    return progress
+
+
+def generate_task(
+    job_id: str,
+    distribution: Path,
+    system_count: int,
+    resources: List[ResourceDefinition],
+    seed: Optional[int],
+    countries: List[CountryDefinition],
+) -> Tuple[Galaxy, List[tuple]]:
+    with capture_stages() as timings:
+        galaxy = generate_galaxy(
+            distribution, system_count, resources, seed, countries, progress=worker_progress(job_id)
+        )
+    return galaxy, timings
+
+
+def render_task(
+    job_id: str,
+    storage: str,
+    storage_path: Optional[str],
+    output_dir: Path,
+    distribution: Optional[Path],
+) -> Tuple[Dict[str, Optional[str]], List[tuple]]:
+    """Load the stored galaxy in the worker and render it.
+
+    Only the storage settings cross the process boundary, so neither the API
+    request nor the pickling of task arguments pays for a full galaxy load.
+    """
+    configure_backend(storage, path=storage_path)
+    with capture_stages() as timings:
+        with stage("render", "load"):
+            galaxy = load_galaxy()
+            resources = load_resource_definitions()
+            countries = load_country_definitions()
+        outputs = render_galaxy(
+            galaxy, resources, countries, output_dir, distribution, progress=worker_progress(job_id)
+        )
+    return {key: str(value) if value else None for key, value in outputs.items()}, timings
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    key: str
+    status: str = "queued"
+    stage: str = "queued"
+    progress: int = 0
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def job_key(kind: str, params: dict) -> str:
+    canonical = json.dumps({"kind": kind, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class JobManager:
+    """Runs long tasks in a process pool and tracks their progress.
+
+    ``submit`` returns at once with a job; a runner thread hands the task to
+    the pool, waits for it and then runs the optional ``finish`` step in the
+    API process (e.g. saving a generated galaxy, so storage listeners fire
+    here). Submissions with the same key as a queued or running job return
+    that job instead of starting another. The last ``history`` finished jobs
+    are kept for status queries.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, history: int = DEFAULT_HISTORY) -> None:
+        self.max_workers = max_workers or int(os.getenv("ASARTO_JOB_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+        self.history = history
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active: Dict[str, str] = {}
+        self._pool: Optional[Executor] = None
+        self._runners: Optional[ThreadPoolExecutor] = None
+        self._queue = None
+        self._listener: Optional[threading.Thread] = None
+
+    def _ensure_started(self) -> None:
+        if self._pool is not None:
+            return
+        context = multiprocessing.get_context("spawn")
+        self._queue = context.Queue()
+        self._pool = ProcessPoolExecutor(
+            self.max_workers, mp_context=context, initializer=_init_worker, initargs=(self._queue,)
+        )
+        self._runners = ThreadPoolExecutor(self.max_workers, thread_name_prefix="job-runner")
+        self._listener = threading.Thread(target=self._listen, name="job-progress", daemon=True)
+        self._listener.start()
+
+    def _listen(self) -> None:
+        while True:
+            message = self._queue.get()
+            if message is None:
+                return
+            job_id, stage, percent = message
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is not None and not job.finished:
+                    job.status, job.stage, job.progress = "running", stage, percent
+
+    def submit(
+        self,
+        kind: str,
+        params: dict,
+        task: Callable[..., Any],
+        *args: Any,
+        finish: Optional[Callable[[Any], Any]] = None,
+    ) -> Job:
+        """Queue ``task(job_id, *args)`` in the pool unless an identical job is in flight.
+
+        The task returns ``(result, stage_timings)``. ``params`` identify the
+        job for deduplication; ``finish(result)`` turns the task's result into
+        the job result.
+        """
+        key = job_key(kind, params)
+        with self._lock:
+            self._ensure_started()
+            active = self._active.get(key)
+            if active is not None:
+                return self._jobs[active]
+            job = Job(id=uuid.uuid4().hex, kind=kind, key=key)
+            self._jobs[job.id] = job
+            self._active[key] = job.id
+        self._runners.submit(self._run, job, task, args, finish)
+        return job
+
+    def _run(self, job: Job, task: Callable[..., Any], args: tuple, finish) -> None:
+        self._update(job, status="running", stage="starting")
+        try:
+            # Tasks return their stage timings alongside the result, since
+            # metrics recorded in a worker process are never scraped.
+            result, timings = self._pool.submit(task, job.id, *args).result()
+            record_stages(timings)
+            if finish is not None:
+                self._update(job, stage="finishing")
+                result = finish(result)
+            self._update(job, status="succeeded", stage="done", progress=100, result=result)
+        except Exception as exc:
+            self._update(job, status="failed", error=f"{type(exc).__name__}: {exc}")
+
+    def _update(self, job: Job, **values: Any) -> None:
+        with self._lock:
+            for name, value in values.items():
+                setattr(job, name, value)
+            if job.finished:
+                job.finished_at = time.time()
+                self._active.pop(job.key, None)
+                self._trim()
+
+    def _trim(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, runners, queue = self._pool, self._runners, self._queue
+            self._pool = self._runners = self._queue = None
+        if pool is None:
+            return
+        runners.shutdown(wait=True)
+        pool.shutdown(wait=True)
+        queue.put(None)
+
+
+job_manager = JobManager()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+from galaxygen import async_storage
+from galaxygen.storage import get_galaxy_meta, iter_collection
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+
+class _ChunkBuffer:
+    """Accumulates encoded JSON fragments and releases them in fixed-size chunks."""
+
+    def __init__(self, chunk_size: int) -> None:
+        self._chunk_size = chunk_size
+        self._parts: list[str] = []
+        self._size = 0
+
+    def write(self, text: str) -> bytes | None:
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self._chunk_size:
+            return self.flush()
+        return None
+
+    def flush(self) -> bytes | None:
+        if not self._parts:
+            return None
+        chunk = "".join(self._parts).encode("utf-8")
+        self._parts.clear()
+        self._size = 0
+        return chunk
+
+
+def _array(buffer: _ChunkBuffer, docs: Iterable[dict]) -> Iterator[bytes]:
+    separator = "["
+    for doc in docs:
+        chunk = buffer.write(separator + _encode(doc))
+        if chunk:
+            yield chunk
+        separator = ","
+    chunk = buffer.write("[]" if separator == "[" else "]")
+    if chunk:
+        yield chunk
+
+
+async def _async_array(buffer: _ChunkBuffer, docs: AsyncIterable[dict]) -> AsyncIterator[bytes]:
+    separator = "["
+    async for doc in docs:
+        chunk = buffer.write(separator + _encode(doc))
+        if chunk:
+            yield chunk
+        separator = ","
+    chunk = buffer.write("[]" if separator == "[" else "]")
+    if chunk:
+        yield chunk
+
+
+def _sections(meta: dict) -> tuple[tuple[str, str], ...]:
+    return (
+        (
+            '{"galaxy":{"width":%d,"height":%d,"stars":'
+            % (int(meta.get("width", 0)), int(meta.get("height", 0))),
+            "stars",
+        ),
+        (',"hyperlanes":', "hyperlanes"),
+        (',"resources":', "resources"),
+        (',"countries":', "countries"),
+        ('},"resources":', "resource_definitions"),
+        (',"countries":', "countries"),
+    )
+
+
+def stream_galaxy_json(chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Stream the ``GalaxyResponse`` payload straight from the storage cursors.
+
+    The output matches ``GET /galaxy`` field for field, but each collection is
+    encoded document by document so memory stays bounded by ``chunk_size`` and
+    the cursor batch size rather than by the size of the galaxy.
+    """
+    buffer = _ChunkBuffer(chunk_size)
+    for prefix, collection in _sections(get_galaxy_meta()):
+        chunk = buffer.write(prefix)
+        if chunk:
+            yield chunk
+        yield from _array(buffer, iter_collection(collection))
+    buffer.write("}")
+    chunk = buffer.flush()
+    if chunk:
+        yield chunk
+
+
+async def astream_galaxy_json(chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Async twin of :func:`stream_galaxy_json` reading through ``galaxygen.async_storage``."""
+    buffer = _ChunkBuffer(chunk_size)
+    for prefix, collection in _sections(await async_storage.get_galaxy_meta()):
+        chunk = buffer.write(prefix)
+        if chunk:
+            yield chunk
+        async for chunk in _async_array(buffer, async_storage.iter_docs(collection)):
+            yield chunk
+    buffer.write("}")
+    chunk = buffer.flush()
+    if chunk:
+        yield chunk
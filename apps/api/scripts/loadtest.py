@@ -0,0 +1,90 @@
+"""Concurrent read load test for the sync and async galaxy routes.
+
+Start the API (against a populated database), then run for example::
+
+    python apps/api/scripts/loadtest.py --base-url http://localhost:8000 --concurrency 300
+
+Each path is hammered in turn by ``--concurrency`` client tasks sharing one
+connection pool; throughput and latency percentiles are printed per path.
+Sync routes are bounded by Starlette's threadpool (40 threads by default), so
+the gap widens as concurrency grows past it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = ("/galaxy", "/async/galaxy")
+
+
+async def _worker(client: httpx.AsyncClient, path: str, remaining: list, latencies: list, errors: list):
+    while True:
+        if not remaining:
+            return
+        remaining.pop()
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            response.raise_for_status()
+            await response.aread()
+        except httpx.HTTPError as exc:
+            errors.append(exc)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_path(base_url: str, path: str, concurrency: int, total: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await client.get(path)  # warm caches and connections
+        remaining = list(range(total))
+        latencies: list[float] = []
+        errors: list[Exception] = []
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(_worker(client, path, remaining, latencies, errors) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("paths", nargs="*", default=list(DEFAULT_PATHS))
+    args = parser.parse_args()
+
+    print(f"{'path':<28}{'req/s':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for path in args.paths:
+        result = await run_path(args.base_url, path, args.concurrency, args.requests)
+        print(
+            f"{result['path']:<28}{result['rps']:>10.1f}{result['mean_ms']:>10.2f}"
+            f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+            f"{result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
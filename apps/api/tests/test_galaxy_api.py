@@ -1,15 +1,30 @@
+import asyncio
 import mongomock
 from pathlib import Path
+import random
 import sys
+import time
 
+import numpy as np
+import pytest
 from fastapi.testclient import TestClient
+from PIL import Image
 
 ROOT = Path(__file__).resolve().parents[3]
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
 from apps.api.app.main import app
+from apps.api.app.routes import galaxy as galaxy_routes
+from apps.api.app.services.events import EventBus
+from apps.api.app.services.jobs import job_manager
+from galaxygen import GalaxyArrays, generate_galaxy, generate_galaxy_arrays
+from galaxygen import backends as galaxy_backends
 from galaxygen import db as galaxy_db
+from galaxygen import storage as galaxy_storage
+from galaxygen.geometry import NO_COUNTRY, decode_geometry
+from galaxygen.models import Galaxy
+from galaxygen.stats import GalaxyStats
 
 
 def _reset_mock_db():
@@ -29,6 +44,11 @@ def _setup_mock_mongo(monkeypatch):
     _reset_mock_db()
 
 
+def _setup_sqlite(monkeypatch, tmp_path):
+    monkeypatch.setattr(galaxy_backends, "_backend", None)
+    galaxy_backends.configure_backend("sqlite", path=tmp_path / "galaxy.sqlite3")
+
+
 def test_fetch_empty_galaxy(monkeypatch):
     _setup_mock_mongo(monkeypatch)
     client = _client()
@@ -120,3 +140,599 @@ def test_update_star_meta_and_body(monkeypatch):
     response = client.get("/galaxy")
     payload = response.json()
     assert payload["galaxy"]["stars"][0]["bodies"] == []
+
+
+def test_stream_galaxy_matches_fetch(monkeypatch):
+    _setup_mock_mongo(monkeypatch)
+    client = _client()
+    client.post("/galaxy/star", json={"star": {"x": 1, "y": 2}, "width": 10, "height": 10})
+    client.post("/galaxy/star", json={"star": {"x": 3, "y": 4}, "width": 10, "height": 10})
+    client.post("/galaxy/hyperlane", json={"a": 0, "b": 1})
+    body = {"name": "Body A", "type": "terrestrial", "distance_au": 1.0, "angle_deg": 0, "radius_km": 1000}
+    client.post("/galaxy/star/1/body", json={"body": body})
+
+    response = client.get("/galaxy/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+    assert response.json() == client.get("/galaxy").json()
+
+
+def test_sqlite_backend_star_and_lane_lifecycle(monkeypatch, tmp_path):
+    _setup_sqlite(monkeypatch, tmp_path)
+    client = _client()
+    for x in (1, 3, 5):
+        client.post("/galaxy/star", json={"star": {"x": x, "y": x}, "width": 20, "height": 10})
+    client.post("/galaxy/hyperlane", json={"a": 0, "b": 1})
+    client.post("/galaxy/hyperlane", json={"a": 1, "b": 2})
+    assert client.post("/galaxy/hyperlane", json={"a": 2, "b": 1}).json()["index"] == 1
+
+    assert client.delete("/galaxy/star/0").status_code == 200
+
+    payload = client.get("/galaxy").json()
+    assert payload["galaxy"]["width"] == 20
+    assert [star["x"] for star in payload["galaxy"]["stars"]] == [3, 5]
+    assert payload["galaxy"]["hyperlanes"] == [{"a": 0, "b": 1}]
+    assert client.get("/galaxy/stream").json() == payload
+
+
+@pytest.mark.parametrize("backend", ["mongo", "sqlite"])
+def test_bulk_star_delete(monkeypatch, tmp_path, backend):
+    if backend == "mongo":
+        _setup_mock_mongo(monkeypatch)
+    else:
+        _setup_sqlite(monkeypatch, tmp_path)
+    client = _client()
+    stars = [{"x": x, "y": (x * 3) % 7, "name": f"S{x}", "admin_levels": [x % 2]} for x in range(8)]
+    lanes = [{"a": a, "b": b} for a, b in [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 7), (0, 7), (2, 6)]]
+    resources = [{"id": 0, "systems": [1, 3, 5, 7]}, {"id": 1, "systems": [2, 6]}]
+    galaxy = {"width": 10, "height": 10, "stars": stars, "hyperlanes": lanes, "resources": resources}
+    assert client.post("/galaxy", json={"galaxy": galaxy}).status_code == 200
+    assert client.get("/galaxy/countries/1/systems").json()["systems"] == [1, 3, 5, 7]
+    assert client.get("/galaxy/stats").status_code == 200
+    assert client.get("/galaxy/lod").status_code == 200
+    version = int(client.get("/galaxy").headers["X-Galaxy-Version"])
+    cached = {name: galaxy_routes.galaxy_cache.get(name, lambda: None) for name in ("ownership", "stats", "lod")}
+    assert None not in cached.values()
+
+    response = client.post("/galaxy/stars/delete", json={"indices": [6, 1, 42, 3, 1]}).json()
+    assert response["deleted"] == [1, 3, 6]
+    # The ring 0-7 with chord 2-6 falls apart into {0, 7}, {2} and {4, 5}.
+    [warning] = response["warnings"]
+    assert warning["code"] == "component_split"
+    assert sorted(component["size"] for component in warning["components"]) == [1, 2, 2]
+    expected = Galaxy.model_validate(galaxy)
+    assert expected.remove_stars([1, 3, 6], compact=True).tolist() == [0, -1, 1, -1, 2, 3, -1, 4]
+    payload = client.get("/galaxy").json()["galaxy"]
+    assert [star["name"] for star in payload["stars"]] == [star.name for star in expected.stars]
+    assert payload["hyperlanes"] == [lane.model_dump() for lane in expected.hyperlanes]
+    assert payload["resources"] == [region.model_dump() for region in expected.resources]
+    assert client.get("/galaxy/countries/1/systems").json()["systems"] == [3, 4]
+    # Every cache followed the single ``stars_deleted`` change without a rebuild.
+    for name, value in cached.items():
+        assert galaxy_routes.galaxy_cache.get(name, lambda: None) is value
+    assert client.get("/galaxy/stats").json() == GalaxyStats.from_galaxy(expected).summary()
+    assert [change["op"] for change in client.get(f"/galaxy/changes?since={version}").json()["changes"]] == [
+        "stars_deleted"
+    ]
+    assert client.post("/galaxy/stars/delete", json={"indices": [99]}).status_code == 404
+
+
+def test_fetch_galaxy_is_cached_until_version_changes(monkeypatch):
+    _setup_mock_mongo(monkeypatch)
+    client = _client()
+    loads = []
+
+    def counting_load_galaxy(path=None):
+        loads.append(1)
+        return galaxy_storage.load_galaxy(path)
+
+    monkeypatch.setattr(galaxy_routes, "load_galaxy", counting_load_galaxy)
+    client.post("/galaxy/star", json={"star": {"x": 1, "y": 2}, "width": 10, "height": 10})
+    _, version = galaxy_storage.get_galaxy_version()
+
+    first = client.get("/galaxy").json()
+    assert client.get("/galaxy").json() == first
+    assert len(loads) == 1
+
+    client.patch("/galaxy/star/0/meta", json={"name": "Nova"})
+    assert galaxy_storage.get_galaxy_version()[1] == version + 1
+    assert client.get("/galaxy").json()["galaxy"]["stars"][0]["name"] == "Nova"
+    assert len(loads) == 2
+
+
+def test_async_routes_match_sync_routes(monkeypatch):
+    _setup_mock_mongo(monkeypatch)
+    # mongomock has no async client; exercise the threaded fallback instead.
+    monkeypatch.setenv("GALAXYGEN_ASYNC_MONGO", "0")
+    client = _client()
+    client.post("/galaxy/star", json={"star": {"x": 1, "y": 2}, "width": 10, "height": 10})
+    client.post("/galaxy/star", json={"star": {"x": 3, "y": 4}, "width": 10, "height": 10})
+    client.post("/galaxy/hyperlane", json={"a": 0, "b": 1})
+
+    expected = client.get("/galaxy").json()
+    assert client.get("/async/galaxy").json() == expected
+    assert client.get("/async/galaxy/stream").json() == expected
+    assert client.get("/async/galaxy/star/1").json()["star"]["x"] == 3
+    assert client.get("/async/galaxy/star/5").status_code == 404
+
+
+def test_viewport_queries(monkeypatch):
+    _setup_mock_mongo(monkeypatch)
+    client = _client()
+    for x, y in ((1, 1), (5, 5), (9, 9), (20, 1)):
+        client.post("/galaxy/star", json={"star": {"x": x, "y": y, "name": f"S{x}"}, "width": 30, "height": 30})
+    client.post("/galaxy/hyperlane", json={"a": 0, "b": 1})
+    client.post("/galaxy/hyperlane", json={"a": 2, "b": 3})
+    client.post("/galaxy/hyperlane", json={"a": 0, "b": 3})
+
+    response = client.get("/galaxy/stars", params={"bbox": "6,0,0,6"})
+    assert response.status_code == 200
+    stars = response.json()["stars"]
+    assert [star["idx"] for star in stars] == [0, 1]
+    assert stars[1]["name"] == "S5"
+
+    stars = client.get("/galaxy/stars", params={"bbox": "0,0,10,10", "fields": "x"}).json()["stars"]
+    assert stars == [{"idx": 0, "x": 1}, {"idx": 1, "x": 5}, {"idx": 2, "x": 9}]
+    stars = client.get("/galaxy/stars", params={"bbox": "0,0,2,2", "fields": "name"}).json()["stars"]
+    assert stars == [{"idx": 0, "name": "S1"}]
+
+    lanes = client.get("/galaxy/hyperlanes", params={"bbox": "12,0,14,3"}).json()["hyperlanes"]
+    assert lanes == [{"idx": 2, "a": 0, "b": 3}]
+
+    assert client.get("/galaxy/stars", params={"bbox": "1,2,3"}).status_code == 400
+    assert client.get("/galaxy/stars", params={"bbox": "0,0,1,1", "fields": "bogus"}).status_code == 400
+
+
+def test_lod_clusters_follow_edits(monkeypatch):
+    _setup_mock_mongo(monkeypatch)
+    client = _client()
+    for x, y in ((1, 1), (5, 5), (20, 1)):
+        client.post("/galaxy/star", json={"star": {"x": x, "y": y, "star_type": "M"}, "width": 30, "height": 30})
+    client.post("/galaxy/hyperlane", json={"a": 0, "b": 2})
+
+    body = client.get("/galaxy/lod", params={"level": 1}).json()
+    assert body["cell_size"] == 16
+    assert body["clusters"] == [
+        {"cell": [0, 0], "count": 2, "centroid": [3.0, 3.0], "star_type": "M", "country": None},
+        {"cell": [1, 0], "count": 1, "centroid": [20.0, 1.0], "star_type": "M", "country": None},
+    ]
+    assert body["bundles"] == [{"a": [0, 0], "b": [1, 0], "count": 1}]
+    lod = galaxy_routes.galaxy_cache.get("lod", lambda: None)
+
+    client.post("/galaxy/star", json={"star": {"x": 3, "y": 20, "admin_levels": [7]}, "width": 30, "height": 30})
+    client.delete("/galaxy/star/0")
+    body = client.get("/galaxy/lod", params={"level": 1}).json()
+    assert galaxy_routes.galaxy_cache.get("lod", lambda: None) is lod
+    assert [(c["cell"], c["count"], c["country"]) for c in body["clusters"]] == [
+        ([0, 0], 1, None),
+        ([1, 0], 1, None),
+        ([0, 1], 1, 7),
+    ]
+    assert body["bundles"] == []
+    assert client.get("/galaxy/lod", params={"level": 99}).status_code == 400
+
+
+def test_geometry_blob(monkeypatch):
+    _setup_mock_mongo(monkeypatch)
+    client = _client()
+    client.post("/galaxy/star", json={"star": {"x": 3, "y": 4, "star_type": "O"}, "width": 20, "height": 10})
+    client.post("/galaxy/star", json={"star": {"x": 7, "y": 1, "admin_levels": [5]}, "width": 20, "height": 10})
+    client.post("/galaxy/hyperlane", json={"a": 0, "b": 1})
+
+    response = client.get("/galaxy/geometry.bin")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    geometry = decode_geometry(response.content)
+    assert (geometry["width"], geometry["height"]) == (20, 10)
+    assert geometry["positions"].tolist() == [[3.0, 4.0], [7.0, 1.0]]
+    assert geometry["star_types"].tolist() == [0, 4]
+    assert geometry["lanes"].tolist() == [[0, 1]]
+    assert geometry["countries"].tolist() == [NO_COUNTRY, 5]
+
+
+def test_changes_since_version(monkeypatch):
+    _setup_mock_mongo(monkeypatch)
+    client = _client()
+    for x in (1, 2):
+        client.post("/galaxy/star", json={"star": {"x": x, "y": x}, "width": 10, "height": 10})
+    response = client.get("/galaxy")
+    epoch, version = response.headers["X-Galaxy-Epoch"], int(response.headers["X-Galaxy-Version"])
+
+    client.patch("/galaxy/star/0/meta", json={"name": "Nova"})
+    client.post("/galaxy/hyperlane", json={"a": 0, "b": 1})
+    client.delete("/galaxy/star/1")
+
+    body = client.get("/galaxy/changes", params={"since": version, "epoch": epoch}).json()
+    assert body["reset"] is False and body["more"] is False
+    assert body["version"] == version + 3
+    assert [change["op"] for change in body["changes"]] == ["star_fields_updated", "hyperlane_added", "star_deleted"]
+    assert body["changes"][0] == {"version": version + 1, "op": "star_fields_updated", "idx": 0, "fields": {"name": "Nova"}}
+    assert body["changes"][1]["a"] == 0 and body["changes"][1]["b"] == 1
+
+    page = client.get("/galaxy/changes", params={"since": version, "limit": 1}).json()
+    assert len(page["changes"]) == 1 and page["more"] is True
+    assert client.get("/galaxy/changes", params={"since": version + 3}).json()["changes"] == []
+    assert client.get("/galaxy/changes", params={"since": version, "epoch": "stale"}).json()["reset"] is True
+    assert client.get("/galaxy/changes", params={"since": version + 10}).json()["reset"] is True
+
+
+def test_graph_analytics(monkeypatch):
+    _setup_mock_mongo(monkeypatch)
+    client = _client()
+    for x in range(5):
+        client.post("/galaxy/star", json={"star": {"x": x, "y": x}, "width": 10, "height": 10})
+    for a, b in ((0, 1), (1, 2), (2, 3), (1, 0)):
+        client.post("/galaxy/hyperlane", json={"a": a, "b": b})
+
+    summary = client.get("/galaxy/graph").json()
+    assert summary["lanes"] == 3 and summary["components"] == 2
+    assert summary["component_sizes"] == [4, 1]
+
+    ranking = client.get("/galaxy/graph/betweenness", params={"samples": 0, "top": 2}).json()["systems"]
+    assert {entry["idx"] for entry in ranking} == {1, 2}
+    assert ranking[0]["value"] == pytest.approx(2 / 6)
+
+    chokepoints = client.get("/galaxy/graph/chokepoints", params={"samples": 0}).json()
+    assert chokepoints["articulation_points"] == [1, 2]
+    assert chokepoints["bridges"] == [[0, 1], [1, 2], [2, 3]]
+    assert chokepoints["systems"][0]["stress"] == pytest.approx(2.0)
+
+    # Only the default sampling is cached; client-chosen seeds are not kept.
+    for seed in range(1, 4):
+        client.get("/galaxy/graph/betweenness", params={"seed": seed})
+        client.get("/galaxy/graph/chokepoints", params={"seed": seed})
+    client.get("/galaxy/graph/betweenness")
+    cached = [name for name in galaxy_routes.galaxy_cache._entries if name.split(":")[0] in ("betweenness", "chokepoints")]
+    assert cached == ["betweenness:None"]
+
+    hops = client.get("/galaxy/graph/distances", params={"source": 0}).json()["distances"]
+    assert hops == [{"idx": i, "hops": i} for i in range(4)]
+    assert client.get("/galaxy/graph/distances", params={"source": 9}).status_code == 404
+
+
+def test_route_planner(monkeypatch):
+    _setup_mock_mongo(monkeypatch)
+    client = _client()
+    for x, y in ((0, 0), (3, 4), (6, 0), (3, 1), (9, 9)):
+        client.post("/galaxy/star", json={"star": {"x": x, "y": y}, "width": 10, "height": 10})
+    for a, b in ((0, 1), (1, 2), (0, 3), (3, 2)):
+        client.post("/galaxy/hyperlane", json={"a": a, "b": b})
+
+    route = client.get("/galaxy/route", params={"from": 0, "to": 2}).json()
+    assert route["stars"] == [0, 3, 2] and route["hops"] == 2
+    assert route["cost"] == pytest.approx(2 * 10 ** 0.5)
+    assert client.get("/galaxy/route", params={"from": 0, "to": 4}).status_code == 404
+
+    client.delete("/galaxy/hyperlane/3")
+    assert client.get("/galaxy/route", params={"from": 0, "to": 2}).json()["stars"] == [0, 1, 2]
+
+
+def test_country_systems_follow_edits(monkeypatch):
+    _setup_mock_mongo(monkeypatch)
+    client = _client()
+    for x, levels in ((1, [3, 1]), (2, []), (3, [3, 2]), (4, [5])):
+        client.post("/galaxy/star", json={"star": {"x": x, "y": x, "admin_levels": levels}, "width": 10, "height": 10})
+
+    def systems(country, level=0):
+        return client.get(f"/galaxy/countries/{country}/systems", params={"level": level}).json()["systems"]
+
+    assert systems(3) == [0, 2] and systems(2, level=1) == [2] and systems(9) == []
+    ownership = galaxy_routes.galaxy_cache.get("ownership", lambda: None)
+
+    client.patch("/galaxy/star/1", json={"star": {"x": 2, "y": 2, "admin_levels": [3]}})
+    client.delete("/galaxy/star/0")
+    client.post("/galaxy/star", json={"star": {"x": 5, "y": 5, "admin_levels": [5]}, "width": 10, "height": 10})
+    assert systems(3) == [0, 1] and systems(5) == [2, 3] and systems(1, level=1) == []
+    assert galaxy_routes.galaxy_cache.get("ownership", lambda: None) is ownership
+    assert client.get("/galaxy/countries/3/systems", params={"level": 4}).status_code == 400
+
+
+def test_edits_warn_when_they_split_components(monkeypatch):
+    _setup_mock_mongo(monkeypatch)
+    client = _client()
+    for x in range(6):
+        client.post("/galaxy/star", json={"star": {"x": x, "y": x}, "width": 10, "height": 10})
+    for a, b in ((0, 1), (1, 2), (2, 0), (2, 3), (3, 4)):
+        client.post("/galaxy/hyperlane", json={"a": a, "b": b})
+
+    assert client.get("/galaxy/connected", params={"a": 0, "b": 4}).json()["connected"] is True
+    assert client.get("/galaxy/star/5/component").json()["size"] == 1
+    assert client.get("/galaxy/connected", params={"a": 0, "b": 9}).status_code == 404
+
+    assert client.delete("/galaxy/hyperlane/0").json()["warnings"] == []
+    response = client.delete("/galaxy/hyperlane/2").json()
+    assert response["ok"] is True
+    [warning] = response["warnings"]
+    assert warning["code"] == "component_split"
+    assert warning["components"] == [{"star": 2, "size": 3}, {"star": 3, "size": 2}]
+    assert client.get("/galaxy/connected", params={"a": 0, "b": 4}).json()["connected"] is False
+
+    client.post("/galaxy/hyperlane", json={"a": 4, "b": 5})
+    response = client.delete("/galaxy/star/4").json()
+    assert response["warnings"][0]["components"] == [{"star": 3, "size": 1}, {"star": 4, "size": 1}]
+    component = client.get("/galaxy/star/0/component").json()
+    assert component["size"] == 3 and component["components"] == 3
+
+
+def test_territory_borders_and_neighbors(monkeypatch):
+    _setup_mock_mongo(monkeypatch)
+    client = _client()
+    for x, y, country in ((2, 2, 1), (2, 8, 1), (8, 3, 2), (8, 9, 2)):
+        star = {"x": x, "y": y, "admin_levels": [country]}
+        client.post("/galaxy/star", json={"star": star, "width": 10, "height": 10})
+
+    borders = client.get("/galaxy/territory/borders").json()
+    assert borders["pairs"] == [[1, 2]] and borders["offsets"] == [0, 4]
+    points = borders["points"]
+    assert (points[0], points[1]) == (4.75, 10.0) and (points[-2], points[-1]) == (5.42, 0.0)
+    assert borders["lengths"][0] == pytest.approx(10.43)
+    neighbors = client.get("/galaxy/territory/neighbors").json()["countries"]
+    assert neighbors == [
+        {"id": 1, "neighbors": [2], "border_length": 10.43},
+        {"id": 2, "neighbors": [1], "border_length": 10.43},
+    ]
+    territory = galaxy_routes.galaxy_cache.get("territory", lambda: None)
+
+    client.patch("/galaxy/star/0", json={"star": {"x": 2, "y": 2}})
+    borders = client.get("/galaxy/territory/borders", params={"country": 2}).json()
+    assert borders["pairs"] == [[-1, 2], [1, 2]]
+    assert galaxy_routes.galaxy_cache.get("territory", lambda: None) is territory
+    assert client.get("/galaxy/territory/neighbors", params={"level": 4}).status_code == 400
+
+
+@pytest.mark.parametrize(
+    "countries, pairs, neighbors",
+    [
+        ([1, 1, 2], [[1, 2]], {1: [2], 2: [1]}),
+        ([1, 2, 1, 3], [[1, 2], [1, 2], [1, 3]], {1: [2, 3], 2: [1], 3: [1]}),
+    ],
+)
+def test_territory_of_collinear_stars(monkeypatch, countries, pairs, neighbors):
+    _setup_mock_mongo(monkeypatch)
+    client = _client()
+    # Stars on one diagonal, listed out of order along it.
+    stars = [{"x": 8 - 2 * i, "y": 8 - 2 * i, "admin_levels": [country]} for i, country in enumerate(countries)]
+    galaxy = {"width": 10, "height": 10, "stars": stars, "hyperlanes": []}
+    assert client.post("/galaxy", json={"galaxy": galaxy}).status_code == 200
+
+    borders = client.get("/galaxy/territory/borders").json()
+    assert borders["pairs"] == pairs
+    # Each border is the bisector x + y = const of two neighbouring stars,
+    # cut at the map edges.
+    assert np.diff(borders["offsets"]).tolist() == [2] * len(pairs)
+    ends = np.array(borders["points"]).reshape(-1, 2, 2).sum(axis=2)
+    assert np.allclose(ends[:, 0], ends[:, 1])
+    assert sorted(np.round(ends[:, 0]).tolist()) == sorted(
+        14 - 4 * i for i in range(len(countries) - 1) if countries[i] != countries[i + 1]
+    )
+    response = client.get("/galaxy/territory/neighbors").json()["countries"]
+    assert {country["id"]: country["neighbors"] for country in response} == neighbors
+
+
+def test_stats_follow_edits(monkeypatch):
+    _setup_mock_mongo(monkeypatch)
+    client = _client()
+    body = {"name": "Body A", "type": "terrestrial", "distance_au": 1.0, "angle_deg": 0, "radius_km": 1000}
+    stars = [
+        {"x": 2, "y": 2, "star_type": "M", "admin_levels": [1], "bodies": [body, body]},
+        {"x": 8, "y": 2, "star_type": "M", "admin_levels": [1]},
+        {"x": 5, "y": 8, "star_type": "O", "admin_levels": [4], "bodies": [body]},
+    ]
+    galaxy = {"width": 10, "height": 10, "stars": stars, "hyperlanes": [], "resources": [{"id": 0, "systems": [0, 2]}]}
+    assert client.post("/galaxy", json={"galaxy": galaxy}).status_code == 200
+
+    stats = client.get("/galaxy/stats").json()
+    assert (stats["stars"], stats["owned"], stats["with_resources"], stats["bodies"]) == (3, 3, 2, 3)
+    assert stats["star_types"]["M"] == 2 and stats["star_types"]["O"] == 1
+    countries = {entry["id"]: entry for entry in stats["countries"]}
+    assert countries[1]["systems"] == 2 and countries[1]["bodies"] == 2
+    assert countries[1]["star_types"]["M"] == 2
+    assert countries[1]["area"] + countries[4]["area"] == pytest.approx(stats["area"])
+    assert [(entry["id"], entry["systems"], entry["bodies"]) for entry in stats["resources"]] == [(0, 2, 3)]
+
+    client.delete("/galaxy/star/0")
+    client.patch("/galaxy/star/0/meta", json={"star_type": "G"})
+    stats = client.get("/galaxy/stats").json()
+    assert stats["stars"] == 2 and stats["bodies"] == 1
+    assert [(entry["id"], entry["systems"]) for entry in stats["countries"]] == [(1, 1), (4, 1)]
+    assert stats["star_types"]["G"] == 1 and stats["star_types"]["M"] == 0
+    assert stats["resources"][0]["systems"] == 1
+
+
+def test_galaxy_arrays_round_trip(tmp_path):
+    body = {"name": "Ring", "type": "asteroid_belt", "distance_au": 2.5, "angle_deg": 30, "radius_km": 10, "color": [1, 2, 3]}
+    timeline = {"events": [{"year": 12, "type": "founded", "data": {"by": "A"}}]}
+    stars = [
+        {"x": 2, "y": 2, "name": "Sol", "star_type": "K", "admin_levels": [1], "bodies": [body, {**body, "color": None}]},
+        {"x": 8, "y": 2, "admin_levels": [None, 2, None, None, 5], "timeline": timeline},
+        {"x": 5, "y": 8, "star_type": "O", "admin_levels": []},
+    ]
+    galaxy = Galaxy.model_validate(
+        {"width": 10, "height": 10, "stars": stars, "hyperlanes": [{"a": 0, "b": 1}, {"a": 1, "b": 2}],
+         "resources": [{"id": 0, "systems": [0, 2]}], "countries": [{"name": "A", "color": [1, 2, 3]}]}
+    )
+    arrays = GalaxyArrays.from_galaxy(galaxy)
+    assert arrays.to_galaxy() == galaxy
+    assert [star.to_star() for star in arrays.stars] == galaxy.stars
+    assert arrays.ownership().systems(1, level=0).tolist() == [0]
+    assert arrays.neighbors(1).tolist() == [0, 2]
+
+    view = arrays.stars[1]
+    view.name, view.admin_levels = "Vega", [3]
+    assert arrays.to_galaxy().stars[1].name == "Vega" and arrays.stars[1].admin_levels == [3]
+
+    # Replacing one star splices its bodies; the other stars' bodies stay put.
+    edited = arrays.to_galaxy()
+    edited.stars[0] = edited.stars[0].model_copy(update={"bodies": [edited.stars[0].bodies[1]]})
+    edited.stars[1] = edited.stars[1].model_copy(update={"bodies": [edited.stars[0].bodies[0]] * 3})
+    arrays.set_star(0, edited.stars[0])
+    arrays.set_star(1, edited.stars[1])
+    assert arrays.body_count().tolist() == [1, 3, 0]
+    assert arrays.to_galaxy() == edited
+
+    distribution = tmp_path / "distribution.png"
+    Image.new("RGB", (48, 48), (255, 255, 255)).save(distribution)
+    # Names come from the global ``random``; seed it the same for both runs.
+    random.seed(7)
+    generated = generate_galaxy_arrays(distribution, 12, rng_seed=3)
+    assert len(generated) == 12 and generated.body_count().sum() > 0
+    random.seed(7)
+    assert generate_galaxy(distribution, 12, rng_seed=3) == generated.to_galaxy()
+
+
+def test_event_socket_pushes_edits(monkeypatch):
+    _setup_mock_mongo(monkeypatch)
+    monkeypatch.setenv("GALAXYGEN_ASYNC_MONGO", "0")
+    client = _client()
+    client.post("/galaxy/star", json={"star": {"x": 1, "y": 1}, "width": 10, "height": 10})
+
+    with client.websocket_connect("/galaxy/events") as socket:
+        hello = socket.receive_json()
+        assert hello["op"] == "hello"
+        client.patch("/galaxy/star/0/meta", json={"name": "Nova"})
+        events = socket.receive_json()["events"]
+        assert events[0]["op"] == "star_fields_updated"
+        assert events[0]["fields"] == {"name": "Nova"}
+        assert events[0]["version"] == hello["version"] + 1
+
+
+def test_subscription_coalesces_and_resyncs():
+    async def scenario():
+        bus = EventBus(max_pending=2)
+        with bus.subscribe() as subscription:
+            edit = {"epoch": "e", "op": "star_fields_updated", "idx": 3}
+            bus.publish({**edit, "version": 1, "fields": {"name": "A"}})
+            bus.publish({**edit, "version": 2, "fields": {"description": "B"}})
+            await asyncio.sleep(0)
+            assert await subscription.next_batch() == [
+                {**edit, "version": 2, "fields": {"name": "A", "description": "B"}}
+            ]
+            for version in range(3, 7):
+                bus.publish({"epoch": "e", "op": "hyperlane_added", "version": version, "idx": version, "a": 0, "b": 1})
+            await asyncio.sleep(0)
+            assert await subscription.next_batch() == [{"op": "resync", "epoch": "e", "version": 6}]
+
+    asyncio.run(scenario())
+
+
+def test_batch_applies_operations_together(monkeypatch, tmp_path):
+    _setup_sqlite(monkeypatch, tmp_path)
+    client = _client()
+    for x in (1, 2, 3):
+        client.post("/galaxy/star", json={"star": {"x": x, "y": x}, "width": 10, "height": 10})
+    client.post("/galaxy/hyperlane", json={"a": 0, "b": 1})
+    _, version = galaxy_storage.get_galaxy_version()
+    body = {"name": "Moon", "type": "terrestrial", "distance_au": 1.0, "angle_deg": 0.0, "radius_km": 1700.0}
+
+    rejected = client.post(
+        "/galaxy/batch",
+        json={"operations": [
+            {"op": "update_star_meta", "idx": 0, "name": "Alpha"},
+            {"op": "delete_body", "idx": 1, "body_idx": 0},
+            {"op": "add_hyperlane", "a": 2, "b": 2},
+        ]},
+    )
+    assert rejected.status_code == 400
+    assert [error["index"] for error in rejected.json()["detail"]["errors"]] == [1, 2]
+    assert galaxy_storage.get_galaxy_version()[1] == version
+
+    response = client.post(
+        "/galaxy/batch",
+        json={"operations": [
+            {"op": "update_star_meta", "idx": 0, "name": "Alpha"},
+            {"op": "set_admin_level", "idx": 1, "level": 0, "country": 4},
+            {"op": "set_admin_level", "idx": 2, "level": 0, "country": 4},
+            {"op": "add_body", "idx": 2, "body": body},
+            {"op": "add_hyperlane", "a": 1, "b": 2},
+            {"op": "delete_hyperlane", "idx": 0},
+            {"op": "add_hyperlane", "a": 2, "b": 1},
+        ]},
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[3] == {"index": 0}
+    assert results[4] == {"index": 1, "created": True}
+    assert results[6] == {"index": 0, "created": False}
+
+    galaxy = client.get("/galaxy").json()["galaxy"]
+    assert galaxy["stars"][0]["name"] == "Alpha"
+    assert [star["admin_levels"][0] for star in galaxy["stars"]] == [None, 4, 4]
+    assert galaxy["stars"][2]["bodies"][0]["name"] == "Moon"
+    assert galaxy["hyperlanes"] == [{"a": 1, "b": 2}]
+    changes = client.get("/galaxy/changes", params={"since": version}).json()["changes"]
+    assert [change["op"] for change in changes] == ["batch"]
+
+    # An empty meta update is valid and leaves its star alone.
+    _, version = galaxy_storage.get_galaxy_version()
+    empty = client.post(
+        "/galaxy/batch",
+        json={"operations": [
+            {"op": "update_star_meta", "idx": 1},
+            {"op": "update_star_meta", "idx": 0, "description": "Home"},
+        ]},
+    )
+    assert empty.status_code == 200 and empty.json()["results"] == [{"ok": True}, {"ok": True}]
+    changes = client.get("/galaxy/changes", params={"since": version}).json()["changes"]
+    assert [change["idx"] for change in changes[0]["changes"]] == [0]
+    assert client.post("/galaxy/batch", json={"operations": [{"op": "update_star_meta", "idx": 2}]}).status_code == 200
+
+
+def test_generate_job_runs_in_background(monkeypatch, tmp_path):
+    _setup_mock_mongo(monkeypatch)
+    client = _client()
+    distribution = tmp_path / "distribution.png"
+    Image.new("RGB", (48, 48), (255, 255, 255)).save(distribution)
+    request = {"system_count": 12, "seed": 3, "distribution_path": str(distribution), "use_resources": False}
+
+    submitted = client.post("/jobs/generate", json=request)
+    assert submitted.status_code == 202
+    job_id = submitted.json()["id"]
+    assert client.post("/jobs/generate", json=request).json()["id"] == job_id
+
+    deadline = time.time() + 120
+    job = submitted.json()
+    while job["status"] not in ("succeeded", "failed") and time.time() < deadline:
+        time.sleep(0.2)
+        job = client.get(f"/jobs/{job_id}").json()
+    assert job["status"] == "succeeded", job["error"]
+    assert job["progress"] == 100
+    assert job["result"]["star_count"] == galaxy_storage.get_star_count() > 0
+    assert client.get("/jobs/missing").status_code == 404
+
+
+def test_render_job_loads_galaxy_in_worker(monkeypatch, tmp_path):
+    _setup_sqlite(monkeypatch, tmp_path)
+    with TestClient(app) as client:
+        for x in (1, 4, 7):
+            client.post("/galaxy/star", json={"star": {"x": x, "y": x}, "width": 10, "height": 10})
+        request = {"output_dir": str(tmp_path / "render")}
+        submitted = client.post("/jobs/render", json=request)
+        assert submitted.status_code == 202
+        assert client.post("/jobs/render", json=request).json()["id"] == submitted.json()["id"]
+
+        deadline = time.time() + 120
+        job = submitted.json()
+        while job["status"] not in ("succeeded", "failed") and time.time() < deadline:
+            time.sleep(0.2)
+            job = client.get(f"/jobs/{job['id']}").json()
+        assert job["status"] == "succeeded", job["error"]
+        assert Path(job["result"]["final"]).exists()
+    # Leaving the client runs the app's shutdown, which stops the pool.
+    assert job_manager._pool is None
+
+
+def test_metrics_exposition(monkeypatch):
+    _setup_mock_mongo(monkeypatch)
+    client = _client()
+    client.post("/galaxy/star", json={"star": {"x": 1, "y": 1}, "width": 10, "height": 10})
+    client.get("/galaxy")
+    client.get("/galaxy")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert "# TYPE asarto_http_request_duration_seconds histogram" in text
+    assert 'asarto_http_request_duration_seconds_count{method="POST",route="/galaxy/star",status="200"}' in text
+    assert 'asarto_galaxy_cache_requests_total{entry="galaxy_response",result="hit"}' in text
+    assert 'galaxygen_storage_operation_seconds_bucket{operation="add_star",le="+Inf"}' in text
@@ -0,0 +1,234 @@
+import json
+from pathlib import Path
+import sys
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+from typer.testing import CliRunner
+
+ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from galaxygen import backends as galaxy_backends
+from galaxygen import cli as galaxy_cli
+from galaxygen import storage as galaxy_storage
+from galaxygen.columnar import export_columnar, is_columnar, load_columnar, open_columnar
+from galaxygen.expansion import ExpansionPlanner
+from galaxygen.graph import GalaxyGraph
+from galaxygen.models import Galaxy, Hyperlane, Star
+from galaxygen.ownership import OwnershipIndex
+from galaxygen.profiling import Profiler, span, traced
+
+
+def _galaxy() -> Galaxy:
+    body = {"name": "Ring", "type": "asteroid_belt", "distance_au": 2.5, "angle_deg": 30, "radius_km": 10}
+    stars = [
+        {"x": 2, "y": 2, "name": "Sol", "star_type": "K", "admin_levels": [0], "bodies": [body]},
+        {"x": 8, "y": 3, "admin_levels": [None, 2, None, None, 5]},
+        {"x": 5, "y": 8, "star_type": "O", "admin_levels": []},
+        {"x": 1, "y": 9, "admin_levels": [1, None, 3, None]},
+    ]
+    return Galaxy.model_validate(
+        {
+            "width": 10,
+            "height": 10,
+            "stars": stars,
+            "hyperlanes": [{"a": 0, "b": 1}, {"a": 1, "b": 2}, {"a": 2, "b": 3}],
+            "resources": [{"id": 0, "systems": [0, 2]}, {"id": 1, "systems": []}],
+            "countries": [{"name": "A", "color": [200, 10, 10]}, {"name": "B", "color": [10, 200, 10]}],
+        }
+    )
+
+
+def test_columnar_round_trip(tmp_path):
+    galaxy = _galaxy()
+    path = export_columnar(galaxy, tmp_path / "galaxy")
+    assert is_columnar(path) and not is_columnar(tmp_path)
+    assert load_columnar(path) == galaxy
+    opened = open_columnar(path)
+    assert len(opened) == 4 and opened.star(1).admin_levels == [None, 2, None, None, 5]
+    assert opened.star(2).admin_levels == [] and opened.resource_systems_for(0).tolist() == [0, 2]
+    assert open_columnar(path, mmap=False).to_galaxy() == galaxy
+
+    empty = Galaxy(width=0, height=0, stars=[], hyperlanes=[])
+    assert load_columnar(export_columnar(empty, tmp_path / "empty")) == empty
+
+
+def test_remove_stars_keeps_placeholders():
+    galaxy = _galaxy()
+    galaxy.hyperlanes.append(Hyperlane(a=3, b=1))
+    galaxy.resources[1].systems = [3, 2]
+    assert OwnershipIndex.from_stars(galaxy.stars).systems(0).tolist() == [0]
+
+    mapping = galaxy.remove_stars([2, 0, 42])
+    assert mapping.tolist() == [-1, 1, -1, 3]
+    # Removed stars stay behind as placeholders, so no index moves.
+    assert len(galaxy.stars) == 4 and galaxy.stars[0] == galaxy.stars[2] == Star(x=-1, y=-1)
+    assert galaxy.stars[3].admin_levels == [1, None, 3, None]
+    assert [lane.as_pair() for lane in galaxy.hyperlanes] == [[3, 1]]
+    assert [region.systems for region in galaxy.resources] == [[], [3]]
+    ownership = OwnershipIndex.from_stars(galaxy.stars)
+    assert ownership.systems(0).tolist() == [] and ownership.systems(1).tolist() == [3]
+    assert ownership.systems(2, level=1).tolist() == [1]
+
+
+def test_cli_export_import_and_render_columnar(monkeypatch, tmp_path):
+    monkeypatch.setattr(galaxy_backends, "_backend", None)
+    database = tmp_path / "galaxy.sqlite3"
+    runner = CliRunner()
+
+    def invoke(*args):
+        result = runner.invoke(galaxy_cli.app, ["--storage", "sqlite", "--sqlite-path", str(database), *args])
+        assert result.exit_code == 0, result.output
+        return result.output
+
+    galaxy = _galaxy()
+    galaxy_backends.configure_backend("sqlite", path=database)
+    galaxy_storage.save_galaxy(None, galaxy)
+    invoke("export", str(tmp_path / "columnar"))
+    assert load_columnar(tmp_path / "columnar") == galaxy
+    assert "4 stars | 3 hyperlanes | 2 resources | 2 countries" in invoke("info", "--galaxy", str(tmp_path / "columnar"))
+
+    galaxy_storage.save_galaxy(None, Galaxy(width=0, height=0, stars=[], hyperlanes=[]))
+    invoke("import", str(tmp_path / "columnar"))
+    assert galaxy_storage.load_galaxy() == galaxy
+
+    # Rendering a columnar directory colours countries from its own meta,
+    # not from the (now different) countries in storage.
+    galaxy_storage.save_country_definitions(None, [])
+    output = tmp_path / "render"
+    invoke("render", "--galaxy", str(tmp_path / "columnar"), "-o", str(output), "-d", str(tmp_path / "none.png"))
+    image = Image.open(output / "output.png").convert("RGB")
+    raw = Image.open(output / "output_raw.png").convert("RGB")
+    assert image.tobytes() != raw.tobytes()
+
+
+def test_profiler_aggregates_nested_spans(tmp_path):
+    @traced("outer")
+    def outer():
+        for _ in range(3):
+            with span("inner"):
+                time.sleep(0.002)
+
+    assert outer() is None  # spans are no-ops without an active profiler
+    with Profiler(memory=False) as profiler:
+        outer()
+        outer()
+    stats = profiler.root.children["outer"]
+    assert (profiler.root.calls, stats.calls, stats.children["inner"].calls) == (1, 2, 6)
+    assert stats.wall >= stats.children["inner"].wall >= 0.012
+
+    folded = dict(line.rsplit(" ", 1) for line in profiler.folded().splitlines())
+    assert set(folded) <= {"total", "total;outer", "total;outer;inner"}
+    assert int(folded["total;outer;inner"]) >= 12_000
+    assert "inner" in profiler.report().splitlines()[4]
+
+    profiler.write(tmp_path / "profile.folded")
+    assert (tmp_path / "profile.folded").read_text() == profiler.folded()
+    profiler.write(tmp_path / "profile.json")
+    assert json.loads((tmp_path / "profile.json").read_text())["children"][0]["name"] == "outer"
+
+
+def test_cli_profile_flag(monkeypatch, tmp_path):
+    monkeypatch.setattr(galaxy_backends, "_backend", None)
+    distribution = tmp_path / "distribution.png"
+    Image.new("RGB", (48, 48), (255, 255, 255)).save(distribution)
+    folded = tmp_path / "generate.folded"
+    result = CliRunner().invoke(
+        galaxy_cli.app,
+        ["--storage", "sqlite", "--sqlite-path", str(tmp_path / "galaxy.sqlite3"), "generate", "12",
+         "-d", str(distribution), "--seed", "3", "--profile-output", str(folded)],
+    )
+    assert result.exit_code == 0, result.output
+    assert "generate_galaxy" in result.stderr and "peak MiB" in result.stderr
+    stacks = [line.rsplit(" ", 1)[0] for line in folded.read_text().splitlines()]
+    assert "total;generate_galaxy;systems;system_profile" in stacks
+
+
+def test_betweenness_on_paths_longer_than_int16():
+    # One sampled source on a 33k-star chain; seed 757 samples an end star,
+    # so shortest paths run past 32767 hops.
+    n = 33_000
+    graph = GalaxyGraph(n, np.stack([np.arange(n - 1), np.arange(1, n)], axis=1))
+    source = int(np.random.default_rng(757).choice(n, size=1, replace=False)[0])
+    assert max(source, n - 1 - source) > 32_767
+    stars = np.arange(n)
+    expected = np.where(stars > source, n - 1 - stars, stars).astype(float)
+    expected[source] = 0.0
+    values = graph.betweenness(samples=1, seed=757, normalized=False)
+    assert np.allclose(values, expected * n / 2)
+
+
+class _RecordingPlanner(ExpansionPlanner):
+    """Records the systems of every state that makes the beam, per level."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.levels = []
+
+    def _extend(self, state, star, score, borders):
+        extended = super()._extend(state, star, score, borders)
+        while len(self.levels) < len(extended.added):
+            self.levels.append([])
+        self.levels[len(extended.added) - 1].append(extended.added)
+        return extended
+
+
+def _score_exhaustively(graph, owned, blocked, depth, penalty):
+    def score(claimed):
+        borders = sum(any(n not in claimed for n in graph.neighbors(star)) for star in claimed)
+        return len(claimed) - penalty * borders
+
+    best = score(frozenset(owned))
+    level = {frozenset(owned)}
+    for _ in range(depth):
+        level = {
+            claimed | {n}
+            for claimed in level
+            for star in claimed
+            for n in graph.neighbors(star).tolist()
+            if n not in claimed and n not in blocked
+        }
+        best = max([best, *(score(claimed) for claimed in level)])
+    return best
+
+
+def test_expansion_plan_matches_exhaustive_search():
+    rng = np.random.default_rng(4)
+    for trial in range(20):
+        n = 12
+        points = rng.random((n, 2))
+        lanes = [(a, b) for a in range(n) for b in range(a + 1, n) if np.linalg.norm(points[a] - points[b]) < 0.45]
+        graph = GalaxyGraph(n, lanes)
+        owned, occupied = [0, 1], [0, 1, int(rng.integers(2, n))]
+        penalty = float(rng.choice([0.5, 1.0, 2.0]))
+        planner = ExpansionPlanner(graph, owned, occupied, penalty)
+        for depth in (1, 2, 3):
+            plan = planner.plan(depth, beam_width=10_000)
+            expected = _score_exhaustively(graph, owned, set(occupied), depth, penalty)
+            assert plan.score == pytest.approx(expected), (trial, depth)
+            assert len(plan.systems) <= depth and not set(plan.systems) & set(occupied)
+
+
+def test_expansion_plans_are_deduplicated_as_sets():
+    # Country 0 with three unclaimed leaf neighbours: two claims can be made
+    # in six orders but form only three distinct sets.
+    graph = GalaxyGraph(4, [(0, 1), (0, 2), (0, 3)])
+    planner = _RecordingPlanner(graph, [0])
+    plan = planner.plan(2, beam_width=64)
+    assert sorted(map(sorted, planner.levels[1])) == [[1, 2], [1, 3], [2, 3]]
+    assert plan.score == planner.plan(2, beam_width=1).score
+
+
+def test_expansion_max_memory_narrows_the_beam():
+    graph = GalaxyGraph(9, [(0, star) for star in range(1, 9)])
+    wide = _RecordingPlanner(graph, [0])
+    wide.plan(3, beam_width=64)
+    assert [len(level) for level in wide.levels] == [8, 28, 56]
+
+    narrow = _RecordingPlanner(graph, [0])
+    narrow.plan(3, beam_width=64, max_memory=1)
+    assert [len(level) for level in narrow.levels] == [1, 1, 1]
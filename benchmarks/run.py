@@ -0,0 +1,329 @@
+"""Benchmarks for the generation, rendering and storage hot paths.
+
+Each benchmark runs against a synthetic density map sized for the requested
+star count, so results are reproducible without the bundled assets::
+
+    python benchmarks/run.py                         # 1k stars
+    python benchmarks/run.py --sizes 1k,10k --filter hyperlanes
+    python benchmarks/run.py --baseline benchmarks/results/baseline.json
+
+Results are written as JSON (``--output``, by default a timestamped file in
+``benchmarks/results/``). With ``--baseline`` the median of every benchmark
+is compared to the baseline's; anything slower by more than ``--threshold``
+is flagged and the run exits with status 1, so a CI job can gate on it.
+
+Lane selection in ``generate_hyperlanes`` is quadratic in the lane count,
+so the 10k and 100k sizes take a long time there; use ``--filter`` to pick
+the benchmarks you care about at those sizes. Fixtures other than the
+sampled stars (lanes, star types, resources) are built directly so that one
+slow stage does not hold up the others.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from functools import cached_property
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import numpy as np
+from PIL import Image
+from scipy.spatial import Delaunay
+
+from galaxygen import backends, db, storage
+from galaxygen.config import SCALE
+from galaxygen.generation import generate_hyperlanes, sample_stars_from_density
+from galaxygen.models import CountryDefinition, Galaxy, Hyperlane, ResourceDefinition
+from galaxygen.rendering import render_galaxy
+from galaxygen.resources import assign_resources
+from galaxygen.system_generation import StarType, generate_system_profile
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+# Pixels of density map per requested star; sampling keeps stars 5px apart.
+AREA_PER_STAR = 60
+# Largest rendered canvas side; bigger galaxies render at a reduced scale.
+MAX_CANVAS = 8192
+SEED = 1234
+
+
+class Workload:
+    """Lazily built inputs for one galaxy size."""
+
+    def __init__(self, size: int, workdir: Path) -> None:
+        self.size = size
+        self.workdir = workdir
+        self.side = math.ceil(math.sqrt(size * AREA_PER_STAR))
+
+    @cached_property
+    def distribution_path(self) -> Path:
+        # A bright disc with two spiral arms, fading towards the rim.
+        y, x = np.mgrid[0 : self.side, 0 : self.side]
+        cx = cy = self.side / 2
+        radius = np.hypot(x - cx, y - cy) / (self.side / 2)
+        angle = np.arctan2(y - cy, x - cx)
+        arms = 0.85 + 0.15 * np.cos(2 * angle - 6 * radius)
+        probability = np.clip((1.15 - radius) * arms, 0, 1)
+        # ``sample_stars_from_density`` accepts a pixel with probability |rgb|^2.
+        value = (np.sqrt(probability / 3) * 255).astype(np.uint8)
+        path = self.workdir / f"distribution-{self.size}.png"
+        Image.fromarray(np.dstack([value, value, value])).save(path)
+        return path
+
+    @cached_property
+    def distribution(self) -> np.ndarray:
+        return np.array(Image.open(self.distribution_path).convert("RGB")) / 255
+
+    @cached_property
+    def stars(self):
+        return sample_stars_from_density(self.distribution, self.size, random.Random(SEED))
+
+    @cached_property
+    def resource_defs(self) -> List[ResourceDefinition]:
+        rng = random.Random(SEED)
+        return [
+            ResourceDefinition(
+                name=f"resource-{idx}",
+                color=(rng.randrange(256), rng.randrange(256), rng.randrange(256)),
+                rarity=rng.random(),
+                centricity=rng.uniform(-1, 1),
+            )
+            for idx in range(8)
+        ]
+
+    @cached_property
+    def country_defs(self) -> List[CountryDefinition]:
+        return [CountryDefinition(name=f"country-{idx}", color=(40 * idx, 200, 120)) for idx in range(4)]
+
+    def galaxy(self) -> Galaxy:
+        """A fresh galaxy with Delaunay lanes and random star types."""
+        stars = [star.model_copy() for star in self.stars]
+        rng = random.Random(SEED)
+        types = list(StarType)
+        for star in stars:
+            star.star_type = rng.choice(types)
+        points = np.array([star.as_tuple() for star in stars])
+        indptr, indices = Delaunay(points).vertex_neighbor_vertices
+        lanes = [
+            Hyperlane(a=a, b=int(b))
+            for a in range(len(stars))
+            for b in indices[indptr[a] : indptr[a + 1]]
+            if a < b
+        ]
+        return Galaxy(
+            width=self.side,
+            height=self.side,
+            stars=stars,
+            hyperlanes=lanes,
+            countries=self.country_defs,
+        )
+
+
+# -- benchmarks ---------------------------------------------------------------
+#
+# Each entry takes a workload, does any setup and returns the callable to time.
+
+Benchmark = Callable[[Workload], Callable[[], object]]
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    def register(func: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+@benchmark("sample_stars_from_density")
+def bench_sampling(work: Workload):
+    distribution = work.distribution
+    return lambda: sample_stars_from_density(distribution, work.size, random.Random(SEED))
+
+
+@benchmark("generate_hyperlanes")
+def bench_hyperlanes(work: Workload):
+    stars, distribution = work.stars, work.distribution
+    return lambda: generate_hyperlanes(stars, distribution, random.Random(SEED))
+
+
+@benchmark("generate_system_profile")
+def bench_system_profiles(work: Workload):
+    galaxy = work.galaxy()
+
+    def run():
+        for idx in range(len(galaxy.stars)):
+            generate_system_profile(galaxy, idx, SEED)
+
+    return run
+
+
+@benchmark("assign_resources")
+def bench_resources(work: Workload):
+    galaxy, defs = work.galaxy(), work.resource_defs
+    return lambda: assign_resources(defs, galaxy, random.Random(SEED))
+
+
+@benchmark("render_galaxy")
+def bench_render(work: Workload):
+    galaxy = work.galaxy()
+    output_dir = work.workdir / f"render-{work.size}"
+    scale = max(1, min(SCALE, MAX_CANVAS // work.side))
+    return lambda: render_galaxy(
+        galaxy, work.resource_defs, work.country_defs, output_dir, work.distribution_path, scale=scale
+    )
+
+
+@benchmark("save_galaxy")
+def bench_save(work: Workload):
+    galaxy = work.galaxy()
+    return lambda: storage.save_galaxy(None, galaxy)
+
+
+@benchmark("load_galaxy")
+def bench_load(work: Workload):
+    storage.save_galaxy(None, work.galaxy())
+    return storage.load_galaxy
+
+
+# -- runner -------------------------------------------------------------------
+
+
+def configure_storage(kind: str, workdir: Path) -> None:
+    if kind == "mongomock":
+        import mongomock
+
+        os.environ["MONGO_URI"] = "mongodb://mock"
+        os.environ.setdefault("MONGO_DB", "galaxygen_bench")
+        db.MongoClient = mongomock.MongoClient
+        db._client = db._database = None
+        db._indexes_ready = False
+        backends.configure_backend("mongo")
+    else:
+        backends.configure_backend("sqlite", path=workdir / "bench.sqlite3")
+
+
+def measure(func: Callable[[], object], rounds: int, max_time: float) -> dict:
+    """Time ``func`` up to ``rounds`` times, stopping early once ``max_time`` is spent."""
+    samples: List[float] = []
+    budget_end = time.perf_counter() + max_time
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+        if time.perf_counter() > budget_end:
+            break
+    return {
+        "rounds": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Print the median ratio per benchmark; return names slower than ``threshold``."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"  {name:<40} (no baseline)")
+            continue
+        ratio = current["median"] / previous["median"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"  {name:<40} {previous['median']:9.4f}s -> {current['median']:9.4f}s  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k", help=f"Comma-separated sizes from {', '.join(SIZES)}.")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text.")
+    parser.add_argument("--rounds", type=int, default=5, help="Maximum timed rounds per benchmark.")
+    parser.add_argument("--max-time", type=float, default=30.0, help="Stop adding rounds after this many seconds.")
+    parser.add_argument("--storage", choices=("mongomock", "sqlite"), default="mongomock")
+    parser.add_argument("--output", type=Path, help="Where to write the JSON results.")
+    parser.add_argument("--baseline", type=Path, help="Earlier results to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown of the median (0.2 = 20%%).")
+    args = parser.parse_args()
+
+    try:
+        sizes = [(label, SIZES[label]) for label in args.sizes.split(",") if label]
+    except KeyError as exc:
+        parser.error(f"unknown size {exc}; choose from {', '.join(SIZES)}")
+    selected = [name for name in BENCHMARKS if args.filter in name]
+
+    results: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory(prefix="galaxygen-bench-") as tmp:
+        workdir = Path(tmp)
+        configure_storage(args.storage, workdir)
+        for label, size in sizes:
+            work = Workload(size, workdir)
+            for name in selected:
+                func = BENCHMARKS[name](work)
+                func()  # warm-up, also catches errors before timing
+                key = f"{name}[{label}]"
+                results[key] = measure(func, args.rounds, args.max_time)
+                print(f"{key:<42} median {results[key]['median']:9.4f}s  ({results[key]['rounds']} rounds)")
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "storage": args.storage,
+        },
+        "results": results,
+    }
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = dt.datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{report['meta']['commit'] or 'local'}.json"
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results -> {output}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        print(f"Compared with {args.baseline} (threshold {args.threshold:.0%}):")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
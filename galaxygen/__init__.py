@@ -1,4 +1,6 @@
+from .arrays import GalaxyArrays, StarView
 from .cli import app as cli_app
+from .columnar import ColumnarGalaxy, export_columnar, load_columnar, open_columnar
 from .config import (
     DEFAULT_COUNTRIES,
     DEFAULT_DISTRIBUTION,
@@ -7,7 +9,12 @@ from .config import (
     SCALE,
     STAR_SIZE,
 )
-from .generation import generate_galaxy, generate_hyperlanes, sample_stars_from_density
+from .generation import (
+    generate_galaxy,
+    generate_galaxy_arrays,
+    generate_hyperlanes,
+    sample_stars_from_density,
+)
 from .models import (
     CelestialBody,
     CountryDefinition,
@@ -31,7 +38,13 @@ from .storage import (
 )
 
 __all__ = [
+    "GalaxyArrays",
+    "StarView",
     "cli_app",
+    "ColumnarGalaxy",
+    "export_columnar",
+    "load_columnar",
+    "open_columnar",
     "DEFAULT_COUNTRIES",
     "DEFAULT_DISTRIBUTION",
     "DEFAULT_GALAXY",
@@ -47,6 +60,8 @@ __all__ = [
     "Star",
     "Timeline",
     "TimelineEvent",
+    "generate_galaxy",
+    "generate_galaxy_arrays",
     "render_galaxy",
     "assign_resources",
     "generate_system_profile",
@@ -0,0 +1,380 @@
+"""Struct-of-arrays in-memory galaxy.
+
+:class:`GalaxyArrays` holds a galaxy as flat NumPy columns instead of one
+pydantic :class:`~galaxygen.models.Star` per system:
+
+* ``x``, ``y`` (int32), ``star_type`` (uint8 codes from ``STAR_TYPE_CODES``)
+* ``admin_levels`` int32[n, k] (-1 = unassigned) and ``admin_level_len``,
+  the original list length, so ``[1]`` and ``[1, None, None, None]`` survive
+  a round trip
+* ``name``, ``description`` and ``timeline`` as ids into one interned
+  :class:`StringPool`; timelines are stored as JSON, and the default timeline
+  every generated star starts with is stored once
+* ``lanes`` int32[m, 2] in hyperlane order, with the CSR adjacency built on
+  demand by :meth:`GalaxyArrays.graph`
+* bodies in CSR form: ``body_offsets`` int64[n + 1] into per-body columns
+* admin levels and resource regions laid out as in the columnar file
+  format, built with the same helpers
+
+``galaxy.stars[i]`` is a :class:`StarView` that reads (and for scalar fields
+writes) the columns on attribute access; nothing is materialized until
+:meth:`StarView.to_star` or :meth:`GalaxyArrays.to_galaxy` is called.
+"""
+
+from __future__ import annotations
+
+from functools import cached_property
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .columnar import admin_levels_at, admin_matrix, resource_csr
+from .graph import GalaxyGraph
+from .models import (
+    CelestialBody,
+    Coordinate,
+    CountryDefinition,
+    Galaxy,
+    Hyperlane,
+    ResourceRegion,
+    Star,
+    Timeline,
+    default_system_timeline,
+)
+from .ownership import ADMIN_LEVELS, OwnershipIndex
+from .types import STAR_TYPE_CODES, StarType
+
+_STAR_TYPES = list(STAR_TYPE_CODES)
+_NO_COLOR = -1
+
+
+class StringPool:
+    """Interned strings: every distinct value is stored once and referenced by id."""
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        self.values: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for value in values:
+            self.intern(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, idx: int) -> str:
+        return self.values[idx]
+
+    def intern(self, value: str) -> int:
+        idx = self._ids.get(value)
+        if idx is None:
+            idx = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return idx
+
+    def encode(self, values: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.intern(value) for value in values), dtype=np.int32)
+
+
+class StarView:
+    """A lazy view of one star in a :class:`GalaxyArrays`.
+
+    Reads go to the columns on every access. ``x``, ``y``, ``name``,
+    ``description``, ``star_type`` and ``admin_levels`` can be assigned;
+    bodies and timelines are replaced through :meth:`GalaxyArrays.set_bodies`
+    and :meth:`GalaxyArrays.set_star`.
+    """
+
+    __slots__ = ("_galaxy", "index")
+
+    def __init__(self, galaxy: "GalaxyArrays", index: int) -> None:
+        self._galaxy = galaxy
+        self.index = index
+
+    @property
+    def x(self) -> int:
+        return int(self._galaxy.x[self.index])
+
+    @x.setter
+    def x(self, value: int) -> None:
+        self._galaxy.x[self.index] = value
+
+    @property
+    def y(self) -> int:
+        return int(self._galaxy.y[self.index])
+
+    @y.setter
+    def y(self, value: int) -> None:
+        self._galaxy.y[self.index] = value
+
+    @property
+    def name(self) -> str:
+        return self._galaxy.strings[int(self._galaxy.name[self.index])]
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self._galaxy.name[self.index] = self._galaxy.strings.intern(value)
+
+    @property
+    def description(self) -> str:
+        return self._galaxy.strings[int(self._galaxy.description[self.index])]
+
+    @description.setter
+    def description(self, value: str) -> None:
+        self._galaxy.description[self.index] = self._galaxy.strings.intern(value)
+
+    @property
+    def star_type(self) -> StarType:
+        return _STAR_TYPES[int(self._galaxy.star_type[self.index])]
+
+    @star_type.setter
+    def star_type(self, value: StarType) -> None:
+        self._galaxy.star_type[self.index] = STAR_TYPE_CODES[StarType(value)]
+
+    @property
+    def admin_levels(self) -> List[Optional[int]]:
+        return admin_levels_at(self._galaxy.admin_levels, self._galaxy.admin_level_len, self.index)
+
+    @admin_levels.setter
+    def admin_levels(self, values: Sequence[Optional[int]]) -> None:
+        self._galaxy._set_admin_levels(self.index, values)
+
+    @property
+    def bodies(self) -> List[CelestialBody]:
+        return self._galaxy.bodies(self.index)
+
+    @property
+    def timeline(self) -> Timeline:
+        return Timeline.model_validate_json(self._galaxy.strings[int(self._galaxy.timeline[self.index])])
+
+    def as_tuple(self) -> Coordinate:
+        return (self.x, self.y)
+
+    def to_star(self) -> Star:
+        return Star(
+            x=self.x,
+            y=self.y,
+            name=self.name,
+            description=self.description,
+            star_type=self.star_type,
+            admin_levels=self.admin_levels,
+            bodies=self.bodies,
+            timeline=self.timeline,
+        )
+
+    def __repr__(self) -> str:
+        return f"StarView({self.index}, x={self.x}, y={self.y}, star_type={self.star_type.value})"
+
+
+class _StarViews(Sequence[StarView]):
+    def __init__(self, galaxy: "GalaxyArrays") -> None:
+        self._galaxy = galaxy
+
+    def __len__(self) -> int:
+        return len(self._galaxy.x)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [StarView(self._galaxy, i) for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("star index out of range")
+        return StarView(self._galaxy, idx)
+
+    def __iter__(self) -> Iterator[StarView]:
+        return (StarView(self._galaxy, idx) for idx in range(len(self)))
+
+
+class GalaxyArrays:
+    """A galaxy as NumPy columns; see the module docstring for the layout."""
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        positions: np.ndarray,
+        lanes: Optional[np.ndarray] = None,
+        countries: Sequence[CountryDefinition] = (),
+        strings: Optional[StringPool] = None,
+    ) -> None:
+        """Stars at ``positions`` with default fields (as ``Star(x=, y=)`` would have)."""
+        self.width = int(width)
+        self.height = int(height)
+        self.strings = strings or StringPool()
+        positions = np.asarray(positions, dtype=np.int32).reshape(-1, 2)
+        count = len(positions)
+        self.x = positions[:, 0].copy()
+        self.y = positions[:, 1].copy()
+        self.star_type = np.full(count, STAR_TYPE_CODES[StarType.G], dtype=np.uint8)
+        self.admin_levels = np.full((count, ADMIN_LEVELS), -1, dtype=np.int32)
+        self.admin_level_len = np.full(count, ADMIN_LEVELS, dtype=np.uint8)
+        self.name = np.full(count, self.strings.intern(""), dtype=np.int32)
+        self.description = self.name.copy()
+        self.timeline = np.full(count, self.strings.intern(default_system_timeline().model_dump_json()), dtype=np.int32)
+        self.lanes = np.asarray(lanes if lanes is not None else (), dtype=np.int32).reshape(-1, 2)
+        self.body_offsets = np.zeros(count + 1, dtype=np.int64)
+        self._set_body_columns([])
+        self.resource_ids = np.zeros(0, dtype=np.int32)
+        self.resource_offsets = np.zeros(1, dtype=np.int64)
+        self.resource_systems = np.zeros(0, dtype=np.int32)
+        self.countries: List[CountryDefinition] = list(countries)
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    @property
+    def stars(self) -> _StarViews:
+        return _StarViews(self)
+
+    def positions(self) -> np.ndarray:
+        """``(n, 2)`` star coordinates."""
+        return np.column_stack([self.x, self.y])
+
+    # -- hyperlanes ---------------------------------------------------------
+
+    def set_lanes(self, lanes: np.ndarray) -> None:
+        self.lanes = np.asarray(lanes, dtype=np.int32).reshape(-1, 2)
+        self.__dict__.pop("graph", None)
+
+    @cached_property
+    def graph(self) -> GalaxyGraph:
+        """CSR adjacency of the hyperlanes; rebuilt after :meth:`set_lanes`."""
+        return GalaxyGraph(len(self), self.lanes)
+
+    def neighbors(self, idx: int) -> np.ndarray:
+        return self.graph.neighbors(idx)
+
+    # -- admin levels and ownership -------------------------------------------
+
+    def _set_admin_levels(self, idx: int, values: Sequence[Optional[int]]) -> None:
+        values = list(values)
+        if len(values) > self.admin_levels.shape[1]:
+            grown = np.full((len(self), len(values)), -1, dtype=np.int32)
+            grown[:, : self.admin_levels.shape[1]] = self.admin_levels
+            self.admin_levels = grown
+        self.admin_levels[idx] = -1
+        self.admin_levels[idx, : len(values)] = [-1 if value is None else value for value in values]
+        self.admin_level_len[idx] = len(values)
+
+    def ownership(self) -> OwnershipIndex:
+        levels = self.admin_levels[:, :ADMIN_LEVELS].astype(np.int64)
+        # Levels past a star's original list length read as unassigned.
+        levels[np.arange(ADMIN_LEVELS)[None, :] >= self.admin_level_len[:, None]] = -1
+        return OwnershipIndex(levels)
+
+    # -- bodies -----------------------------------------------------------------
+
+    def _encode_bodies(self, bodies: Sequence[CelestialBody]) -> Dict[str, np.ndarray]:
+        colors = [body.color if body.color is not None else (_NO_COLOR,) * 3 for body in bodies]
+        return {
+            "body_name": self.strings.encode(body.name for body in bodies),
+            "body_type": self.strings.encode(body.type.value for body in bodies),
+            "body_distance_au": np.fromiter((body.distance_au for body in bodies), dtype=np.float64),
+            "body_angle_deg": np.fromiter((body.angle_deg for body in bodies), dtype=np.float64),
+            "body_radius_km": np.fromiter((body.radius_km for body in bodies), dtype=np.float64),
+            "body_color": np.array(colors, dtype=np.int16).reshape(-1, 3),
+        }
+
+    def _set_body_columns(self, bodies: Sequence[CelestialBody]) -> None:
+        for name, column in self._encode_bodies(bodies).items():
+            setattr(self, name, column)
+
+    def set_bodies(self, bodies: Sequence[Sequence[CelestialBody]]) -> None:
+        """Replace every star's bodies (one list per star) in one pass."""
+        if len(bodies) != len(self):
+            raise ValueError(f"expected bodies for {len(self)} stars, got {len(bodies)}")
+        np.cumsum([len(star_bodies) for star_bodies in bodies], out=self.body_offsets[1:])
+        self._set_body_columns([body for star_bodies in bodies for body in star_bodies])
+
+    def set_star_bodies(self, idx: int, bodies: Sequence[CelestialBody]) -> None:
+        """Replace star ``idx``'s bodies, splicing its slice of the body columns."""
+        start, end = int(self.body_offsets[idx]), int(self.body_offsets[idx + 1])
+        for name, column in self._encode_bodies(bodies).items():
+            current = getattr(self, name)
+            setattr(self, name, np.concatenate([current[:start], column, current[end:]]))
+        self.body_offsets[idx + 1 :] += len(bodies) - (end - start)
+
+    def body_count(self) -> np.ndarray:
+        return np.diff(self.body_offsets)
+
+    def bodies(self, idx: int) -> List[CelestialBody]:
+        start, end = int(self.body_offsets[idx]), int(self.body_offsets[idx + 1])
+        strings = self.strings
+        return [
+            CelestialBody(
+                name=strings[int(self.body_name[i])],
+                type=strings[int(self.body_type[i])],
+                distance_au=float(self.body_distance_au[i]),
+                angle_deg=float(self.body_angle_deg[i]),
+                radius_km=float(self.body_radius_km[i]),
+                color=None if self.body_color[i, 0] == _NO_COLOR else tuple(int(c) for c in self.body_color[i]),
+            )
+            for i in range(start, end)
+        ]
+
+    # -- resource regions -----------------------------------------------------
+
+    def set_resources(self, regions: Iterable[Tuple[int, Sequence[int]]]) -> None:
+        self.resource_ids, self.resource_offsets, self.resource_systems = resource_csr(regions)
+
+    def resource_regions(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """``(region id, systems)`` per resource region, in order."""
+        for pos, region_id in enumerate(self.resource_ids.tolist()):
+            yield region_id, self.resource_systems[self.resource_offsets[pos] : self.resource_offsets[pos + 1]]
+
+    @property
+    def resources(self) -> List[ResourceRegion]:
+        return [
+            ResourceRegion(id=region_id, systems=systems.tolist()) for region_id, systems in self.resource_regions()
+        ]
+
+    # -- whole stars --------------------------------------------------------------
+
+    def set_star(self, idx: int, star: Star) -> None:
+        """Overwrite star ``idx`` with ``star`` (bodies included)."""
+        view = StarView(self, idx)
+        view.x, view.y, view.name, view.description = star.x, star.y, star.name, star.description
+        view.star_type = star.star_type
+        view.admin_levels = star.admin_levels
+        self.timeline[idx] = self.strings.intern(_timeline_json(star.timeline))
+        self.set_star_bodies(idx, star.bodies)
+
+    # -- conversion -----------------------------------------------------------------
+
+    @classmethod
+    def from_galaxy(cls, galaxy: Galaxy) -> "GalaxyArrays":
+        stars = galaxy.stars
+        lanes = np.array([lane.as_pair() for lane in galaxy.hyperlanes], dtype=np.int32)
+        arrays = cls(galaxy.width, galaxy.height, [star.as_tuple() for star in stars], lanes, galaxy.countries)
+        strings = arrays.strings
+        arrays.star_type[:] = np.fromiter((STAR_TYPE_CODES[star.star_type] for star in stars), dtype=np.uint8)
+        arrays.name[:] = strings.encode(star.name for star in stars)
+        arrays.description[:] = strings.encode(star.description for star in stars)
+        arrays.timeline[:] = strings.encode(_timeline_json(star.timeline) for star in stars)
+        arrays.admin_levels, arrays.admin_level_len = admin_matrix(stars)
+        arrays.set_bodies([star.bodies for star in stars])
+        arrays.set_resources((region.id, region.systems) for region in galaxy.resources)
+        return arrays
+
+    def to_galaxy(self) -> Galaxy:
+        return Galaxy(
+            width=self.width,
+            height=self.height,
+            stars=[view.to_star() for view in self.stars],
+            hyperlanes=[Hyperlane(a=a, b=b) for a, b in self.lanes.tolist()],
+            resources=self.resources,
+            countries=list(self.countries),
+        )
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns and the string pool."""
+        columns = sum(value.nbytes for value in vars(self).values() if isinstance(value, np.ndarray))
+        return columns + sum(len(value) for value in self.strings.values)
+
+
+_DEFAULT_TIMELINE = default_system_timeline()
+_DEFAULT_TIMELINE_JSON = _DEFAULT_TIMELINE.model_dump_json()
+
+
+def _timeline_json(timeline: Timeline) -> str:
+    # Most stars still carry the default timeline; skip serializing it again.
+    return _DEFAULT_TIMELINE_JSON if timeline == _DEFAULT_TIMELINE else timeline.model_dump_json()
@@ -0,0 +1,97 @@
+"""Async read path mirroring ``galaxygen.storage``.
+
+With the Mongo backend and pymongo's ``AsyncMongoClient`` available, reads run
+natively on the event loop and share one connection pool. Other backends (or
+``GALAXYGEN_ASYNC_MONGO=0``) fall back to running the synchronous storage
+functions in worker threads, so callers can use this module unconditionally.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from itertools import islice
+from typing import AsyncIterator, Iterator, List
+
+from . import storage
+from .backends import get_backend
+from .backends.mongo import _META_ID, _SORT_KEYS, _STREAM_BATCH_SIZE
+from .db import async_driver_available, get_async_database
+from .models import CountryDefinition, Galaxy, Hyperlane, ResourceDefinition, ResourceRegion, Star
+
+
+def _native() -> bool:
+    return get_backend().name == "mongo" and async_driver_available()
+
+
+async def _iterate_in_thread(iterator: Iterator[dict]) -> AsyncIterator[dict]:
+    while True:
+        batch = await asyncio.to_thread(lambda: list(islice(iterator, _STREAM_BATCH_SIZE)))
+        if not batch:
+            return
+        for doc in batch:
+            yield doc
+
+
+async def iter_docs(collection: str) -> AsyncIterator[dict]:
+    if not _native():
+        async for doc in _iterate_in_thread(get_backend().iter_docs(collection)):
+            yield doc
+        return
+    db = await get_async_database()
+    cursor = db[collection].find(
+        {}, {"_id": 0, "idx": 0}, batch_size=_STREAM_BATCH_SIZE
+    ).sort(_SORT_KEYS[collection], 1)
+    async for doc in cursor:
+        yield doc
+
+
+async def get_galaxy_version() -> tuple[str, int]:
+    if _native():
+        db = await get_async_database()
+        meta = await db["galaxy_meta"].find_one({"_id": _META_ID}, {"epoch": 1, "version": 1})
+        if meta and "epoch" in meta:
+            return str(meta["epoch"]), int(meta.get("version", 0))
+    # Missing or pre-version metadata is initialised by the synchronous backend.
+    return await asyncio.to_thread(storage.get_galaxy_version)
+
+
+async def get_galaxy_meta() -> dict:
+    if _native():
+        db = await get_async_database()
+        meta = await db["galaxy_meta"].find_one({"_id": _META_ID})
+        if meta and "epoch" in meta:
+            return meta
+    return await asyncio.to_thread(storage.get_galaxy_meta)
+
+
+async def load_galaxy() -> Galaxy:
+    meta = await get_galaxy_meta()
+    return Galaxy(
+        width=int(meta.get("width", 0)),
+        height=int(meta.get("height", 0)),
+        stars=[Star(**doc) async for doc in iter_docs("stars")],
+        hyperlanes=[Hyperlane(**doc) async for doc in iter_docs("hyperlanes")],
+        resources=[ResourceRegion(**doc) async for doc in iter_docs("resources")],
+        countries=[CountryDefinition(**doc) async for doc in iter_docs("countries")],
+    )
+
+
+async def load_resource_definitions() -> List[ResourceDefinition]:
+    return [ResourceDefinition(**doc) async for doc in iter_docs("resource_definitions")]
+
+
+async def load_country_definitions() -> List[CountryDefinition]:
+    return [CountryDefinition(**doc) async for doc in iter_docs("countries")]
+
+
+async def get_star(idx: int) -> Star | None:
+    if not _native():
+        return await asyncio.to_thread(storage.get_star, idx)
+    db = await get_async_database()
+    doc = await db["stars"].find_one({"idx": idx}, {"_id": 0, "idx": 0})
+    return Star(**doc) if doc else None
+
+
+async def get_star_count() -> int:
+    meta = await get_galaxy_meta()
+    return int(meta.get("star_count", 0))
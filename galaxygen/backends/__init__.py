@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from ..config import DEFAULT_SQLITE_PATH
+from .base import COLLECTIONS, StorageBackend
+
+BACKENDS = ("mongo", "sqlite")
+
+_backend: StorageBackend | None = None
+
+
+def create_backend(name: str | None = None, *, path: Path | str | None = None) -> StorageBackend:
+    """Build a backend by name, falling back to ``GALAXYGEN_STORAGE`` (default ``mongo``)."""
+    name = (name or os.getenv("GALAXYGEN_STORAGE") or "mongo").lower()
+    if name == "mongo":
+        from .mongo import MongoBackend
+
+        return MongoBackend()
+    if name == "sqlite":
+        from .sqlite import SQLiteBackend
+
+        return SQLiteBackend(path or os.getenv("GALAXYGEN_SQLITE_PATH") or DEFAULT_SQLITE_PATH)
+    raise ValueError(f"Unknown storage backend {name!r}; expected one of {', '.join(BACKENDS)}")
+
+
+def configure_backend(name: str | None = None, *, path: Path | str | None = None) -> StorageBackend:
+    global _backend
+    _backend = create_backend(name, path=path)
+    return _backend
+
+
+def get_backend() -> StorageBackend:
+    global _backend
+    if _backend is None:
+        _backend = create_backend()
+    return _backend
+
+
+__all__ = [
+    "BACKENDS",
+    "COLLECTIONS",
+    "StorageBackend",
+    "configure_backend",
+    "create_backend",
+    "get_backend",
+]
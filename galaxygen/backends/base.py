@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, List, Mapping, Sequence
+
+COLLECTIONS = ("stars", "hyperlanes", "resources", "resource_definitions", "countries")
+
+# Number of most recent changes kept in the change log.
+CHANGE_LOG_SIZE = 10_000
+
+
+class StorageBackend(ABC):
+    """Raw document store behind ``galaxygen.storage``.
+
+    Backends deal in plain dicts shaped like the pydantic models' ``model_dump``
+    output; model construction and validation stay in ``galaxygen.storage``.
+    Documents returned by ``iter_docs`` and ``get_star`` never carry storage
+    bookkeeping such as ``idx`` or ``_id``.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def get_meta(self) -> dict:
+        """Return galaxy metadata (width, height, collection counts, epoch and version)."""
+
+    @abstractmethod
+    def get_version(self) -> tuple[str, int]:
+        """Return ``(epoch, version)`` with a single metadata lookup.
+
+        ``version`` increases with every mutation; ``epoch`` changes whenever
+        the metadata document is recreated, so cached data from a wiped store is
+        never mistaken for current data.
+        """
+
+    @abstractmethod
+    def bump_version(self) -> tuple[str, int]:
+        """Atomically increment the version and return the new ``(epoch, version)``."""
+
+    @abstractmethod
+    def record_change(self, op: str, payload: dict) -> tuple[str, int]:
+        """Bump the version and append ``op``/``payload`` to the change log under it.
+
+        Returns the new ``(epoch, version)``. The log keeps the last
+        ``CHANGE_LOG_SIZE`` changes of the current epoch.
+        """
+
+    @abstractmethod
+    def get_changes(self, epoch: str, since: int, limit: int) -> List[dict]:
+        """Return up to ``limit`` logged changes of ``epoch`` newer than ``since``,
+        oldest first, each as ``{"version", "op", **payload}``."""
+
+    @abstractmethod
+    def oldest_change_version(self, epoch: str) -> int | None:
+        """Return the version of the oldest change still logged for ``epoch``."""
+
+    @abstractmethod
+    def iter_docs(self, collection: str, fields: Sequence[str] | None = None) -> Iterator[dict]:
+        """Yield documents of ``collection`` in index order, optionally projected to ``fields``."""
+
+    @abstractmethod
+    def replace_galaxy(
+        self,
+        width: int,
+        height: int,
+        stars: List[dict],
+        hyperlanes: List[dict],
+        resources: List[dict],
+    ) -> None:
+        """Replace stars, hyperlanes and resource regions wholesale."""
+
+    @abstractmethod
+    def replace_resource_definitions(self, docs: Iterable[dict]) -> None: ...
+
+    @abstractmethod
+    def replace_countries(self, docs: Iterable[dict]) -> None: ...
+
+    @abstractmethod
+    def get_star(self, idx: int) -> dict | None: ...
+
+    @abstractmethod
+    def get_stars(self, indices: Sequence[int], fields: Sequence[str] | None = None) -> List[dict]:
+        """Return the given stars (each with its ``idx``) in ascending index order."""
+
+    @abstractmethod
+    def update_star(self, idx: int, doc: dict) -> bool: ...
+
+    @abstractmethod
+    def update_star_fields(self, idx: int, fields: dict) -> bool: ...
+
+    @abstractmethod
+    def update_stars_fields(self, updates: Mapping[int, dict]) -> None:
+        """Set ``fields`` on each existing star ``idx`` of ``updates`` in one round-trip."""
+
+    @abstractmethod
+    def add_star(self, doc: dict, width: int, height: int) -> int:
+        """Append a star, growing the galaxy bounds if needed, and return its index."""
+
+    @abstractmethod
+    def delete_star(self, idx: int) -> dict | None:
+        """Delete a star, its hyperlanes and resource memberships, shifting later indices down.
+
+        Returns the deleted star document, or ``None`` if there was no such star.
+        """
+
+    @abstractmethod
+    def delete_stars(self, indices: Sequence[int]) -> List[dict]:
+        """Delete several stars at once, as repeated :meth:`delete_star` calls would.
+
+        Lanes and resource regions are rewritten once, not once per star.
+        Returns the deleted star documents (each with its old ``idx``) in
+        ascending index order; indices with no star are skipped.
+        """
+
+    @abstractmethod
+    def add_hyperlane(self, a: int, b: int) -> tuple[int, bool]:
+        """Add a hyperlane unless one already joins ``a`` and ``b``.
+
+        Returns the lane index and whether a new lane was created.
+        """
+
+    @abstractmethod
+    def replace_hyperlanes_from(self, start: int, pairs: Sequence[tuple[int, int]]) -> None:
+        """Replace every hyperlane with index ``>= start`` by ``pairs``, numbered from ``start``."""
+
+    @abstractmethod
+    def delete_hyperlane(self, idx: int) -> dict | None:
+        """Delete a hyperlane and return its ``{"a", "b"}`` document, or ``None``."""
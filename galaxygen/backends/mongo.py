@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Iterable, Iterator, List, Mapping, Sequence
+from uuid import uuid4
+
+from pymongo import DeleteMany, InsertOne, ReturnDocument, UpdateOne
+
+from ..db import get_database
+from .base import CHANGE_LOG_SIZE, StorageBackend
+
+_META_ID = "galaxy"
+_STREAM_BATCH_SIZE = 1000
+_SORT_KEYS = {
+    "stars": "idx",
+    "hyperlanes": "idx",
+    "resources": "id",
+    "resource_definitions": "idx",
+    "countries": "idx",
+}
+
+
+def _strip_doc(doc: dict, *, remove_idx: bool = True) -> dict:
+    data = dict(doc)
+    data.pop("_id", None)
+    if remove_idx:
+        data.pop("idx", None)
+    return data
+
+
+def _ensure_meta(db) -> dict:
+    meta = db["galaxy_meta"].find_one({"_id": _META_ID})
+    if not meta:
+        star_count = db["stars"].count_documents({})
+        hyperlane_count = db["hyperlanes"].count_documents({})
+        resource_count = db["resources"].count_documents({})
+        country_count = db["countries"].count_documents({})
+        meta = {
+            "_id": _META_ID,
+            "width": 0,
+            "height": 0,
+            "star_count": star_count,
+            "hyperlane_count": hyperlane_count,
+            "resource_count": resource_count,
+            "country_count": country_count,
+            "epoch": uuid4().hex,
+            "version": 0,
+        }
+        db["galaxy_meta"].insert_one(meta)
+    elif "epoch" not in meta:
+        # Metadata created by an upsert (or an older release) has no epoch yet.
+        meta = db["galaxy_meta"].find_one_and_update(
+            {"_id": _META_ID, "epoch": {"$exists": False}},
+            {"$set": {"epoch": uuid4().hex}, "$max": {"version": 0}},
+            return_document=ReturnDocument.AFTER,
+        ) or db["galaxy_meta"].find_one({"_id": _META_ID})
+    return meta
+
+
+def _projection(fields: Sequence[str] | None) -> dict:
+    if fields:
+        return {"_id": 0, **{field: 1 for field in fields}}
+    return {"_id": 0, "idx": 0}
+
+
+def _version_of(meta: dict) -> tuple[str, int]:
+    return str(meta["epoch"]), int(meta.get("version", 0))
+
+
+class MongoBackend(StorageBackend):
+    name = "mongo"
+
+    @property
+    def db(self):
+        return get_database()
+
+    def get_meta(self) -> dict:
+        return _ensure_meta(self.db)
+
+    def get_version(self) -> tuple[str, int]:
+        db = self.db
+        meta = db["galaxy_meta"].find_one({"_id": _META_ID}, {"epoch": 1, "version": 1})
+        if not meta or "epoch" not in meta:
+            meta = _ensure_meta(db)
+        return _version_of(meta)
+
+    def bump_version(self) -> tuple[str, int]:
+        db = self.db
+        _ensure_meta(db)
+        meta = db["galaxy_meta"].find_one_and_update(
+            {"_id": _META_ID},
+            {"$inc": {"version": 1}},
+            projection={"epoch": 1, "version": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        return _version_of(meta)
+
+    def record_change(self, op: str, payload: dict) -> tuple[str, int]:
+        epoch, version = self.bump_version()
+        changes = self.db["galaxy_changes"]
+        changes.insert_one({**payload, "epoch": epoch, "version": version, "op": op})
+        changes.delete_many(
+            {"$or": [{"epoch": {"$ne": epoch}}, {"version": {"$lte": version - CHANGE_LOG_SIZE}}]}
+        )
+        return epoch, version
+
+    def get_changes(self, epoch: str, since: int, limit: int) -> List[dict]:
+        cursor = (
+            self.db["galaxy_changes"]
+            .find({"epoch": epoch, "version": {"$gt": since}}, {"_id": 0, "epoch": 0})
+            .sort("version", 1)
+            .limit(limit)
+        )
+        return list(cursor)
+
+    def oldest_change_version(self, epoch: str) -> int | None:
+        oldest = self.db["galaxy_changes"].find_one(
+            {"epoch": epoch}, {"version": 1}, sort=[("version", 1)]
+        )
+        return int(oldest["version"]) if oldest else None
+
+    def iter_docs(self, collection: str, fields: Sequence[str] | None = None) -> Iterator[dict]:
+        cursor = self.db[collection].find(
+            {}, _projection(fields), batch_size=_STREAM_BATCH_SIZE
+        ).sort(_SORT_KEYS[collection], 1)
+        yield from cursor
+
+    def replace_galaxy(
+        self,
+        width: int,
+        height: int,
+        stars: List[dict],
+        hyperlanes: List[dict],
+        resources: List[dict],
+    ) -> None:
+        db = self.db
+        db["galaxy_meta"].update_one(
+            {"_id": _META_ID},
+            {
+                "$set": {
+                    "width": int(width),
+                    "height": int(height),
+                    "star_count": len(stars),
+                    "hyperlane_count": len(hyperlanes),
+                    "resource_count": len(resources),
+                }
+            },
+            upsert=True,
+        )
+
+        db["stars"].delete_many({})
+        if stars:
+            db["stars"].insert_many([{**star, "idx": idx} for idx, star in enumerate(stars)])
+
+        db["hyperlanes"].delete_many({})
+        if hyperlanes:
+            db["hyperlanes"].insert_many(
+                [{"idx": idx, **lane} for idx, lane in enumerate(hyperlanes)]
+            )
+
+        db["resources"].delete_many({})
+        if resources:
+            db["resources"].insert_many([dict(res) for res in resources])
+
+    def replace_resource_definitions(self, docs: Iterable[dict]) -> None:
+        db = self.db
+        db["resource_definitions"].delete_many({})
+        resource_list = list(docs)
+        if resource_list:
+            db["resource_definitions"].insert_many(
+                [{**resource, "idx": idx} for idx, resource in enumerate(resource_list)]
+            )
+
+    def replace_countries(self, docs: Iterable[dict]) -> None:
+        db = self.db
+        country_list = list(docs)
+        for idx, country in enumerate(country_list):
+            db["countries"].replace_one(
+                {"idx": idx},
+                {**country, "idx": idx},
+                upsert=True,
+            )
+        db["countries"].delete_many({"idx": {"$gte": len(country_list)}})
+        db["galaxy_meta"].update_one(
+            {"_id": _META_ID},
+            {"$set": {"country_count": len(country_list)}},
+            upsert=True,
+        )
+
+    def get_star(self, idx: int) -> dict | None:
+        doc = self.db["stars"].find_one({"idx": idx})
+        if not doc:
+            return None
+        return _strip_doc(doc)
+
+    def get_stars(self, indices: Sequence[int], fields: Sequence[str] | None = None) -> List[dict]:
+        projection = _projection(fields)
+        projection.pop("idx", None)
+        if fields:
+            projection["idx"] = 1
+        cursor = self.db["stars"].find(
+            {"idx": {"$in": [int(i) for i in indices]}}, projection, batch_size=_STREAM_BATCH_SIZE
+        ).sort("idx", 1)
+        return list(cursor)
+
+    def update_star(self, idx: int, doc: dict) -> bool:
+        result = self.db["stars"].update_one(
+            {"idx": idx},
+            {"$set": {**doc, "idx": idx}},
+        )
+        return result.matched_count > 0
+
+    def update_star_fields(self, idx: int, fields: dict) -> bool:
+        result = self.db["stars"].update_one({"idx": idx}, {"$set": fields})
+        return result.matched_count > 0
+
+    def update_stars_fields(self, updates: Mapping[int, dict]) -> None:
+        if updates:
+            self.db["stars"].bulk_write(
+                [UpdateOne({"idx": idx}, {"$set": fields}) for idx, fields in updates.items()],
+                ordered=False,
+            )
+
+    def add_star(self, doc: dict, width: int, height: int) -> int:
+        db = self.db
+        meta = db["galaxy_meta"].find_one_and_update(
+            {"_id": _META_ID},
+            {
+                "$setOnInsert": {
+                    "hyperlane_count": 0,
+                    "resource_count": 0,
+                    "country_count": 0,
+                },
+                "$inc": {"star_count": 1},
+                "$max": {"width": int(width), "height": int(height)},
+            },
+            upsert=True,
+            return_document=ReturnDocument.BEFORE,
+        )
+        idx = int(meta.get("star_count", 0)) if meta else 0
+        db["stars"].insert_one({**doc, "idx": idx})
+        return idx
+
+    def delete_star(self, idx: int) -> dict | None:
+        deleted = self.delete_stars([idx])
+        if not deleted:
+            return None
+        deleted[0].pop("idx")
+        return deleted[0]
+
+    def delete_stars(self, indices: Sequence[int]) -> List[dict]:
+        db = self.db
+        wanted = sorted({int(idx) for idx in indices})
+        deleted = list(db["stars"].find({"idx": {"$in": wanted}}, {"_id": 0}).sort("idx", 1))
+        if not deleted:
+            return []
+        removed = [int(doc["idx"]) for doc in deleted]
+        db["stars"].delete_many({"idx": {"$in": removed}})
+
+        def shift(idx: int) -> int:
+            return idx - bisect_left(removed, idx)
+
+        # Stars between two removed indices all move down by the same amount,
+        # so each gap is one ``$inc``. They first land at ``final - offset``
+        # (all negative, so ``idx`` stays unique) and one more ``$inc`` puts
+        # every moved star in place.
+        last = db["stars"].find_one({}, {"idx": 1}, sort=[("idx", -1)])
+        offset = max(removed[-1], int(last["idx"]) if last else 0) + 1
+        bounds = removed + [None]
+        for gap, low in enumerate(removed):
+            span: dict = {"$gt": low}
+            if bounds[gap + 1] is not None:
+                span["$lt"] = bounds[gap + 1]
+            db["stars"].update_many({"idx": span}, {"$inc": {"idx": -(gap + 1) - offset}})
+        db["stars"].update_many({"idx": {"$lt": 0}}, {"$inc": {"idx": offset}})
+
+        gone = set(removed)
+        updated_lanes = []
+        for lane in db["hyperlanes"].find().sort("idx", 1):
+            a, b = int(lane["a"]), int(lane["b"])
+            if a in gone or b in gone:
+                continue
+            a, b = shift(a), shift(b)
+            if a == b:
+                continue
+            updated_lanes.append({"idx": len(updated_lanes), "a": a, "b": b})
+
+        db["hyperlanes"].delete_many({})
+        if updated_lanes:
+            db["hyperlanes"].insert_many(updated_lanes)
+
+        updated_resources = [
+            {
+                "id": int(region["id"]),
+                "systems": [shift(system) for system in region.get("systems", []) if system not in gone],
+            }
+            for region in db["resources"].find().sort("id", 1)
+        ]
+        db["resources"].delete_many({})
+        if updated_resources:
+            db["resources"].insert_many(updated_resources)
+
+        db["galaxy_meta"].update_one(
+            {"_id": _META_ID},
+            {
+                "$inc": {"star_count": -len(removed)},
+                "$set": {
+                    "hyperlane_count": len(updated_lanes),
+                    "resource_count": len(updated_resources),
+                },
+            },
+        )
+        return deleted
+
+    def add_hyperlane(self, a: int, b: int) -> tuple[int, bool]:
+        db = self.db
+        existing = db["hyperlanes"].find_one({"$or": [{"a": a, "b": b}, {"a": b, "b": a}]})
+        if existing:
+            return int(existing["idx"]), False
+
+        meta = db["galaxy_meta"].find_one_and_update(
+            {"_id": _META_ID},
+            {
+                "$setOnInsert": {
+                    "width": 0,
+                    "height": 0,
+                    "star_count": 0,
+                    "resource_count": 0,
+                    "country_count": 0,
+                },
+                "$inc": {"hyperlane_count": 1},
+            },
+            upsert=True,
+            return_document=ReturnDocument.BEFORE,
+        )
+        idx = int(meta.get("hyperlane_count", 0)) if meta else 0
+        db["hyperlanes"].insert_one({"idx": idx, "a": a, "b": b})
+        return idx, True
+
+    def replace_hyperlanes_from(self, start: int, pairs: Sequence[tuple[int, int]]) -> None:
+        db = self.db
+        db["hyperlanes"].bulk_write(
+            [DeleteMany({"idx": {"$gte": start}})]
+            + [InsertOne({"idx": start + offset, "a": a, "b": b}) for offset, (a, b) in enumerate(pairs)]
+        )
+        db["galaxy_meta"].update_one(
+            {"_id": _META_ID}, {"$set": {"hyperlane_count": start + len(pairs)}}, upsert=True
+        )
+
+    def delete_hyperlane(self, idx: int) -> dict | None:
+        db = self.db
+        deleted = db["hyperlanes"].find_one_and_delete({"idx": idx}, {"_id": 0, "a": 1, "b": 1})
+        if deleted is None:
+            return None
+
+        lanes_to_shift = list(db["hyperlanes"].find({"idx": {"$gt": idx}}).sort("idx", 1))
+        for lane in lanes_to_shift:
+            db["hyperlanes"].update_one({"_id": lane["_id"]}, {"$set": {"idx": lane["idx"] - 1}})
+
+        db["galaxy_meta"].update_one(
+            {"_id": _META_ID},
+            {"$inc": {"hyperlane_count": -1}},
+        )
+        return deleted
@@ -0,0 +1,376 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Mapping, Sequence
+from uuid import uuid4
+
+from .base import CHANGE_LOG_SIZE, StorageBackend
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS stars (
+    idx INTEGER PRIMARY KEY,
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hyperlanes (
+    idx INTEGER PRIMARY KEY,
+    a INTEGER NOT NULL,
+    b INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hyperlanes_a ON hyperlanes (a);
+CREATE INDEX IF NOT EXISTS hyperlanes_b ON hyperlanes (b);
+CREATE TABLE IF NOT EXISTS resources (id INTEGER PRIMARY KEY, systems TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS resource_definitions (idx INTEGER PRIMARY KEY, doc TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS countries (idx INTEGER PRIMARY KEY, doc TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS changes (
+    version INTEGER PRIMARY KEY,
+    epoch TEXT NOT NULL,
+    op TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+"""
+
+_ITER_QUERIES = {
+    "stars": "SELECT doc FROM stars ORDER BY idx",
+    "hyperlanes": "SELECT a, b FROM hyperlanes ORDER BY idx",
+    "resources": "SELECT id, systems FROM resources ORDER BY id",
+    "resource_definitions": "SELECT doc FROM resource_definitions ORDER BY idx",
+    "countries": "SELECT doc FROM countries ORDER BY idx",
+}
+_FETCH_SIZE = 1000
+
+
+def _dumps(doc) -> str:
+    return json.dumps(doc, separators=(",", ":"))
+
+
+def _pick(doc: dict, fields: Sequence[str] | None) -> dict:
+    if not fields:
+        return doc
+    return {field: doc[field] for field in fields if field in doc}
+
+
+def _row_to_doc(collection: str, row: tuple) -> dict:
+    if collection == "hyperlanes":
+        return {"a": row[0], "b": row[1]}
+    if collection == "resources":
+        return {"id": row[0], "systems": json.loads(row[1])}
+    return json.loads(row[0])
+
+
+class SQLiteBackend(StorageBackend):
+    """Embedded single-file backend for local pipelines and tests.
+
+    Each thread gets its own connection; the database runs in WAL mode so
+    readers never block the writer. Whole-table writes go through
+    ``executemany`` inside a single transaction.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self.conn.executescript(_SCHEMA)
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)",
+            [("epoch", _dumps(uuid4().hex)), ("version", "0")],
+        )
+
+    def _connect(self, *, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=check_same_thread
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _meta_values(self, conn: sqlite3.Connection) -> dict:
+        return {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM meta")}
+
+    def _set_meta(self, conn: sqlite3.Connection, **values) -> None:
+        conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            [(key, _dumps(value)) for key, value in values.items()],
+        )
+
+    def get_meta(self) -> dict:
+        conn = self.conn
+        meta = {"width": 0, "height": 0, **self._meta_values(conn)}
+        for collection, key in (
+            ("stars", "star_count"),
+            ("hyperlanes", "hyperlane_count"),
+            ("resources", "resource_count"),
+            ("countries", "country_count"),
+        ):
+            meta[key] = conn.execute(f"SELECT COUNT(*) FROM {collection}").fetchone()[0]
+        return meta
+
+    def get_version(self) -> tuple[str, int]:
+        meta = dict(
+            self.conn.execute("SELECT key, value FROM meta WHERE key IN ('epoch', 'version')")
+        )
+        return json.loads(meta["epoch"]), int(meta["version"])
+
+    def bump_version(self) -> tuple[str, int]:
+        with self._transaction() as conn:
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            meta = dict(conn.execute("SELECT key, value FROM meta WHERE key IN ('epoch', 'version')"))
+        return json.loads(meta["epoch"]), int(meta["version"])
+
+    def record_change(self, op: str, payload: dict) -> tuple[str, int]:
+        with self._transaction() as conn:
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            meta = dict(conn.execute("SELECT key, value FROM meta WHERE key IN ('epoch', 'version')"))
+            epoch, version = json.loads(meta["epoch"]), int(meta["version"])
+            conn.execute(
+                "INSERT OR REPLACE INTO changes (version, epoch, op, payload) VALUES (?, ?, ?, ?)",
+                (version, epoch, op, _dumps(payload)),
+            )
+            conn.execute(
+                "DELETE FROM changes WHERE epoch != ? OR version <= ?",
+                (epoch, version - CHANGE_LOG_SIZE),
+            )
+        return epoch, version
+
+    def get_changes(self, epoch: str, since: int, limit: int) -> List[dict]:
+        rows = self.conn.execute(
+            "SELECT version, op, payload FROM changes WHERE epoch = ? AND version > ? "
+            "ORDER BY version LIMIT ?",
+            (epoch, since, limit),
+        ).fetchall()
+        return [{**json.loads(payload), "version": version, "op": op} for version, op, payload in rows]
+
+    def oldest_change_version(self, epoch: str) -> int | None:
+        row = self.conn.execute("SELECT MIN(version) FROM changes WHERE epoch = ?", (epoch,)).fetchone()
+        return row[0]
+
+    def iter_docs(self, collection: str, fields: Sequence[str] | None = None) -> Iterator[dict]:
+        query = _ITER_QUERIES[collection]
+        coordinates_only = collection == "stars" and fields and set(fields) <= {"x", "y"}
+        if coordinates_only:
+            query = "SELECT x, y FROM stars ORDER BY idx"
+        # A dedicated connection keeps one snapshot for the whole iteration and
+        # lets streaming consumers resume the generator from any thread.
+        conn = self._connect(check_same_thread=False)
+        try:
+            cursor = conn.execute(query)
+            while True:
+                rows = cursor.fetchmany(_FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    if coordinates_only:
+                        yield _pick({"x": row[0], "y": row[1]}, fields)
+                    else:
+                        yield _pick(_row_to_doc(collection, row), fields)
+        finally:
+            conn.close()
+
+    def replace_galaxy(
+        self,
+        width: int,
+        height: int,
+        stars: List[dict],
+        hyperlanes: List[dict],
+        resources: List[dict],
+    ) -> None:
+        with self._transaction() as conn:
+            self._set_meta(conn, width=int(width), height=int(height))
+            conn.execute("DELETE FROM stars")
+            conn.executemany(
+                "INSERT INTO stars (idx, x, y, doc) VALUES (?, ?, ?, ?)",
+                ((idx, s["x"], s["y"], _dumps(s)) for idx, s in enumerate(stars)),
+            )
+            conn.execute("DELETE FROM hyperlanes")
+            conn.executemany(
+                "INSERT INTO hyperlanes (idx, a, b) VALUES (?, ?, ?)",
+                ((idx, lane["a"], lane["b"]) for idx, lane in enumerate(hyperlanes)),
+            )
+            conn.execute("DELETE FROM resources")
+            conn.executemany(
+                "INSERT INTO resources (id, systems) VALUES (?, ?)",
+                ((int(r["id"]), _dumps(list(r["systems"]))) for r in resources),
+            )
+
+    def _replace_docs(self, table: str, docs: Iterable[dict]) -> None:
+        with self._transaction() as conn:
+            conn.execute(f"DELETE FROM {table}")
+            conn.executemany(
+                f"INSERT INTO {table} (idx, doc) VALUES (?, ?)",
+                ((idx, _dumps(doc)) for idx, doc in enumerate(docs)),
+            )
+
+    def replace_resource_definitions(self, docs: Iterable[dict]) -> None:
+        self._replace_docs("resource_definitions", docs)
+
+    def replace_countries(self, docs: Iterable[dict]) -> None:
+        self._replace_docs("countries", docs)
+
+    def get_star(self, idx: int) -> dict | None:
+        row = self.conn.execute("SELECT doc FROM stars WHERE idx = ?", (idx,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_stars(self, indices: Sequence[int], fields: Sequence[str] | None = None) -> List[dict]:
+        rows = self.conn.execute(
+            "SELECT idx, doc FROM stars WHERE idx IN (SELECT value FROM json_each(?)) ORDER BY idx",
+            (_dumps([int(i) for i in indices]),),
+        )
+        return [{**_pick(json.loads(doc), fields), "idx": idx} for idx, doc in rows]
+
+    def _write_star(self, conn: sqlite3.Connection, idx: int, doc: dict) -> bool:
+        cursor = conn.execute(
+            "UPDATE stars SET x = ?, y = ?, doc = ? WHERE idx = ?",
+            (doc["x"], doc["y"], _dumps(doc), idx),
+        )
+        return cursor.rowcount > 0
+
+    def update_star(self, idx: int, doc: dict) -> bool:
+        with self._transaction() as conn:
+            return self._write_star(conn, idx, doc)
+
+    def update_star_fields(self, idx: int, fields: dict) -> bool:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT doc FROM stars WHERE idx = ?", (idx,)).fetchone()
+            if not row:
+                return False
+            return self._write_star(conn, idx, {**json.loads(row[0]), **fields})
+
+    def update_stars_fields(self, updates: Mapping[int, dict]) -> None:
+        if not updates:
+            return
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT idx, doc FROM stars WHERE idx IN (SELECT value FROM json_each(?))",
+                (_dumps(list(updates)),),
+            ).fetchall()
+            merged = [(idx, {**json.loads(doc), **updates[idx]}) for idx, doc in rows]
+            conn.executemany(
+                "UPDATE stars SET x = ?, y = ?, doc = ? WHERE idx = ?",
+                ((doc["x"], doc["y"], _dumps(doc), idx) for idx, doc in merged),
+            )
+
+    def add_star(self, doc: dict, width: int, height: int) -> int:
+        with self._transaction() as conn:
+            meta = self._meta_values(conn)
+            self._set_meta(
+                conn,
+                width=max(int(meta.get("width", 0)), int(width)),
+                height=max(int(meta.get("height", 0)), int(height)),
+            )
+            idx = conn.execute("SELECT COUNT(*) FROM stars").fetchone()[0]
+            conn.execute(
+                "INSERT INTO stars (idx, x, y, doc) VALUES (?, ?, ?, ?)",
+                (idx, doc["x"], doc["y"], _dumps(doc)),
+            )
+            return idx
+
+    def delete_star(self, idx: int) -> dict | None:
+        deleted = self.delete_stars([idx])
+        if not deleted:
+            return None
+        deleted[0].pop("idx")
+        return deleted[0]
+
+    def delete_stars(self, indices: Sequence[int]) -> List[dict]:
+        wanted = sorted({int(idx) for idx in indices})
+        with self._transaction() as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS removed_stars (idx INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM removed_stars")
+            conn.executemany("INSERT INTO removed_stars (idx) VALUES (?)", ((idx,) for idx in wanted))
+            rows = conn.execute(
+                "SELECT idx, doc FROM stars WHERE idx IN (SELECT idx FROM removed_stars) ORDER BY idx"
+            ).fetchall()
+            if not rows:
+                return []
+            removed = [idx for idx, _ in rows]
+            conn.execute("DELETE FROM removed_stars WHERE idx NOT IN (SELECT idx FROM stars)")
+            conn.execute("DELETE FROM stars WHERE idx IN (SELECT idx FROM removed_stars)")
+            # Each later star moves down by the number of deleted stars before
+            # it; go through negative indices so the primary key never collides.
+            conn.execute(
+                "UPDATE stars SET idx = -1 - (idx - (SELECT COUNT(*) FROM removed_stars r WHERE r.idx < stars.idx))"
+                " WHERE idx > ?",
+                (removed[0],),
+            )
+            conn.execute("UPDATE stars SET idx = -idx - 1 WHERE idx < 0")
+
+            def shift(idx: int) -> int:
+                return idx - bisect_left(removed, idx)
+
+            gone = set(removed)
+            lanes = conn.execute("SELECT a, b FROM hyperlanes ORDER BY idx").fetchall()
+            kept = [(shift(a), shift(b)) for a, b in lanes if a not in gone and b not in gone]
+            conn.execute("DELETE FROM hyperlanes")
+            conn.executemany(
+                "INSERT INTO hyperlanes (idx, a, b) VALUES (?, ?, ?)",
+                ((pos, a, b) for pos, (a, b) in enumerate(kept) if a != b),
+            )
+
+            regions = conn.execute("SELECT id, systems FROM resources").fetchall()
+            conn.executemany(
+                "UPDATE resources SET systems = ? WHERE id = ?",
+                (
+                    (_dumps([shift(s) for s in json.loads(systems) if s not in gone]), region_id)
+                    for region_id, systems in regions
+                ),
+            )
+            return [{**json.loads(doc), "idx": idx} for idx, doc in rows]
+
+    def add_hyperlane(self, a: int, b: int) -> tuple[int, bool]:
+        with self._transaction() as conn:
+            existing = conn.execute(
+                "SELECT idx FROM hyperlanes WHERE (a = ? AND b = ?) OR (a = ? AND b = ?)",
+                (a, b, b, a),
+            ).fetchone()
+            if existing:
+                return existing[0], False
+            idx = conn.execute("SELECT COUNT(*) FROM hyperlanes").fetchone()[0]
+            conn.execute("INSERT INTO hyperlanes (idx, a, b) VALUES (?, ?, ?)", (idx, a, b))
+            return idx, True
+
+    def replace_hyperlanes_from(self, start: int, pairs: Sequence[tuple[int, int]]) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM hyperlanes WHERE idx >= ?", (start,))
+            conn.executemany(
+                "INSERT INTO hyperlanes (idx, a, b) VALUES (?, ?, ?)",
+                ((start + offset, a, b) for offset, (a, b) in enumerate(pairs)),
+            )
+
+    def delete_hyperlane(self, idx: int) -> dict | None:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT a, b FROM hyperlanes WHERE idx = ?", (idx,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM hyperlanes WHERE idx = ?", (idx,))
+            conn.execute("UPDATE hyperlanes SET idx = -idx WHERE idx > ?", (idx,))
+            conn.execute("UPDATE hyperlanes SET idx = -idx - 1 WHERE idx < 0")
+            return {"a": row[0], "b": row[1]}
@@ -1,22 +1,84 @@
 from __future__ import annotations
 
+import json
+from contextlib import contextmanager
+from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
+import numpy as np
 import typer
 
+from .backends import BACKENDS, configure_backend, get_backend
+from .columnar import export_columnar, is_columnar, load_columnar, open_columnar
 from .config import DEFAULT_DISTRIBUTION, DEFAULT_GALAXY
+from .expansion import DEFAULT_BEAM_WIDTH, DEFAULT_BORDER_PENALTY, ExpansionPlanner
 from .generation import generate_galaxy
+from .graph import GalaxyGraph
+from .profiling import Profiler
 from .rendering import render_galaxy
 from .storage import (
+    get_star_count,
     load_country_definitions,
     load_galaxy,
+    load_hyperlane_pairs,
     load_resource_definitions,
+    load_star_table,
     save_galaxy,
 )
 
 app = typer.Typer(help="GalaxyGen CLI toolkit.")
 
+PROFILE_OPTION = typer.Option(
+    False, "--profile", help="Print per-stage wall time, CPU time and peak memory to stderr."
+)
+PROFILE_OUTPUT_OPTION = typer.Option(
+    None,
+    "--profile-output",
+    help="Save the profile report: .json span tree, .folded collapsed stacks (flamegraph.pl, "
+    "speedscope) or a text table for any other suffix. Implies --profile.",
+)
+CPROFILE_OPTION = typer.Option(
+    None, "--cprofile", help="Also run cProfile and write its stats (pstats, snakeviz) to this file."
+)
+
+
+@contextmanager
+def _profiling(profile: bool, output: Optional[Path], cprofile: Optional[Path]) -> Iterator[None]:
+    if not (profile or output or cprofile):
+        yield
+        return
+    with Profiler(cprofile=cprofile is not None) as profiler:
+        yield
+    typer.echo(profiler.report(), err=True)
+    if output is not None:
+        profiler.write(output)
+        typer.echo(f"Profile report -> {output}", err=True)
+    if cprofile is not None:
+        profiler.dump_cprofile(cprofile)
+        typer.echo(f"cProfile stats -> {cprofile}", err=True)
+
+
+@app.callback()
+def main(
+    storage: Optional[str] = typer.Option(
+        None,
+        "--storage",
+        envvar="GALAXYGEN_STORAGE",
+        help=f"Storage backend ({', '.join(BACKENDS)}). Defaults to mongo.",
+    ),
+    sqlite_path: Optional[Path] = typer.Option(
+        None,
+        "--sqlite-path",
+        envvar="GALAXYGEN_SQLITE_PATH",
+        help="Database file for the sqlite backend.",
+    ),
+) -> None:
+    try:
+        configure_backend(storage, path=sqlite_path)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--storage") from exc
+
 
 @app.command()
 def generate(
@@ -28,22 +90,27 @@ def generate(
         DEFAULT_GALAXY,
         "--resources",
         "-r",
-        help="Unused (MongoDB storage). Resource definitions are loaded from the database.",
+        help="Unused. Resource definitions are loaded from the configured storage.",
     ),
     output: Path = typer.Option(
         DEFAULT_GALAXY,
         "--output",
         "-o",
-        help="Unused (MongoDB storage). Generated galaxies are stored in the database.",
+        help="Unused. Generated galaxies are written to the configured storage.",
     ),
     seed: Optional[int] = typer.Option(None, "--seed", help="Random seed for reproducible outputs."),
+    profile: bool = PROFILE_OPTION,
+    profile_output: Optional[Path] = PROFILE_OUTPUT_OPTION,
+    cprofile: Optional[Path] = CPROFILE_OPTION,
 ) -> None:
     resource_defs = load_resource_definitions()
     country_defs = load_country_definitions()
-    galaxy = generate_galaxy(distribution, system_count, resource_defs, seed, country_defs)
+    with _profiling(profile, profile_output, cprofile):
+        galaxy = generate_galaxy(distribution, system_count, resource_defs, seed, country_defs)
     save_galaxy(None, galaxy)
     typer.echo(
-        f"Galaxy created with {len(galaxy.stars)} systems and {len(galaxy.hyperlanes)} lanes in MongoDB."
+        f"Galaxy created with {len(galaxy.stars)} systems and {len(galaxy.hyperlanes)} lanes "
+        f"in {get_backend().name} storage."
     )
 
 
@@ -53,7 +120,7 @@ def render(
         DEFAULT_GALAXY,
         "--galaxy",
         "-g",
-        help="Unused (MongoDB storage). Galaxy data is loaded from the database.",
+        help="Columnar galaxy directory to render; defaults to the database galaxy.",
     ),
     output_dir: Path = typer.Option(
         DEFAULT_GALAXY.parent, "--output-dir", "-o", help="Where to place rendered images."
@@ -65,19 +132,28 @@ def render(
         DEFAULT_GALAXY,
         "--resources",
         "-r",
-        help="Unused (MongoDB storage). Resource definitions are loaded from the database.",
+        help="Unused. Resource definitions are loaded from the configured storage.",
     ),
     countries: Path = typer.Option(
         DEFAULT_GALAXY,
         "--countries",
         "-c",
-        help="Unused (MongoDB storage). Country definitions are loaded from the database.",
+        help="Unused. Country definitions come from the columnar galaxy or the configured storage.",
     ),
+    profile: bool = PROFILE_OPTION,
+    profile_output: Optional[Path] = PROFILE_OUTPUT_OPTION,
+    cprofile: Optional[Path] = CPROFILE_OPTION,
 ) -> None:
-    galaxy = load_galaxy()
+    if is_columnar(galaxy_path):
+        # A columnar directory carries its own country definitions in meta.json.
+        galaxy = load_columnar(galaxy_path)
+        country_defs = galaxy.countries
+    else:
+        galaxy = load_galaxy()
+        country_defs = load_country_definitions()
     resource_defs = load_resource_definitions()
-    country_defs = load_country_definitions()
-    outputs = render_galaxy(galaxy, resource_defs, country_defs, output_dir, distribution)
+    with _profiling(profile, profile_output, cprofile):
+        outputs = render_galaxy(galaxy, resource_defs, country_defs, output_dir, distribution)
     typer.echo(f"Rendered galaxy -> {outputs['final']}")
 
 
@@ -87,9 +163,18 @@ def info(
         DEFAULT_GALAXY,
         "--galaxy",
         "-g",
-        help="Unused (MongoDB storage). Galaxy data is loaded from the database.",
+        help="Columnar galaxy directory to inspect; defaults to the database galaxy.",
     )
 ) -> None:
+    if is_columnar(galaxy_path):
+        columnar = open_columnar(galaxy_path)
+        meta = columnar.meta
+        typer.echo(
+            f"Galaxy {columnar.width}x{columnar.height} | {len(columnar)} stars | "
+            f"{len(columnar.lanes)} hyperlanes | {len(columnar.resource_ids)} resources | "
+            f"{len(meta.get('countries', []))} countries"
+        )
+        return
     galaxy = load_galaxy()
     typer.echo(
         f"Galaxy {galaxy.width}x{galaxy.height} | {len(galaxy.stars)} stars | "
@@ -98,5 +183,145 @@ def info(
     )
 
 
+@app.command("export")
+def export_galaxy(
+    output: Path = typer.Argument(..., help="Directory to write the columnar galaxy to."),
+) -> None:
+    galaxy = load_galaxy()
+    export_columnar(galaxy, output)
+    typer.echo(f"Exported {len(galaxy.stars)} systems -> {output}")
+
+
+@app.command("import")
+def import_galaxy(
+    source: Path = typer.Argument(..., help="Columnar galaxy directory to load into the database."),
+) -> None:
+    if not is_columnar(source):
+        raise typer.BadParameter(f"{source} is not a columnar galaxy directory")
+    galaxy = load_columnar(source)
+    save_galaxy(None, galaxy)
+    typer.echo(
+        f"Imported {len(galaxy.stars)} systems and {len(galaxy.hyperlanes)} lanes "
+        f"into {get_backend().name} storage."
+    )
+
+
+class GraphMetric(str, Enum):
+    summary = "summary"
+    degree = "degree"
+    betweenness = "betweenness"
+    stress = "stress"
+    distances = "distances"
+    chokepoints = "chokepoints"
+
+
+@app.command("graph")
+def graph_metrics(
+    metric: GraphMetric = typer.Argument(GraphMetric.summary, help="What to compute."),
+    country: Optional[int] = typer.Option(
+        None, "--country", help="Only use systems owned by this country (level-0 admin id)."
+    ),
+    source: Optional[int] = typer.Option(None, "--source", help="Start system for distances."),
+    samples: int = typer.Option(
+        64, "--samples", help="Sampled sources for path centralities; 0 computes them exactly."
+    ),
+    seed: Optional[int] = typer.Option(None, "--seed", help="Seed for source sampling."),
+    workers: int = typer.Option(1, "--workers", help="Processes for path centralities."),
+    top: int = typer.Option(20, "--top", help="How many systems to list."),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write every value as JSON."),
+) -> None:
+    graph = GalaxyGraph(get_star_count(), load_hyperlane_pairs())
+    mapping = np.arange(graph.node_count)
+    if country is not None:
+        graph, mapping = graph.subgraph(np.flatnonzero(load_star_table()[:, 3] == country))
+
+    if metric is GraphMetric.summary:
+        count, labels = graph.connected_components()
+        sizes = np.sort(np.bincount(labels))[::-1] if graph.node_count else np.zeros(0, dtype=int)
+        degree = graph.degree()
+        typer.echo(
+            f"{graph.node_count} systems | {graph.edge_count} lanes | {count} components "
+            f"(largest {int(sizes[0]) if len(sizes) else 0})"
+        )
+        if graph.node_count:
+            typer.echo(f"degree min {degree.min()} | mean {degree.mean():.2f} | max {degree.max()}")
+        return
+
+    if metric is GraphMetric.chokepoints:
+        report = graph.chokepoints(samples or None, seed, workers)
+        cuts = mapping[report.articulation_points]
+        bridges = mapping[report.bridges]
+        typer.echo(f"{len(cuts)} articulation points: {' '.join(map(str, cuts.tolist()))}")
+        typer.echo(f"{len(bridges)} bridges: {' '.join(f'{a}-{b}' for a, b in bridges.tolist())}")
+        typer.echo(f"{'system':>8}  {'betweenness':>11}  {'stress':>12}")
+        for position in np.argsort(-report.betweenness, kind="stable")[:top]:
+            typer.echo(
+                f"{int(mapping[position]):>8}  {report.betweenness[position]:>11.6g}  "
+                f"{report.stress[position]:>12.6g}"
+            )
+        if output is not None:
+            output.write_text(
+                json.dumps(
+                    {
+                        "metric": metric.value,
+                        "systems": mapping.tolist(),
+                        "betweenness": report.betweenness.tolist(),
+                        "stress": report.stress.tolist(),
+                        "articulation_points": cuts.tolist(),
+                        "bridges": bridges.tolist(),
+                    }
+                ),
+                encoding="utf-8",
+            )
+            typer.echo(f"Wrote chokepoint report -> {output}")
+        return
+
+    if metric is GraphMetric.degree:
+        values = graph.degree().astype(float)
+    elif metric is GraphMetric.betweenness:
+        values = graph.betweenness(samples or None, seed, workers=workers)
+    elif metric is GraphMetric.stress:
+        values = graph.path_centrality(samples or None, seed, workers).stress
+    else:
+        if source is None:
+            raise typer.BadParameter("distances needs --source", param_hint="--source")
+        local = np.flatnonzero(mapping == source)
+        if not len(local):
+            raise typer.BadParameter(f"system {source} is not in the graph", param_hint="--source")
+        values = graph.bfs_distances(int(local[0])).astype(float)
+
+    for position in np.argsort(-values, kind="stable")[:top]:
+        typer.echo(f"{int(mapping[position]):>8}  {values[position]:.6g}")
+    if output is not None:
+        output.write_text(
+            json.dumps({"metric": metric.value, "systems": mapping.tolist(), "values": values.tolist()}),
+            encoding="utf-8",
+        )
+        typer.echo(f"Wrote {len(values)} values -> {output}")
+
+
+@app.command()
+def expand(
+    country: int = typer.Argument(..., help="Country (level-0 admin id) to expand."),
+    depth: int = typer.Option(13, "--depth", help="Most systems to claim."),
+    beam_width: int = typer.Option(DEFAULT_BEAM_WIDTH, "--beam", help="Plans kept per step."),
+    max_memory_mb: int = typer.Option(64, "--max-memory-mb", help="Memory budget for one beam step."),
+    border_penalty: float = typer.Option(
+        DEFAULT_BORDER_PENALTY, "--border-penalty", help="Score lost per border system."
+    ),
+) -> None:
+    graph = GalaxyGraph(get_star_count(), load_hyperlane_pairs())
+    planner = ExpansionPlanner.for_country(graph, load_star_table()[:, 3], country, border_penalty)
+    if not planner.owned:
+        raise typer.BadParameter(f"country {country} owns no systems", param_hint="COUNTRY")
+    plan = planner.plan(depth, beam_width, max_memory_mb * 2**20)
+    typer.echo(
+        f"Country {country}: {len(planner.owned)} systems, score {plan.base_score:g} -> {plan.score:g} "
+        f"by claiming {len(plan.systems)}"
+    )
+    if plan.systems:
+        typer.echo(" ".join(map(str, plan.systems)))
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,254 @@
+"""Columnar on-disk galaxy format.
+
+A columnar galaxy is a directory of NumPy ``.npy`` arrays that can be opened
+with ``mmap_mode="r"``, plus offset-indexed UTF-8 blobs for variable-length
+per-star data::
+
+    meta.json                      width/height, counts, country definitions
+    star_x.npy, star_y.npy         int32[n]
+    star_type.npy                  uint8[n]  (codes from ``STAR_TYPE_CODES``)
+    admin_levels.npy               int32[n, k]  (-1 = unassigned)
+    admin_level_len.npy            uint8[n]  (original list length per star)
+    lanes.npy                      int32[m, 2]
+    resource_ids.npy               int32[r]
+    resource_offsets.npy           int64[r + 1]  into resource_systems.npy
+    resource_systems.npy           int32[sum of region sizes]
+    <blob>.offsets.npy, <blob>.bin names, descriptions, bodies, timelines
+
+Bodies and timelines are stored as one JSON document per star. Opening a
+galaxy only maps the files; nothing is parsed until a value is accessed.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .models import (
+    CelestialBody,
+    CountryDefinition,
+    Galaxy,
+    Hyperlane,
+    ResourceRegion,
+    Star,
+    Timeline,
+)
+from .types import STAR_TYPE_CODES
+
+FORMAT_NAME = "galaxygen-columnar"
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+
+_STAR_TYPES = list(STAR_TYPE_CODES)
+_BLOBS = ("names", "descriptions", "bodies", "timelines")
+
+
+class StringTable:
+    """Read-only sequence of strings backed by an offsets array and a byte blob."""
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray) -> None:
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx: int) -> str:
+        if idx < 0:
+            idx += len(self)
+        start, end = int(self.offsets[idx]), int(self.offsets[idx + 1])
+        return self.data[start:end].tobytes().decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for idx in range(len(self)):
+            yield self[idx]
+
+
+def _write_strings(path: Path, stem: str, values: Iterable[str]) -> None:
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    np.save(path / f"{stem}.offsets.npy", offsets)
+    (path / f"{stem}.bin").write_bytes(b"".join(encoded))
+
+
+def _read_strings(path: Path, stem: str, mmap: bool) -> StringTable:
+    offsets = np.load(path / f"{stem}.offsets.npy", mmap_mode="r" if mmap else None)
+    blob = path / f"{stem}.bin"
+    if mmap and blob.stat().st_size > 0:
+        data = np.memmap(blob, dtype=np.uint8, mode="r")
+    else:
+        data = np.frombuffer(blob.read_bytes(), dtype=np.uint8)
+    return StringTable(offsets, data)
+
+
+def admin_matrix(stars: Sequence[Star]) -> tuple[np.ndarray, np.ndarray]:
+    """``admin_levels`` as an int32 matrix (-1 = unassigned) plus each star's list length."""
+    lengths = np.fromiter((len(s.admin_levels) for s in stars), dtype=np.uint8, count=len(stars))
+    width = max(4, int(lengths.max())) if len(stars) else 4
+    matrix = np.full((len(stars), width), -1, dtype=np.int32)
+    for idx, star in enumerate(stars):
+        for level, value in enumerate(star.admin_levels):
+            if value is not None:
+                matrix[idx, level] = value
+    return matrix, lengths
+
+
+def admin_levels_at(matrix: np.ndarray, lengths: np.ndarray, idx: int) -> List[Optional[int]]:
+    """Star ``idx``'s ``admin_levels`` list back from :func:`admin_matrix` output."""
+    return [None if v < 0 else int(v) for v in matrix[idx, : int(lengths[idx])]]
+
+
+def resource_csr(regions: Iterable[Tuple[int, Sequence[int]]]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """``(ids, offsets, systems)`` for ``(id, systems)`` regions; region ``i`` is
+    ``systems[offsets[i]:offsets[i + 1]]``."""
+    regions = [(int(region_id), systems) for region_id, systems in regions]
+    offsets = np.zeros(len(regions) + 1, dtype=np.int64)
+    if regions:
+        np.cumsum([len(systems) for _, systems in regions], out=offsets[1:])
+    ids = np.array([region_id for region_id, _ in regions], dtype=np.int32)
+    systems = np.array([s for _, members in regions for s in members], dtype=np.int32)
+    return ids, offsets, systems
+
+
+def export_columnar(galaxy: Galaxy, path: Path) -> Path:
+    """Write ``galaxy`` to ``path`` (a directory) in the columnar format."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    stars = galaxy.stars
+    count = len(stars)
+
+    np.save(path / "star_x.npy", np.fromiter((s.x for s in stars), dtype=np.int32, count=count))
+    np.save(path / "star_y.npy", np.fromiter((s.y for s in stars), dtype=np.int32, count=count))
+    np.save(
+        path / "star_type.npy",
+        np.fromiter((STAR_TYPE_CODES[s.star_type] for s in stars), dtype=np.uint8, count=count),
+    )
+    admin, admin_len = admin_matrix(stars)
+    np.save(path / "admin_levels.npy", admin)
+    np.save(path / "admin_level_len.npy", admin_len)
+
+    lanes = np.array([lane.as_pair() for lane in galaxy.hyperlanes], dtype=np.int32).reshape(-1, 2)
+    np.save(path / "lanes.npy", lanes)
+
+    resource_ids, resource_offsets, resource_systems = resource_csr(
+        (region.id, region.systems) for region in galaxy.resources
+    )
+    np.save(path / "resource_ids.npy", resource_ids)
+    np.save(path / "resource_offsets.npy", resource_offsets)
+    np.save(path / "resource_systems.npy", resource_systems)
+
+    _write_strings(path, "names", (s.name for s in stars))
+    _write_strings(path, "descriptions", (s.description for s in stars))
+    _write_strings(
+        path,
+        "bodies",
+        (json.dumps([b.model_dump(mode="json") for b in s.bodies], separators=(",", ":")) for s in stars),
+    )
+    _write_strings(path, "timelines", (s.timeline.model_dump_json() for s in stars))
+
+    meta = {
+        "format": FORMAT_NAME,
+        "format_version": FORMAT_VERSION,
+        "width": int(galaxy.width),
+        "height": int(galaxy.height),
+        "star_count": count,
+        "hyperlane_count": len(lanes),
+        "resource_count": len(resource_ids),
+        "countries": [c.model_dump(mode="json") for c in galaxy.countries],
+    }
+    (path / META_FILE).write_text(json.dumps(meta), encoding="utf-8")
+    return path
+
+
+def is_columnar(path: Path) -> bool:
+    return (Path(path) / META_FILE).is_file() and (Path(path) / "star_x.npy").is_file()
+
+
+class ColumnarGalaxy:
+    """A galaxy opened from the columnar format.
+
+    Numeric columns are exposed directly as (memory-mapped) arrays; strings,
+    bodies and timelines are decoded per star on access.
+    """
+
+    def __init__(self, path: Path, mmap: bool = True) -> None:
+        self.path = Path(path)
+        self.meta = json.loads((self.path / META_FILE).read_text(encoding="utf-8"))
+        if self.meta.get("format") != FORMAT_NAME:
+            raise ValueError(f"{self.path} is not a columnar galaxy")
+        if int(self.meta.get("format_version", 0)) > FORMAT_VERSION:
+            raise ValueError(
+                f"{self.path} uses columnar format v{self.meta['format_version']}; "
+                f"this version of galaxygen reads up to v{FORMAT_VERSION}"
+            )
+        mode = "r" if mmap else None
+
+        def load(name: str) -> np.ndarray:
+            return np.load(self.path / name, mmap_mode=mode)
+
+        self.x = load("star_x.npy")
+        self.y = load("star_y.npy")
+        self.star_type = load("star_type.npy")
+        self.admin_levels = load("admin_levels.npy")
+        self.admin_level_len = load("admin_level_len.npy")
+        self.lanes = load("lanes.npy")
+        self.resource_ids = load("resource_ids.npy")
+        self.resource_offsets = load("resource_offsets.npy")
+        self.resource_systems = load("resource_systems.npy")
+        self.names, self.descriptions, self.bodies, self.timelines = (
+            _read_strings(self.path, stem, mmap) for stem in _BLOBS
+        )
+
+    @property
+    def width(self) -> int:
+        return int(self.meta["width"])
+
+    @property
+    def height(self) -> int:
+        return int(self.meta["height"])
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def star(self, idx: int) -> Star:
+        admin = admin_levels_at(self.admin_levels, self.admin_level_len, idx)
+        return Star(
+            x=int(self.x[idx]),
+            y=int(self.y[idx]),
+            name=self.names[idx],
+            description=self.descriptions[idx],
+            star_type=_STAR_TYPES[int(self.star_type[idx])],
+            admin_levels=admin,
+            bodies=[CelestialBody(**body) for body in json.loads(self.bodies[idx])],
+            timeline=Timeline.model_validate_json(self.timelines[idx]),
+        )
+
+    def resource_systems_for(self, region: int) -> np.ndarray:
+        start, end = self.resource_offsets[region], self.resource_offsets[region + 1]
+        return self.resource_systems[start:end]
+
+    def to_galaxy(self) -> Galaxy:
+        return Galaxy(
+            width=self.width,
+            height=self.height,
+            stars=[self.star(idx) for idx in range(len(self))],
+            hyperlanes=[Hyperlane(a=int(a), b=int(b)) for a, b in self.lanes.tolist()],
+            resources=[
+                ResourceRegion(id=int(rid), systems=self.resource_systems_for(pos).tolist())
+                for pos, rid in enumerate(self.resource_ids)
+            ],
+            countries=[CountryDefinition(**entry) for entry in self.meta.get("countries", [])],
+        )
+
+
+def open_columnar(path: Path, mmap: bool = True) -> ColumnarGalaxy:
+    return ColumnarGalaxy(path, mmap=mmap)
+
+
+def load_columnar(path: Path) -> Galaxy:
+    return open_columnar(path).to_galaxy()
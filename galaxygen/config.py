@@ -6,6 +6,7 @@ DEFAULT_GALAXY = DATA_DIR / "galaxies" / "default" / "galaxy.json"
 DEFAULT_DISTRIBUTION = DATA_DIR / "assets" / "Distribution.png"
 DEFAULT_RESOURCES = DATA_DIR / "assets" / "resources.json"
 DEFAULT_COUNTRIES = DATA_DIR / "assets" / "countries.json"
+DEFAULT_SQLITE_PATH = DATA_DIR / "galaxygen.sqlite3"
 
 # Rendering defaults
 SCALE = 10
@@ -0,0 +1,307 @@
+"""Connected components of the hyperlane graph, kept current across edits.
+
+Adding a lane is a union-find merge (union by size, path halving), so
+"are A and B connected" and "which component is X in" cost near-constant
+time. Removing a lane cannot be undone in a union-find; instead a search
+grows outwards from both endpoints at once, always extending the smaller
+side, and stops as soon as the two meet. In a Delaunay-like lane graph an
+alternative path is usually a few hops away, so most deletions touch only a
+handful of stars. Only when one side runs out of stars has the lane split
+its component, and only that component's two pieces are relabelled.
+
+Splits are logged with the storage version that caused them so callers can
+warn about edits that disconnected part of the galaxy.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+# Split events retained for :meth:`Connectivity.splits_since`.
+SPLIT_LOG = 256
+
+
+class Connectivity:
+    """Incremental connected components over ``node_count`` stars and their lanes.
+
+    Stars are tracked under internal ids that never change; ``_alive`` maps
+    storage indices to them, so deleting a star (which shifts every later
+    storage index) costs one array delete instead of renumbering every
+    parent pointer and neighbor set. A deleted star's id stays behind, with
+    no lanes, as a link in its old component's parent chains until the
+    structure is rebuilt.
+    """
+
+    def __init__(self, node_count: int, lanes: Iterable[Sequence[int]]) -> None:
+        self._lock = threading.Lock()
+        pairs = np.asarray(lanes, dtype=np.int64).reshape(-1, 2)
+        self._alive = np.arange(node_count, dtype=np.int64)
+        self._lanes: List[Tuple[int, int]] = [tuple(pair) for pair in pairs.tolist()]
+        self._adjacent: List[Dict[int, int]] = [{} for _ in range(node_count)]
+        for a, b in self._lanes:
+            if a != b:
+                self._adjacent[a][b] = self._adjacent[a].get(b, 0) + 1
+                self._adjacent[b][a] = self._adjacent[b].get(a, 0) + 1
+
+        # Seed the union-find from one vectorized labelling: every star points
+        # straight at the first star of its component.
+        valid = pairs[pairs[:, 0] != pairs[:, 1]]
+        matrix = coo_matrix(
+            (np.ones(len(valid), dtype=np.int8), (valid[:, 0], valid[:, 1])), shape=(node_count, node_count)
+        )
+        self.components, labels = connected_components(matrix, directed=False)
+        _, first = np.unique(labels, return_index=True)
+        self._parent: List[int] = first[labels].tolist()
+        self._size: List[int] = [0] * node_count
+        for root, size in zip(first.tolist(), np.bincount(labels, minlength=len(first)).tolist()):
+            self._size[root] = size
+        self._splits: Deque[dict] = deque(maxlen=SPLIT_LOG)
+
+    def __len__(self) -> int:
+        return len(self._alive)
+
+    def _id(self, star: int) -> int:
+        if not 0 <= star < len(self._alive):
+            raise IndexError(f"star {star} is not in the graph")
+        return int(self._alive[star])
+
+    def _index(self, node: int) -> int:
+        return int(np.searchsorted(self._alive, node))
+
+    # -- union-find -----------------------------------------------------------
+
+    def _find(self, node: int) -> int:
+        parent = self._parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def _union(self, a: int, b: int) -> None:
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return
+        if self._size[a] < self._size[b]:
+            a, b = b, a
+        self._parent[b] = a
+        self._size[a] += self._size[b]
+        self.components -= 1
+
+    def _relabel(self, nodes: Set[int], root: int) -> None:
+        for node in nodes:
+            self._parent[node] = root
+        self._size[root] = len(nodes)
+
+    # -- queries --------------------------------------------------------------
+
+    def connected(self, a: int, b: int) -> bool:
+        with self._lock:
+            return self._find(self._id(a)) == self._find(self._id(b))
+
+    def component(self, star: int) -> int:
+        """Opaque id of ``star``'s component, shared by every star in it.
+
+        Ids stay the same until the component is split; after a merge the
+        merged component takes one of the two ids.
+        """
+        with self._lock:
+            return self._find(self._id(star))
+
+    def component_size(self, star: int) -> int:
+        with self._lock:
+            return self._size[self._find(self._id(star))]
+
+    def splits_since(self, version: int) -> List[dict]:
+        """Logged splits caused by changes after ``version``, oldest first.
+
+        Each is ``{"version", "op", "components": [{"star", "size"}, ...]}``
+        with star indices as of that change.
+        """
+        with self._lock:
+            return [split for split in self._splits if split["version"] > version]
+
+    # -- edits ----------------------------------------------------------------
+
+    def _unlink(self, a: int, b: int) -> bool:
+        """Drop one a-b lane; True when that disconnects ``a`` from ``b``."""
+        for u, v in ((a, b), (b, a)):
+            if self._adjacent[u][v] == 1:
+                del self._adjacent[u][v]
+            else:
+                self._adjacent[u][v] -= 1
+        if b in self._adjacent[a] or self._separated(a, b) is None:
+            return False
+        self._settle((a, b))
+        self.components += 1
+        return True
+
+    def _separated(self, a: int, b: int) -> Optional[Set[int]]:
+        """The piece holding ``a`` or ``b`` when they are no longer connected, else None."""
+        seen = ({a}, {b})
+        queues = (deque([a]), deque([b]))
+        while queues[0] and queues[1]:
+            side = 0 if len(seen[0]) <= len(seen[1]) else 1
+            mine, other = seen[side], seen[1 - side]
+            for neighbor in self._adjacent[queues[side].popleft()]:
+                if neighbor in other:
+                    return None
+                if neighbor not in mine:
+                    mine.add(neighbor)
+                    queues[side].append(neighbor)
+        return seen[0] if not queues[0] else seen[1]
+
+    def _settle(self, starts: Iterable[int]) -> List[int]:
+        """Relabel the pieces holding ``starts``; returns one start per distinct piece.
+
+        Stars anywhere in the old component may have parents pointing into
+        another piece, so every piece of it must be relabelled, not only the
+        one that came loose.
+        """
+        seen: Set[int] = set()
+        representatives = []
+        for start in starts:
+            if start in seen:
+                continue
+            piece, queue = {start}, deque([start])
+            while queue:
+                for neighbor in self._adjacent[queue.popleft()]:
+                    if neighbor not in piece:
+                        piece.add(neighbor)
+                        queue.append(neighbor)
+            self._relabel(piece, min(piece))
+            seen |= piece
+            representatives.append(start)
+        return representatives
+
+    def _log_split(self, version: int, op: str, nodes: Iterable[int]) -> None:
+        self._splits.append(
+            {
+                "version": version,
+                "op": op,
+                "components": [
+                    {"star": self._index(node), "size": self._size[self._find(node)]} for node in nodes
+                ],
+            }
+        )
+
+    def _add_star(self) -> None:
+        node = len(self._parent)
+        self._alive = np.append(self._alive, node)
+        self._parent.append(node)
+        self._size.append(1)
+        self._adjacent.append({})
+        self.components += 1
+
+    def _add_lane(self, a: int, b: int) -> None:
+        self._lanes.append((a, b))
+        if a != b:
+            self._adjacent[a][b] = self._adjacent[a].get(b, 0) + 1
+            self._adjacent[b][a] = self._adjacent[b].get(a, 0) + 1
+            self._union(a, b)
+
+    def _delete_lane(self, idx: int, version: int) -> None:
+        a, b = self._lanes.pop(idx)
+        if a != b and self._unlink(a, b):
+            self._log_split(version, "hyperlane_deleted", (a, b))
+
+    def _delete_star(self, idx: int, version: int) -> None:
+        node = int(self._alive[idx])
+        neighbors = sorted(self._adjacent[node])
+        for neighbor in neighbors:
+            del self._adjacent[neighbor][node]
+        self._adjacent[node] = {}
+        self._lanes = [(a, b) for a, b in self._lanes if a != node and b != node]
+        self._alive = np.delete(self._alive, idx)
+        if not neighbors:
+            self.components -= 1
+        elif all(self._separated(u, v) is None for u, v in zip(neighbors, neighbors[1:])):
+            # ``node`` stays behind as a parent pointer inside its old
+            # component, which only loses one star.
+            self._size[self._find(neighbors[0])] -= 1
+        else:
+            pieces = self._settle(neighbors)
+            self.components += len(pieces) - 1
+            self._log_split(version, "star_deleted", pieces)
+
+    def _delete_stars(self, indices: Sequence[int], version: int) -> None:
+        """Delete several stars with one pass over the lanes and one index shift."""
+        removed = np.unique(np.asarray(indices, dtype=np.int64))
+        nodes = set(self._alive[removed].tolist())
+        # Removed stars and the surviving stars they touched, per old component.
+        groups: Dict[int, Tuple[List[int], Set[int]]] = {}
+        for node in nodes:
+            gone, touched = groups.setdefault(self._find(node), ([], set()))
+            gone.append(node)
+            touched.update(neighbor for neighbor in self._adjacent[node] if neighbor not in nodes)
+        for node in nodes:
+            for neighbor in self._adjacent[node]:
+                if neighbor not in nodes:
+                    del self._adjacent[neighbor][node]
+            self._adjacent[node] = {}
+        self._lanes = [(a, b) for a, b in self._lanes if a not in nodes and b not in nodes]
+        keep = np.ones(len(self._alive), dtype=bool)
+        keep[removed] = False
+        self._alive = self._alive[keep]
+
+        for gone, touched in groups.values():
+            neighbors = sorted(touched)
+            if not neighbors:
+                # Nothing left of the component touched a removed star, so
+                # nothing is left of it at all.
+                self.components -= 1
+            elif all(self._separated(u, v) is None for u, v in zip(neighbors, neighbors[1:])):
+                self._size[self._find(neighbors[0])] -= len(gone)
+            else:
+                pieces = self._settle(neighbors)
+                self.components += len(pieces) - 1
+                self._log_split(version, "stars_deleted", pieces)
+
+    def apply_change(self, change: dict) -> bool:
+        """Patch the components for one ``galaxygen.storage`` change; False means rebuild."""
+        with self._lock:
+            return self._apply(change, change.get("version", 0))
+
+    def _apply(self, change: dict, version: int) -> bool:
+        op = change.get("op")
+        if op == "batch":
+            return all(self._apply(sub, version) for sub in change["changes"])
+        if op in ("star_updated", "star_fields_updated", "countries_replaced", "resource_definitions_replaced"):
+            return True
+        if op == "star_added":
+            if change["idx"] != len(self._alive):
+                return False
+            self._add_star()
+            return True
+        if op == "star_deleted":
+            if not 0 <= change["idx"] < len(self._alive):
+                return False
+            self._delete_star(change["idx"], version)
+            return True
+        if op == "stars_deleted":
+            indices = change["indices"]
+            if indices and not 0 <= min(indices) <= max(indices) < len(self._alive):
+                return False
+            self._delete_stars(indices, version)
+            return True
+        if op == "hyperlane_added":
+            a, b = int(change["a"]), int(change["b"])
+            if change["idx"] != len(self._lanes) or not (0 <= a < len(self) and 0 <= b < len(self)):
+                return False
+            self._add_lane(self._id(a), self._id(b))
+            return True
+        if op == "hyperlane_deleted":
+            idx = change["idx"]
+            if not 0 <= idx < len(self._lanes):
+                return False
+            a, b = self._lanes[idx]
+            if {self._index(a), self._index(b)} != {change["a"], change["b"]}:
+                return False
+            self._delete_lane(idx, version)
+            return True
+        return False
@@ -2,14 +2,29 @@
 
 import os
 
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
 from pymongo.database import Database
 
+from .metrics import MONGO_COMMAND_SECONDS
+
+try:
+    from pymongo import AsyncMongoClient
+except ImportError:  # pymongo < 4.13
+    AsyncMongoClient = None
+
 _DEFAULT_DB_NAME = "galaxygen"
+_POOL_OPTIONS = {
+    "maxPoolSize": "MONGO_MAX_POOL_SIZE",
+    "minPoolSize": "MONGO_MIN_POOL_SIZE",
+    "waitQueueTimeoutMS": "MONGO_WAIT_QUEUE_TIMEOUT_MS",
+}
 
 _client: MongoClient | None = None
 _database: Database | None = None
 _indexes_ready = False
+_async_client = None
+_async_database = None
+_async_indexes_ready = False
 
 
 def _resolve_db_name() -> str:
@@ -20,23 +35,90 @@ def _resolve_db_name() -> str:
     )
 
 
+def _pool_options() -> dict:
+    return {
+        option: int(os.environ[env])
+        for option, env in _POOL_OPTIONS.items()
+        if os.getenv(env)
+    }
+
+
+class _CommandMetrics(monitoring.CommandListener):
+    """Feeds driver-reported command durations into ``MONGO_COMMAND_SECONDS``."""
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        MONGO_COMMAND_SECONDS.observe(
+            event.duration_micros / 1e6, command=event.command_name, outcome="succeeded"
+        )
+
+    def failed(self, event) -> None:
+        MONGO_COMMAND_SECONDS.observe(
+            event.duration_micros / 1e6, command=event.command_name, outcome="failed"
+        )
+
+
+_COMMAND_METRICS = _CommandMetrics()
+
+
+def _client_options() -> dict:
+    return {**_pool_options(), "event_listeners": [_COMMAND_METRICS]}
+
+
+def _require_uri() -> str:
+    uri = os.getenv("MONGO_URI")
+    if not uri:
+        raise RuntimeError("MONGO_URI is required to use MongoDB storage")
+    return uri
+
+
+_UNIQUE_INDEXES = (
+    ("stars", "idx"),
+    ("hyperlanes", "idx"),
+    ("resource_definitions", "idx"),
+    ("countries", "idx"),
+    ("resources", "id"),
+)
+
+
 def _ensure_indexes(db: Database) -> None:
-    db["stars"].create_index("idx", unique=True)
-    db["hyperlanes"].create_index("idx", unique=True)
-    db["resource_definitions"].create_index("idx", unique=True)
-    db["countries"].create_index("idx", unique=True)
-    db["resources"].create_index("id", unique=True)
+    for collection, key in _UNIQUE_INDEXES:
+        db[collection].create_index(key, unique=True)
+    db["galaxy_changes"].create_index([("epoch", 1), ("version", 1)])
 
 
 def get_database() -> Database:
     global _client, _database, _indexes_ready
     if _database is None:
-        uri = os.getenv("MONGO_URI")
-        if not uri:
-            raise RuntimeError("MONGO_URI is required to use MongoDB storage")
-        _client = MongoClient(uri)
+        _client = MongoClient(_require_uri(), **_client_options())
         _database = _client[_resolve_db_name()]
     if not _indexes_ready:
         _ensure_indexes(_database)
         _indexes_ready = True
     return _database
+
+
+def async_driver_available() -> bool:
+    return AsyncMongoClient is not None and os.getenv("GALAXYGEN_ASYNC_MONGO", "1") != "0"
+
+
+async def get_async_database():
+    """Return the database on a shared ``AsyncMongoClient``.
+
+    Pool sizing follows the same ``MONGO_*_POOL_SIZE`` settings as the
+    synchronous client.
+    """
+    global _async_client, _async_database, _async_indexes_ready
+    if AsyncMongoClient is None:
+        raise RuntimeError("Async MongoDB access requires pymongo>=4.13")
+    if _async_database is None:
+        _async_client = AsyncMongoClient(_require_uri(), **_client_options())
+        _async_database = _async_client[_resolve_db_name()]
+    if not _async_indexes_ready:
+        for collection, key in _UNIQUE_INDEXES:
+            await _async_database[collection].create_index(key, unique=True)
+        await _async_database["galaxy_changes"].create_index([("epoch", 1), ("version", 1)])
+        _async_indexes_ready = True
+    return _async_database
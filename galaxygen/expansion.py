@@ -0,0 +1,174 @@
+"""Beam search for where a country should expand next.
+
+A plan adds up to ``depth`` unclaimed systems, each adjacent (by hyperlane)
+to the country or to an earlier addition. Plans are scored as
+
+    owned systems - border_penalty * border systems
+
+where a border system is an owned one with at least one neighbor the country
+does not own, so compact, defensible shapes beat long tendrils.
+
+Each level keeps only the ``beam_width`` best plans. Children are scored from
+their parent's score by looking at the added star's neighborhood, so a child
+costs O(degree^2) to score and is only materialized (frontier copied) when it
+makes the beam. Plans are deduplicated as sets, so the same systems reached
+in a different order count once.
+"""
+
+from __future__ import annotations
+
+import heapq
+import sys
+from typing import FrozenSet, Iterable, Iterator, List, NamedTuple, Set, Tuple
+
+import numpy as np
+
+from .graph import GalaxyGraph
+
+DEFAULT_BEAM_WIDTH = 64
+DEFAULT_BORDER_PENALTY = 2.0
+DEFAULT_MAX_MEMORY = 64 * 2**20
+
+
+class ExpansionPlan(NamedTuple):
+    systems: List[int]  # in the order they are claimed
+    score: float
+    base_score: float
+
+
+class _State(NamedTuple):
+    score: float
+    order: Tuple[int, ...]
+    added: FrozenSet[int]
+    frontier: FrozenSet[int]
+    borders: int
+
+
+class ExpansionPlanner:
+    """Plans expansions of ``owned`` systems into systems outside ``occupied``.
+
+    ``occupied`` are systems nobody may claim (typically every owned system,
+    including ``owned``).
+    """
+
+    def __init__(
+        self,
+        graph: GalaxyGraph,
+        owned: Iterable[int],
+        occupied: Iterable[int] = (),
+        border_penalty: float = DEFAULT_BORDER_PENALTY,
+    ) -> None:
+        self._indptr = graph.indptr.tolist()
+        self._indices = graph.indices.tolist()
+        self.owned = frozenset(int(star) for star in owned)
+        self.blocked = self.owned | frozenset(int(star) for star in occupied)
+        self.border_penalty = border_penalty
+
+    @classmethod
+    def for_country(
+        cls, graph: GalaxyGraph, countries: np.ndarray, country: int, border_penalty: float = DEFAULT_BORDER_PENALTY
+    ) -> "ExpansionPlanner":
+        """Planner for ``country`` given each star's level-0 country (-1 when unowned)."""
+        return cls(
+            graph,
+            np.flatnonzero(countries == country).tolist(),
+            np.flatnonzero(countries >= 0).tolist(),
+            border_penalty,
+        )
+
+    def neighbors(self, star: int) -> List[int]:
+        return self._indices[self._indptr[star] : self._indptr[star + 1]]
+
+    def _is_border(self, star: int, owned_extra: FrozenSet[int], claimed: int = -1) -> bool:
+        return any(
+            n != claimed and n not in self.owned and n not in owned_extra for n in self.neighbors(star)
+        )
+
+    def _score(self, owned_count: int, borders: int) -> float:
+        return owned_count - self.border_penalty * borders
+
+    def _root(self) -> _State:
+        empty: FrozenSet[int] = frozenset()
+        borders = sum(self._is_border(star, empty) for star in self.owned)
+        frontier = frozenset(
+            n for star in self.owned for n in self.neighbors(star) if n not in self.blocked
+        )
+        return _State(self._score(len(self.owned), borders), (), empty, frontier, borders)
+
+    def _children(self, state: _State) -> Iterator[Tuple[float, int, int]]:
+        """``(score, star, borders)`` for every one-system extension of ``state``."""
+        owned_count = len(self.owned) + len(state.added) + 1
+        for star in state.frontier:
+            borders = state.borders
+            # The new system is a border unless all its neighbors are owned.
+            if self._is_border(star, state.added):
+                borders += 1
+            # Owned neighbors whose only unowned neighbor was ``star`` stop
+            # being borders.
+            for n in self.neighbors(star):
+                if (n in self.owned or n in state.added) and self._is_border(n, state.added) and not (
+                    self._is_border(n, state.added, claimed=star)
+                ):
+                    borders -= 1
+            yield self._score(owned_count, borders), star, borders
+
+    def _extend(self, state: _State, star: int, score: float, borders: int) -> _State:
+        added = state.added | {star}
+        fresh = [n for n in self.neighbors(star) if n not in self.blocked and n not in added]
+        return _State(score, state.order + (star,), added, (state.frontier - {star}).union(fresh), borders)
+
+    def plan(
+        self, depth: int, beam_width: int = DEFAULT_BEAM_WIDTH, max_memory: int = DEFAULT_MAX_MEMORY
+    ) -> ExpansionPlan:
+        """Best plan of at most ``depth`` new systems (possibly none).
+
+        ``max_memory`` bounds the bytes held by one beam level; the beam is
+        narrowed below ``beam_width`` when states are large.
+        """
+        root = self._root()
+        best = root
+        beam = [root]
+        for _ in range(depth):
+            # Size the beam from the states we actually hold; frontiers grow
+            # as plans spread, so this is re-checked every level.
+            state_bytes = max(_state_size(state) for state in beam)
+            width = max(1, min(beam_width, max_memory // max(state_bytes, 1)))
+            candidates: List[Tuple[float, int, int, int, int]] = []
+            # Sets currently in the heap. A set that was rejected or evicted
+            # scores the same from any parent and would lose again, so only
+            # these need deduplicating.
+            queued: Set[FrozenSet[int]] = set()
+            counter = 0
+            for parent_idx, state in enumerate(beam):
+                for score, star, borders in self._children(state):
+                    key = state.added | {star}
+                    if key in queued:
+                        continue
+                    entry = (score, -counter, parent_idx, star, borders)
+                    counter += 1
+                    if len(candidates) < width:
+                        heapq.heappush(candidates, entry)
+                    elif entry > candidates[0]:
+                        evicted = heapq.heapreplace(candidates, entry)
+                        queued.discard(beam[evicted[2]].added | {evicted[3]})
+                    else:
+                        continue
+                    queued.add(key)
+            if not candidates:
+                break
+            beam = [
+                self._extend(beam[parent_idx], star, score, borders)
+                for score, _, parent_idx, star, borders in sorted(candidates, reverse=True)
+            ]
+            if beam[0].score > best.score:
+                best = beam[0]
+        return ExpansionPlan(list(best.order), best.score, root.score)
+
+
+def _state_size(state: _State) -> int:
+    return (
+        sys.getsizeof(state.order)
+        + sys.getsizeof(state.added)
+        + sys.getsizeof(state.frontier)
+        + 28 * (len(state.added) + len(state.frontier))
+    )
@@ -2,12 +2,13 @@ from __future__ import annotations
 
 import random
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
 import numpy as np
 from PIL import Image
 from scipy.spatial import Delaunay
 
+from .arrays import GalaxyArrays
 from .models import (
     CelestialBody,
     CountryDefinition,
@@ -17,6 +18,9 @@ from .models import (
     ResourceDefinition,
     Star,
 )
+from .metrics import stage
+from .profiling import span, traced
+from .progress import ProgressCallback, report
 from .random_names import generate_random_word
 from .resources import assign_resources
 from .system_generation import generate_system_profile, StarType
@@ -37,6 +41,10 @@ def _midpoint_density(a: np.ndarray, b: np.ndarray, density: np.ndarray) -> floa
 def sample_stars_from_density(
     distribution: np.ndarray, system_count: int, rng: random.Random
 ) -> List[Star]:
+    return [Star(x=x, y=y) for x, y in _sample_points(distribution, system_count, rng)]
+
+
+def _sample_points(distribution: np.ndarray, system_count: int, rng: random.Random) -> List[tuple[int, int]]:
     points: List[tuple[int, int]] = []
     height, width, _ = distribution.shape
     for y in range(height):
@@ -80,11 +88,11 @@ def sample_stars_from_density(
             f"reduce system_count or use a larger/denser distribution map."
         )
 
-    return [Star(x=int(p[0]), y=int(p[1])) for p in selected]
+    return [(int(px), int(py)) for px, py in selected]
 
 
 def generate_hyperlanes(
-    stars: List[Star], distribution: np.ndarray, rng: random.Random, min_midpoint_density: float = 0.05
+    stars: Sequence[Star], distribution: np.ndarray, rng: random.Random, min_midpoint_density: float = 0.05
 ) -> List[Hyperlane]:
     as_array = np.array([s.as_tuple() for s in stars])
     if len(stars) < 3:
@@ -93,7 +101,20 @@ def generate_hyperlanes(
             lanes.append(Hyperlane(a=idx, b=idx + 1))
         return lanes
 
-    triangulation = Delaunay(as_array)
+    with span("delaunay"):
+        triangulation = Delaunay(as_array)
+    with span("select_lanes"):
+        return _select_lanes(stars, as_array, triangulation, distribution, rng, min_midpoint_density)
+
+
+def _select_lanes(
+    stars: Sequence[Star],
+    as_array: np.ndarray,
+    triangulation: Delaunay,
+    distribution: np.ndarray,
+    rng: random.Random,
+    min_midpoint_density: float,
+) -> List[Hyperlane]:
     lanes: List[Hyperlane] = []
 
     for idx, star in enumerate(stars):
@@ -132,6 +153,7 @@ def generate_hyperlanes(
     return lanes
 
 
+@traced("generate_galaxy")
 def generate_galaxy(
     distribution_path: Path,
     system_count: int,
@@ -139,46 +161,91 @@ def generate_galaxy(
     rng_seed: Optional[int] = None,
     countries: Optional[List[CountryDefinition]] = None,
     min_midpoint_density: float = 0.05,
+    progress: Optional[ProgressCallback] = None,
 ) -> Galaxy:
-    rng = random.Random(rng_seed)
-    image = Image.open(distribution_path).convert("RGB")
-    distribution = np.array(image) / 255
-
-    stars = sample_stars_from_density(distribution, system_count, rng)
-    hyperlanes = generate_hyperlanes(stars, distribution, rng, min_midpoint_density)
-
-    galaxy = Galaxy(
-        width=image.size[0],
-        height=image.size[1],
-        stars=stars,
-        hyperlanes=hyperlanes,
-        resources=[],
-        countries=countries or [],
+    arrays = _generate_arrays(
+        distribution_path, system_count, resources, rng_seed, countries, min_midpoint_density, progress
+    )
+    with stage("generate", "materialize"):
+        galaxy = arrays.to_galaxy()
+    report(progress, "done", 1.0)
+    return galaxy
+
+
+@traced("generate_galaxy")
+def generate_galaxy_arrays(
+    distribution_path: Path,
+    system_count: int,
+    resources: Optional[List[ResourceDefinition]] = None,
+    rng_seed: Optional[int] = None,
+    countries: Optional[List[CountryDefinition]] = None,
+    min_midpoint_density: float = 0.05,
+    progress: Optional[ProgressCallback] = None,
+) -> GalaxyArrays:
+    """Same galaxy as :func:`generate_galaxy`, left in struct-of-arrays form."""
+    arrays = _generate_arrays(
+        distribution_path, system_count, resources, rng_seed, countries, min_midpoint_density, progress
     )
+    report(progress, "done", 1.0)
+    return arrays
+
 
-    # Generate star details
-    for idx, star in enumerate(galaxy.stars):
-        profile = generate_system_profile(galaxy, idx, rng_seed or 0)
-        if profile:
-            star.star_type = StarType(profile['classification'])
-            star.name = generate_random_word()
-            star.description = f"A {profile['classification']} type star"
-            star.bodies = []
-            for body in profile["bodies"]:
-                name = body.get("name") or generate_random_word()
-                if body["type"] == PlanetType.ASTEROID_BELT.value and not name.endswith(" Belt"):
-                    name = f"{name} Belt"
-                star.bodies.append(
-                    CelestialBody(
-                        name=name,
-                        type=PlanetType(body["type"]),
-                        distance_au=body["dist_au"],
-                        angle_deg=0.0,  # placeholder
-                        radius_km=1000.0,  # placeholder
-                    )
-                )
+def _generate_arrays(
+    distribution_path: Path,
+    system_count: int,
+    resources: Optional[List[ResourceDefinition]],
+    rng_seed: Optional[int],
+    countries: Optional[List[CountryDefinition]],
+    min_midpoint_density: float,
+    progress: Optional[ProgressCallback],
+) -> GalaxyArrays:
+    rng = random.Random(rng_seed)
+    with stage("generate", "load_distribution"):
+        image = Image.open(distribution_path).convert("RGB")
+        distribution = np.array(image) / 255
+
+    report(progress, "sampling stars", 0.0)
+    with stage("generate", "sampling"):
+        points = _sample_points(distribution, system_count, rng)
+    galaxy = GalaxyArrays(image.size[0], image.size[1], points, countries=countries or [])
+    report(progress, "hyperlanes", 0.2)
+    with stage("generate", "hyperlanes"):
+        hyperlanes = generate_hyperlanes(galaxy.stars, distribution, rng, min_midpoint_density)
+        galaxy.set_lanes([lane.as_pair() for lane in hyperlanes])
+
+    # Generate star details straight into the columns; bodies are collected
+    # per star and written as one CSR block at the end.
+    report_every = max(1, len(galaxy) // 100)
+    bodies: List[List[CelestialBody]] = [[] for _ in range(len(galaxy))]
+    with stage("generate", "systems"):
+        for idx, star in enumerate(galaxy.stars):
+            if idx % report_every == 0:
+                report(progress, "systems", 0.3 + 0.6 * idx / len(galaxy))
+            with span("system_profile"):
+                profile = generate_system_profile(galaxy, idx, rng_seed or 0)
+            if profile:
+                with span("naming"):
+                    star.star_type = StarType(profile['classification'])
+                    star.name = generate_random_word()
+                    star.description = f"A {profile['classification']} type star"
+                    for body in profile["bodies"]:
+                        name = body.get("name") or generate_random_word()
+                        if body["type"] == PlanetType.ASTEROID_BELT.value and not name.endswith(" Belt"):
+                            name = f"{name} Belt"
+                        bodies[idx].append(
+                            CelestialBody(
+                                name=name,
+                                type=PlanetType(body["type"]),
+                                distance_au=body["dist_au"],
+                                angle_deg=0.0,  # placeholder
+                                radius_km=1000.0,  # placeholder
+                            )
+                        )
+        galaxy.set_bodies(bodies)
 
     if resources:
-        galaxy.resources = assign_resources(resources, galaxy, rng)
+        report(progress, "resources", 0.9)
+        with stage("generate", "resources"):
+            galaxy.set_resources((region.id, region.systems) for region in assign_resources(resources, galaxy, rng))
 
     return galaxy
@@ -0,0 +1,76 @@
+"""Compact binary geometry for GPU clients.
+
+The blob is little-endian and every section is made of 4-byte elements, so a
+client can wrap each one in a typed array without copying::
+
+    header      uint32[8]   magic "GGEO", format version, star count n,
+                            lane count m, width, height, 0, 0
+    positions   float32[2n] x0, y0, x1, y1, ...
+    star_types  uint32[n]   codes from ``STAR_TYPE_CODES``
+    lanes       uint32[2m]  a0, b0, a1, b1, ...
+    countries   uint32[n]   level-0 admin country id, ``NO_COUNTRY`` if unowned
+
+Section offsets follow from the counts: positions start at byte 32, star
+types at ``32 + 8n``, lanes at ``32 + 12n`` and countries at ``32 + 12n + 8m``.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+MAGIC = b"GGEO"
+FORMAT_VERSION = 1
+HEADER_WORDS = 8
+NO_COUNTRY = 0xFFFFFFFF
+
+
+def encode_geometry(
+    width: int,
+    height: int,
+    positions: np.ndarray,
+    star_types: np.ndarray,
+    countries: np.ndarray,
+    lanes: np.ndarray,
+) -> bytes:
+    """Pack star and lane arrays into the layout described in the module docstring.
+
+    ``countries`` uses -1 for unowned stars; it is stored as ``NO_COUNTRY``.
+    """
+    positions = np.asarray(positions).reshape(-1, 2)
+    lanes = np.asarray(lanes).reshape(-1, 2)
+    header = np.zeros(HEADER_WORDS, dtype="<u4")
+    header[0] = np.frombuffer(MAGIC, dtype="<u4")[0]
+    header[1:6] = (FORMAT_VERSION, len(positions), len(lanes), width, height)
+    countries = np.asarray(countries, dtype=np.int64)
+    return b"".join(
+        (
+            header.tobytes(),
+            positions.astype("<f4").tobytes(),
+            np.asarray(star_types).astype("<u4").tobytes(),
+            lanes.astype("<u4").tobytes(),
+            np.where(countries < 0, NO_COUNTRY, countries).astype("<u4").tobytes(),
+        )
+    )
+
+
+def decode_geometry(blob: bytes) -> dict:
+    """Inverse of :func:`encode_geometry`, returning NumPy views into ``blob``."""
+    header = np.frombuffer(blob, dtype="<u4", count=HEADER_WORDS)
+    if header[0].tobytes() != MAGIC:
+        raise ValueError("not a galaxy geometry blob")
+    if int(header[1]) != FORMAT_VERSION:
+        raise ValueError(f"unsupported geometry format version {int(header[1])}")
+    n, m = int(header[2]), int(header[3])
+    offset = HEADER_WORDS * 4
+    sections = {}
+    for name, dtype, count in (
+        ("positions", "<f4", 2 * n),
+        ("star_types", "<u4", n),
+        ("lanes", "<u4", 2 * m),
+        ("countries", "<u4", n),
+    ):
+        sections[name] = np.frombuffer(blob, dtype=dtype, count=count, offset=offset)
+        offset += 4 * count
+    sections["positions"] = sections["positions"].reshape(n, 2)
+    sections["lanes"] = sections["lanes"].reshape(m, 2)
+    return {"width": int(header[4]), "height": int(header[5]), **sections}
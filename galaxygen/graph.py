@@ -0,0 +1,309 @@
+"""Hyperlane graph analytics on a sparse CSR adjacency.
+
+:class:`GalaxyGraph` is built once from the lane list and answers degree,
+connected-component, BFS-distance, path-centrality (betweenness and stress)
+and cut-vertex/cut-lane queries with NumPy and ``scipy.sparse`` instead of a
+per-edge Python graph. Breadth-first searches expand a whole frontier per
+step, so the Python loop runs once per BFS level rather than once per edge.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, shortest_path
+
+from .models import Galaxy
+
+
+class GalaxyGraph:
+    """Undirected, unweighted hyperlane graph over star indices ``0..n-1``.
+
+    Lanes that repeat, loop back to their own star or point outside the star
+    range are ignored.
+    """
+
+    def __init__(self, node_count: int, lanes) -> None:
+        pairs = np.asarray(lanes, dtype=np.int64).reshape(-1, 2)
+        a, b = pairs[:, 0], pairs[:, 1]
+        valid = (a != b) & (a >= 0) & (b >= 0) & (a < node_count) & (b < node_count)
+        a, b = a[valid], b[valid]
+        matrix = csr_matrix(
+            (np.ones(2 * len(a), dtype=np.int8), (np.concatenate([a, b]), np.concatenate([b, a]))),
+            shape=(node_count, node_count),
+        )
+        self._set_matrix(matrix)
+
+    def _set_matrix(self, matrix: csr_matrix) -> None:
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        matrix.sort_indices()
+        self.adjacency = matrix
+        self.indptr = matrix.indptr.astype(np.int64)
+        self.indices = matrix.indices.astype(np.int64)
+
+    @classmethod
+    def from_galaxy(cls, galaxy: Galaxy) -> "GalaxyGraph":
+        return cls(len(galaxy.stars), [(lane.a, lane.b) for lane in galaxy.hyperlanes])
+
+    @property
+    def node_count(self) -> int:
+        return self.adjacency.shape[0]
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices) // 2
+
+    def edges(self) -> np.ndarray:
+        """``(m, 2)`` array of distinct lanes with ``a < b``."""
+        rows = np.repeat(np.arange(self.node_count), np.diff(self.indptr))
+        upper = rows < self.indices
+        return np.column_stack([rows[upper], self.indices[upper]])
+
+    def neighbors(self, node: int) -> np.ndarray:
+        return self.indices[self.indptr[node] : self.indptr[node + 1]]
+
+    def subgraph(self, nodes: Sequence[int]) -> Tuple["GalaxyGraph", np.ndarray]:
+        """Graph induced by ``nodes`` plus the original index of each of its nodes."""
+        mapping = np.unique(np.asarray(nodes, dtype=np.int64))
+        sub = GalaxyGraph.__new__(GalaxyGraph)
+        sub._set_matrix(self.adjacency[mapping][:, mapping].tocsr())
+        return sub, mapping
+
+    # -- analytics ------------------------------------------------------
+
+    def degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def connected_components(self) -> Tuple[int, np.ndarray]:
+        """Return the component count and a component label per star."""
+        count, labels = connected_components(self.adjacency, directed=False)
+        return int(count), labels
+
+    def _expand(self, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """All ``(source, neighbor)`` edge pairs leaving ``frontier``."""
+        starts = self.indptr[frontier]
+        counts = self.indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        sources = np.repeat(frontier, counts)
+        # Position of each edge within the CSR ``indices`` array.
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(starts, counts)
+        return sources, self.indices[offsets]
+
+    def bfs_distances(self, source: int, max_distance: Optional[int] = None) -> np.ndarray:
+        """Hop count from ``source`` to every star; -1 where unreachable.
+
+        With ``max_distance`` the search stops there and farther stars are -1.
+        """
+        if not 0 <= source < self.node_count:
+            raise IndexError(f"star {source} is not in the graph")
+        dist = np.full(self.node_count, -1, dtype=np.int64)
+        dist[source] = 0
+        frontier = np.array([source], dtype=np.int64)
+        depth = 0
+        while frontier.size and (max_distance is None or depth < max_distance):
+            _, reached = self._expand(frontier)
+            frontier = np.unique(reached[dist[reached] < 0])
+            depth += 1
+            dist[frontier] = depth
+        return dist
+
+    def _dependencies(self, source: int, dist: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Brandes dependencies of ``source`` on every star, given its hop distances.
+
+        Returns the betweenness term (fraction of shortest paths through each
+        star) and the stress term (number of shortest paths through it).
+        """
+        n = self.node_count
+        # Edges of the shortest-path DAG, grouped by the level they leave.
+        above = dist[self._rows]
+        forward = np.isfinite(above) & (dist[self.indices] == above + 1)
+        level = above[forward].astype(np.int32)
+        order = np.argsort(level, kind="stable")
+        tails, heads = self._rows[forward][order], self.indices[forward][order]
+        bounds = np.searchsorted(level[order], np.arange(int(level.max(initial=-1)) + 2))
+
+        sigma = np.zeros(n)
+        sigma[source] = 1.0
+        spans = list(zip(bounds[:-1], bounds[1:]))
+        for lo, hi in spans:
+            np.add.at(sigma, heads[lo:hi], sigma[tails[lo:hi]])
+
+        delta = np.zeros(n)
+        # Shortest paths from ``source`` that continue past each star.
+        onward = np.zeros(n)
+        ratio = sigma[tails] / np.where(sigma[heads] > 0, sigma[heads], 1.0)
+        for lo, hi in reversed(spans):
+            below = heads[lo:hi]
+            np.add.at(delta, tails[lo:hi], ratio[lo:hi] * (1.0 + delta[below]))
+            np.add.at(onward, tails[lo:hi], 1.0 + onward[below])
+        delta[source] = onward[source] = 0.0
+        return delta, sigma * onward
+
+    @property
+    def _rows(self) -> np.ndarray:
+        """Tail star of every entry of ``indices``."""
+        rows = self.__dict__.get("_row_cache")
+        if rows is None:
+            rows = self._row_cache = np.repeat(np.arange(self.node_count), np.diff(self.indptr))
+        return rows
+
+    def _accumulate(self, sources: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        betweenness = np.zeros(self.node_count)
+        stress = np.zeros(self.node_count)
+        # Distances for a chunk of sources come from one C-level BFS call;
+        # chunks keep the (sources x stars) matrix to a few tens of MB.
+        chunk = max(1, min(256, 2**22 // max(self.node_count, 1)))
+        for start in range(0, len(sources), chunk):
+            batch = sources[start : start + chunk]
+            dists = shortest_path(self.adjacency, directed=False, unweighted=True, indices=batch)
+            for source, dist in zip(batch, np.atleast_2d(dists)):
+                delta, paths = self._dependencies(int(source), dist)
+                betweenness += delta
+                stress += paths
+        return betweenness, stress
+
+    def path_centrality(
+        self, samples: Optional[int] = None, seed: Optional[int] = None, workers: Optional[int] = None
+    ) -> PathCentrality:
+        """Betweenness (normalized) and stress centrality from one Brandes pass.
+
+        Exact when ``samples`` is None or covers every star; otherwise the
+        searches start from ``samples`` random sources and the sums are
+        scaled up to estimate the full ones. With ``workers`` > 1 the sources
+        are split into batches that run in a process pool.
+        """
+        n = self.node_count
+        if samples is None or samples >= n:
+            sources = np.arange(n)
+        else:
+            sources = np.random.default_rng(seed).choice(n, size=samples, replace=False)
+
+        if workers and workers > 1 and len(sources) > 1:
+            batches = [batch for batch in np.array_split(sources, workers * 4) if len(batch)]
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(
+                workers, mp_context=context, initializer=_init_worker, initargs=(self,)
+            ) as pool:
+                parts = list(pool.map(_accumulate_in_worker, batches))
+            betweenness = np.sum([part[0] for part in parts], axis=0)
+            stress = np.sum([part[1] for part in parts], axis=0)
+        else:
+            betweenness, stress = self._accumulate(sources)
+
+        extrapolate = n / max(len(sources), 1)
+        # Sums run over ordered (source, target) pairs; each undirected pair
+        # is seen twice.
+        stress *= 0.5 * extrapolate
+        if n > 2:
+            betweenness *= extrapolate / ((n - 1) * (n - 2))
+        return PathCentrality(betweenness, stress)
+
+    def betweenness(
+        self,
+        samples: Optional[int] = None,
+        seed: Optional[int] = None,
+        normalized: bool = True,
+        workers: Optional[int] = None,
+    ) -> np.ndarray:
+        """Betweenness centrality per star; see :meth:`path_centrality`.
+
+        Scaling matches networkx's ``betweenness_centrality``.
+        """
+        n = self.node_count
+        values = self.path_centrality(samples, seed, workers).betweenness
+        if not normalized and n > 2:
+            values = values * ((n - 1) * (n - 2) / 2)
+        return values
+
+    def _lowlinks(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Iterative Tarjan DFS; returns articulation points and bridges."""
+        n = self.node_count
+        indptr, indices = self.indptr.tolist(), self.indices.tolist()
+        order = [-1] * n
+        low = [0] * n
+        articulation = [False] * n
+        bridges = []
+        counter = 0
+        for root in range(n):
+            if order[root] != -1:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            root_children = 0
+            # (node, parent, next neighbor position)
+            stack = [(root, -1, indptr[root])]
+            while stack:
+                node, parent, position = stack[-1]
+                if position < indptr[node + 1]:
+                    stack[-1] = (node, parent, position + 1)
+                    child = indices[position]
+                    if order[child] == -1:
+                        order[child] = low[child] = counter
+                        counter += 1
+                        if node == root:
+                            root_children += 1
+                        stack.append((child, node, indptr[child]))
+                    elif child != parent:
+                        low[node] = min(low[node], order[child])
+                    continue
+                stack.pop()
+                if parent == -1:
+                    continue
+                low[parent] = min(low[parent], low[node])
+                if low[node] > order[parent]:
+                    bridges.append((min(parent, node), max(parent, node)))
+                if parent != root and low[node] >= order[parent]:
+                    articulation[parent] = True
+            if root_children > 1:
+                articulation[root] = True
+        return (
+            np.flatnonzero(np.array(articulation, dtype=bool)),
+            np.array(sorted(bridges), dtype=np.int64).reshape(-1, 2),
+        )
+
+    def articulation_points(self) -> np.ndarray:
+        """Stars whose removal disconnects their component."""
+        return self._lowlinks()[0]
+
+    def bridges(self) -> np.ndarray:
+        """``(k, 2)`` lanes (``a < b``) whose removal disconnects their component."""
+        return self._lowlinks()[1]
+
+    def chokepoints(
+        self, samples: Optional[int] = None, seed: Optional[int] = None, workers: Optional[int] = None
+    ) -> Chokepoints:
+        centrality = self.path_centrality(samples, seed, workers)
+        articulation, bridges = self._lowlinks()
+        return Chokepoints(centrality.betweenness, centrality.stress, articulation, bridges)
+
+
+class PathCentrality(NamedTuple):
+    betweenness: np.ndarray
+    stress: np.ndarray
+
+
+class Chokepoints(NamedTuple):
+    """Per-star path centralities plus the cut vertices and cut lanes of a graph."""
+
+    betweenness: np.ndarray
+    stress: np.ndarray
+    articulation_points: np.ndarray
+    bridges: np.ndarray
+
+
+# Set in pool workers so each batch task only ships its source indices.
+_worker_graph: Optional[GalaxyGraph] = None
+
+
+def _init_worker(graph: GalaxyGraph) -> None:
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _accumulate_in_worker(sources: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return _worker_graph._accumulate(sources)
@@ -0,0 +1,319 @@
+"""Quadtree level-of-detail aggregates for zoomed-out galaxy views."""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .models import Galaxy
+from .ownership import level0_owner
+from .types import StarType, star_type_code
+
+DEFAULT_MAX_LEVEL = 8
+
+_STAR_TYPES = list(StarType)
+_LOD_FIELDS = ("x", "y", "star_type", "admin_levels")
+
+
+class GalaxyLOD:
+    """Per-level star clusters and lane bundles over a quadtree of the galaxy.
+
+    Level ``L`` splits the square extent into ``2**L`` by ``2**L`` cells. Every
+    level keeps dense per-cell star counts, coordinate sums and star-type
+    histograms, a sparse per-cell histogram of owning countries and the number
+    of hyperlanes joining each pair of distinct cells. A star or lane touches
+    one cell per level, so :meth:`apply_change` patches the aggregates in
+    O(levels) instead of rebuilding them; deletes additionally shift the
+    per-star arrays in O(n).
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        positions: np.ndarray,
+        star_types: np.ndarray,
+        countries: np.ndarray,
+        lanes: np.ndarray,
+        max_level: int = DEFAULT_MAX_LEVEL,
+    ) -> None:
+        if max_level < 0:
+            raise ValueError("max_level must be non-negative")
+        self.max_level = max_level
+        self.size = 1 << max(0, int(np.ceil(np.log2(max(width, height, 1)))))
+        self._lock = threading.Lock()
+
+        self._x = np.asarray(positions, dtype=np.int64).reshape(-1, 2)[:, 0].copy()
+        self._y = np.asarray(positions, dtype=np.int64).reshape(-1, 2)[:, 1].copy()
+        self._type = np.asarray(star_types, dtype=np.int64).copy()
+        self._country = np.asarray(countries, dtype=np.int64).copy()
+        self._lanes = np.asarray(lanes, dtype=np.int64).reshape(-1, 2).copy()
+        self._build()
+
+    @classmethod
+    def from_star_docs(
+        cls,
+        width: int,
+        height: int,
+        stars: Iterable[dict],
+        lanes: np.ndarray,
+        max_level: int = DEFAULT_MAX_LEVEL,
+    ) -> "GalaxyLOD":
+        """Build from raw star documents (only ``x``, ``y``, ``star_type`` and
+        ``admin_levels`` are read) and an ``(m, 2)`` array of lane endpoints."""
+        rows = [
+            (doc["x"], doc["y"], star_type_code(doc.get("star_type", StarType.G)), level0_owner(doc.get("admin_levels")))
+            for doc in stars
+        ]
+        table = np.array(rows, dtype=np.int64).reshape(-1, 4)
+        return cls(width, height, table[:, :2], table[:, 2], table[:, 3], lanes, max_level)
+
+    @classmethod
+    def from_galaxy(cls, galaxy: Galaxy, max_level: int = DEFAULT_MAX_LEVEL) -> "GalaxyLOD":
+        lanes = np.array([lane.as_pair() for lane in galaxy.hyperlanes], dtype=np.int64)
+        return cls.from_star_docs(
+            galaxy.width,
+            galaxy.height,
+            (star.model_dump(include=set(_LOD_FIELDS)) for star in galaxy.stars),
+            lanes,
+            max_level,
+        )
+
+    def __len__(self) -> int:
+        return len(self._x)
+
+    # -- construction -----------------------------------------------------
+
+    def _leaf(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        side = 1 << self.max_level
+        scale = side / self.size
+        lx = np.clip((np.asarray(x) * scale).astype(np.int64), 0, side - 1)
+        ly = np.clip((np.asarray(y) * scale).astype(np.int64), 0, side - 1)
+        return lx, ly
+
+    def _cells(self, lx, ly, level: int):
+        shift = self.max_level - level
+        return ((ly >> shift) << level) | (lx >> shift)
+
+    def _build(self) -> None:
+        n_types = len(_STAR_TYPES)
+        lx, ly = self._leaf(self._x, self._y)
+        self._counts: List[np.ndarray] = []
+        self._sum_x: List[np.ndarray] = []
+        self._sum_y: List[np.ndarray] = []
+        self._types: List[np.ndarray] = []
+        self._owners: List[Dict[int, Dict[int, int]]] = []
+        self._bundles: List[Dict[Tuple[int, int], int]] = []
+
+        owned = self._country >= 0
+        for level in range(self.max_level + 1):
+            n_cells = 1 << (2 * level)
+            cells = self._cells(lx, ly, level)
+            self._counts.append(np.bincount(cells, minlength=n_cells))
+            self._sum_x.append(np.bincount(cells, weights=self._x, minlength=n_cells))
+            self._sum_y.append(np.bincount(cells, weights=self._y, minlength=n_cells))
+            self._types.append(
+                np.bincount(cells * n_types + self._type, minlength=n_cells * n_types).reshape(n_cells, n_types)
+            )
+
+            owners: Dict[int, Dict[int, int]] = {}
+            pairs, counts = np.unique(
+                np.stack([cells[owned], self._country[owned]], axis=1).reshape(-1, 2), axis=0, return_counts=True
+            )
+            for (cell, country), count in zip(pairs.tolist(), counts.tolist()):
+                owners.setdefault(cell, {})[country] = count
+            self._owners.append(owners)
+
+            bundles: Dict[Tuple[int, int], int] = {}
+            if len(self._lanes):
+                ends = cells[self._lanes]
+                ends = ends[ends[:, 0] != ends[:, 1]]
+                keys, counts = np.unique(np.sort(ends, axis=1), axis=0, return_counts=True)
+                bundles = {(a, b): count for (a, b), count in zip(keys.tolist(), counts.tolist())}
+            self._bundles.append(bundles)
+
+    # -- incremental maintenance -------------------------------------------
+
+    def _star_cells(self, idx: int) -> List[int]:
+        lx, ly = self._leaf(self._x[idx], self._y[idx])
+        return [int(self._cells(lx, ly, level)) for level in range(self.max_level + 1)]
+
+    def _count_star(self, idx: int, sign: int) -> None:
+        x, y = int(self._x[idx]), int(self._y[idx])
+        star_type, country = int(self._type[idx]), int(self._country[idx])
+        for level, cell in enumerate(self._star_cells(idx)):
+            self._counts[level][cell] += sign
+            self._sum_x[level][cell] += sign * x
+            self._sum_y[level][cell] += sign * y
+            self._types[level][cell, star_type] += sign
+            if country >= 0:
+                owners = self._owners[level].setdefault(cell, {})
+                owners[country] = owners.get(country, 0) + sign
+                if owners[country] <= 0:
+                    del owners[country]
+                if not owners:
+                    del self._owners[level][cell]
+
+    def _count_lane(self, a: int, b: int, sign: int) -> None:
+        cells_a, cells_b = self._star_cells(a), self._star_cells(b)
+        # Once both ends share a cell they share every coarser one too.
+        for level in range(self.max_level, -1, -1):
+            ca, cb = cells_a[level], cells_b[level]
+            if ca == cb:
+                break
+            key = (min(ca, cb), max(ca, cb))
+            bundles = self._bundles[level]
+            bundles[key] = bundles.get(key, 0) + sign
+            if bundles[key] <= 0:
+                del bundles[key]
+
+    def _incident_lanes(self, idx: int) -> np.ndarray:
+        return np.flatnonzero((self._lanes == idx).any(axis=1))
+
+    def _move_star(self, idx: int, x: int, y: int, star_type: int, country: int) -> None:
+        incident = self._incident_lanes(idx)
+        for a, b in self._lanes[incident].tolist():
+            self._count_lane(a, b, -1)
+        self._count_star(idx, -1)
+        self._x[idx], self._y[idx], self._type[idx], self._country[idx] = x, y, star_type, country
+        self._count_star(idx, 1)
+        for a, b in self._lanes[incident].tolist():
+            self._count_lane(a, b, 1)
+
+    def apply_change(self, change: dict) -> bool:
+        """Patch the aggregates for one ``galaxygen.storage`` change.
+
+        Returns ``False`` when the change cannot be applied incrementally (a
+        full replacement, or indices that do not line up with this structure),
+        in which case the structure must be rebuilt.
+        """
+        with self._lock:
+            return self._apply(change)
+
+    def _apply(self, change: dict) -> bool:
+        op = change.get("op")
+        if op == "batch":
+            return all(self._apply(sub) for sub in change["changes"])
+        if op in ("countries_replaced", "resource_definitions_replaced"):
+            return True
+        if op == "star_added":
+            star = change["star"]
+            if change["idx"] != len(self._x):
+                return False
+            self._x = np.append(self._x, int(star["x"]))
+            self._y = np.append(self._y, int(star["y"]))
+            self._type = np.append(self._type, star_type_code(star.get("star_type", StarType.G)))
+            self._country = np.append(self._country, level0_owner(star.get("admin_levels")))
+            self._count_star(len(self._x) - 1, 1)
+            return True
+        if op == "star_deleted":
+            idx = change["idx"]
+            if not 0 <= idx < len(self._x):
+                return False
+            incident = self._incident_lanes(idx)
+            for a, b in self._lanes[incident].tolist():
+                self._count_lane(a, b, -1)
+            self._count_star(idx, -1)
+            self._x, self._y, self._type, self._country = (
+                np.delete(values, idx) for values in (self._x, self._y, self._type, self._country)
+            )
+            lanes = np.delete(self._lanes, incident, axis=0)
+            self._lanes = lanes - (lanes > idx)
+            return True
+        if op == "stars_deleted":
+            removed = np.unique(np.asarray(change["indices"], dtype=np.int64))
+            if len(removed) and not 0 <= removed[0] <= removed[-1] < len(self._x):
+                return False
+            gone = np.zeros(len(self._x), dtype=bool)
+            gone[removed] = True
+            incident = gone[self._lanes].any(axis=1)
+            for a, b in self._lanes[incident].tolist():
+                self._count_lane(a, b, -1)
+            for idx in removed.tolist():
+                self._count_star(idx, -1)
+            self._x, self._y, self._type, self._country = (
+                values[~gone] for values in (self._x, self._y, self._type, self._country)
+            )
+            lanes = self._lanes[~incident]
+            self._lanes = lanes - np.searchsorted(removed, lanes)
+            return True
+        if op in ("star_updated", "star_fields_updated"):
+            idx = change["idx"]
+            if not 0 <= idx < len(self._x):
+                return False
+            doc = change["star"] if op == "star_updated" else change["fields"]
+            x = int(doc.get("x", self._x[idx]))
+            y = int(doc.get("y", self._y[idx]))
+            star_type = star_type_code(doc["star_type"]) if "star_type" in doc else int(self._type[idx])
+            country = level0_owner(doc["admin_levels"]) if "admin_levels" in doc else int(self._country[idx])
+            if (x, y, star_type, country) != (self._x[idx], self._y[idx], self._type[idx], self._country[idx]):
+                self._move_star(idx, x, y, star_type, country)
+            return True
+        if op == "hyperlane_added":
+            if change["idx"] != len(self._lanes):
+                return False
+            a, b = int(change["a"]), int(change["b"])
+            self._lanes = np.vstack([self._lanes, [[a, b]]])
+            self._count_lane(a, b, 1)
+            return True
+        if op == "hyperlane_deleted":
+            idx = change["idx"]
+            if not 0 <= idx < len(self._lanes):
+                return False
+            a, b = self._lanes[idx].tolist()
+            if {a, b} != {change["a"], change["b"]}:
+                return False
+            self._count_lane(a, b, -1)
+            self._lanes = np.delete(self._lanes, idx, axis=0)
+            return True
+        return False
+
+    # -- queries ------------------------------------------------------------
+
+    def cell_size(self, level: int) -> float:
+        return self.size / (1 << level)
+
+    def _check_level(self, level: int) -> None:
+        if not 0 <= level <= self.max_level:
+            raise ValueError(f"level must be between 0 and {self.max_level}")
+
+    def clusters(self, level: int) -> List[dict]:
+        """Non-empty cells of ``level`` with count, centroid, dominant star type
+        and dominant owning country (``None`` when no star in the cell is owned)."""
+        self._check_level(level)
+        with self._lock:
+            counts = self._counts[level]
+            cells = np.flatnonzero(counts)
+            centroid_x = self._sum_x[level][cells] / counts[cells]
+            centroid_y = self._sum_y[level][cells] / counts[cells]
+            dominant_types = self._types[level][cells].argmax(axis=1)
+            owners = self._owners[level]
+            result = []
+            for cell, count, cx, cy, type_code in zip(
+                cells.tolist(), counts[cells].tolist(), centroid_x.tolist(), centroid_y.tolist(), dominant_types.tolist()
+            ):
+                histogram = owners.get(cell)
+                country = min(histogram, key=lambda c: (-histogram[c], c)) if histogram else None
+                result.append(
+                    {
+                        "cell": [cell & ((1 << level) - 1), cell >> level],
+                        "count": count,
+                        "centroid": [round(cx, 2), round(cy, 2)],
+                        "star_type": _STAR_TYPES[type_code].value,
+                        "country": country,
+                    }
+                )
+        return result
+
+    def bundles(self, level: int) -> List[dict]:
+        """Hyperlane counts between each pair of distinct cells of ``level``."""
+        self._check_level(level)
+        mask = (1 << level) - 1
+        with self._lock:
+            items = sorted(self._bundles[level].items())
+        return [
+            {"a": [a & mask, a >> level], "b": [b & mask, b >> level], "count": count}
+            for (a, b), count in items
+        ]
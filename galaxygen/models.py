@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from math import log1p
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
+import numpy as np
 from pydantic import BaseModel, Field, validator
 
 from .types import PlanetType, StarType
@@ -163,6 +164,50 @@ class Galaxy(BaseModel):
         for region in self.resources:
             region.systems = [s for s in region.systems if s != idx]
 
+    def remove_stars(self, indices: Iterable[int], compact: bool = False) -> np.ndarray:
+        """Remove many stars with one pass over the hyperlanes and resource regions.
+
+        By default removed stars are left as ``(-1, -1)`` placeholders, as
+        :meth:`remove_star` does, so other indices stay valid. With
+        ``compact=True`` they are dropped and later stars, lane endpoints and
+        region systems are renumbered. Returns the old-to-new index map, -1
+        for removed stars. Lanes and regions referring to stars that do not
+        exist are left alone.
+        """
+        count = len(self.stars)
+        removed = np.zeros(count, dtype=bool)
+        targets = np.fromiter(indices, dtype=np.int64)
+        removed[targets[(targets >= 0) & (targets < count)]] = True
+        mapping = np.where(removed, -1, np.cumsum(~removed) - 1 if compact else np.arange(count))
+        if not removed.any():
+            return mapping
+
+        def renumber(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            """``values`` renumbered through ``mapping``, and which of them survive."""
+            known = (values >= 0) & (values < count)
+            new = values.copy()
+            new[known] = mapping[values[known]]
+            return new, ~known | (new >= 0)
+
+        if compact:
+            self.stars = [star for star, gone in zip(self.stars, removed.tolist()) if not gone]
+        else:
+            for idx in np.flatnonzero(removed).tolist():
+                self.stars[idx] = Star(x=-1, y=-1)
+
+        pairs = np.array([lane.as_pair() for lane in self.hyperlanes], dtype=np.int64).reshape(-1, 2)
+        pairs, keep = renumber(pairs)
+        keep = keep.all(axis=1)
+        if compact:
+            self.hyperlanes = [Hyperlane(a=a, b=b) for a, b in pairs[keep].tolist()]
+        else:
+            self.hyperlanes = [lane for lane, kept in zip(self.hyperlanes, keep.tolist()) if kept]
+
+        for region in self.resources:
+            systems, keep = renumber(np.asarray(region.systems, dtype=np.int64))
+            region.systems = systems[keep].tolist()
+        return mapping
+
 
 def infrastructure_speed_multiplier(level: int) -> float:
     level = max(1, level)
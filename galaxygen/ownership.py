@@ -0,0 +1,169 @@
+"""Star-to-country index built from ``Star.admin_levels``.
+
+:class:`OwnershipIndex` keeps the country id of every star at every admin
+level in one ``(stars, ADMIN_LEVELS)`` array (-1 where unowned) plus, per
+level, a sorted array of the systems each country owns. "Which systems does
+country X own" is then a dict lookup returning O(result) data, and
+"who owns star i" an array read. The index follows storage edits through
+:meth:`OwnershipIndex.apply_change`, so it can live in the API's galaxy
+cache across edits instead of rescanning every star.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .models import Star
+
+ADMIN_LEVELS = 4
+UNOWNED = -1
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+
+def admin_row(admin_levels: Optional[Sequence[Optional[int]]]) -> List[int]:
+    """``admin_levels`` as exactly ``ADMIN_LEVELS`` ints, ``UNOWNED`` for gaps."""
+    values = list(admin_levels or ())[:ADMIN_LEVELS]
+    values += [None] * (ADMIN_LEVELS - len(values))
+    return [UNOWNED if value is None else int(value) for value in values]
+
+
+def level0_owner(admin_levels: Optional[Sequence[Optional[int]]]) -> int:
+    """The level-0 country in ``admin_levels``, ``UNOWNED`` when there is none."""
+    return admin_row(admin_levels)[0]
+
+
+class OwnershipIndex:
+    """Country ids per star and admin level, with sorted system lists per country."""
+
+    def __init__(self, levels: np.ndarray) -> None:
+        self._lock = threading.Lock()
+        self.levels = np.asarray(levels, dtype=np.int64).reshape(-1, ADMIN_LEVELS).copy()
+        self._systems: List[Dict[int, np.ndarray]] = [self._group(level) for level in range(ADMIN_LEVELS)]
+
+    def _group(self, level: int) -> Dict[int, np.ndarray]:
+        column = self.levels[:, level]
+        order = np.argsort(column, kind="stable")
+        ids, starts = np.unique(column[order], return_index=True)
+        bounds = np.append(starts, len(order))
+        return {
+            int(country): order[bounds[i] : bounds[i + 1]]
+            for i, country in enumerate(ids.tolist())
+            if country != UNOWNED
+        }
+
+    @classmethod
+    def from_stars(cls, stars: Iterable[Star]) -> "OwnershipIndex":
+        rows = [admin_row(star.admin_levels) for star in stars]
+        return cls(np.array(rows, dtype=np.int64).reshape(-1, ADMIN_LEVELS))
+
+    @classmethod
+    def from_star_docs(cls, docs: Iterable[dict]) -> "OwnershipIndex":
+        flat = np.fromiter(
+            (value for doc in docs for value in admin_row(doc.get("admin_levels"))), dtype=np.int64
+        )
+        return cls(flat.reshape(-1, ADMIN_LEVELS))
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    # -- queries --------------------------------------------------------
+
+    def owner(self, star: int, level: int = 0) -> int:
+        """Country owning ``star`` at ``level``, or ``UNOWNED``."""
+        return int(self.levels[star, level])
+
+    def systems(self, country: int, level: int = 0) -> np.ndarray:
+        """Sorted indices of the systems ``country`` owns at ``level``."""
+        return self._systems[level].get(int(country), _EMPTY)
+
+    def items(self, level: int = 0) -> Iterator[Tuple[int, np.ndarray]]:
+        """``(country, sorted systems)`` for every country owning anything at ``level``."""
+        return ((country, systems) for country, systems in self._systems[level].items() if len(systems))
+
+    def countries(self, level: int = 0) -> Dict[int, int]:
+        """System count per country id owning anything at ``level``."""
+        return {country: len(systems) for country, systems in self.items(level)}
+
+    # -- updates --------------------------------------------------------
+
+    def set_admin_levels(self, star: int, admin_levels: Optional[Sequence[Optional[int]]]) -> None:
+        row = admin_row(admin_levels)
+        for level, country in enumerate(row):
+            previous = int(self.levels[star, level])
+            if previous == country:
+                continue
+            if previous != UNOWNED:
+                owned = self._systems[level][previous]
+                self._systems[level][previous] = np.delete(owned, np.searchsorted(owned, star))
+            if country != UNOWNED:
+                owned = self._systems[level].get(country, _EMPTY)
+                self._systems[level][country] = np.insert(owned, np.searchsorted(owned, star), star)
+            self.levels[star, level] = country
+
+    def add_star(self, admin_levels: Optional[Sequence[Optional[int]]] = None) -> int:
+        idx = len(self.levels)
+        self.levels = np.vstack([self.levels, np.full((1, ADMIN_LEVELS), UNOWNED, dtype=np.int64)])
+        self.set_admin_levels(idx, admin_levels)
+        return idx
+
+    def remove_star(self, star: int) -> None:
+        """Drop ``star``; later stars shift down one index, as in storage."""
+        self.set_admin_levels(star, None)
+        self.levels = np.delete(self.levels, star, axis=0)
+        for groups in self._systems:
+            for country, owned in groups.items():
+                if len(owned) and owned[-1] > star:
+                    groups[country] = owned - (owned > star)
+
+    def remove_stars(self, stars: Sequence[int]) -> None:
+        """Drop several stars at once; later stars shift down, as in storage."""
+        removed = np.unique(np.asarray(stars, dtype=np.int64))
+        gone = np.zeros(len(self.levels), dtype=bool)
+        gone[removed] = True
+        self.levels = self.levels[~gone]
+        for groups in self._systems:
+            for country, owned in groups.items():
+                owned = owned[~gone[owned]]
+                groups[country] = owned - np.searchsorted(removed, owned)
+
+    def apply_change(self, change: dict) -> bool:
+        """Patch the index for one ``galaxygen.storage`` change; False means rebuild."""
+        with self._lock:
+            return self._apply(change)
+
+    def _apply(self, change: dict) -> bool:
+        op = change.get("op")
+        if op == "batch":
+            return all(self._apply(sub) for sub in change["changes"])
+        if op == "star_added":
+            if change["idx"] != len(self.levels):
+                return False
+            self.add_star(change["star"].get("admin_levels"))
+            return True
+        if op == "star_deleted":
+            if not 0 <= change["idx"] < len(self.levels):
+                return False
+            self.remove_star(change["idx"])
+            return True
+        if op == "stars_deleted":
+            indices = change["indices"]
+            if indices and not 0 <= min(indices) <= max(indices) < len(self.levels):
+                return False
+            self.remove_stars(indices)
+            return True
+        if op in ("star_updated", "star_fields_updated"):
+            if not 0 <= change["idx"] < len(self.levels):
+                return False
+            doc = change["star"] if op == "star_updated" else change["fields"]
+            if "admin_levels" in doc:
+                self.set_admin_levels(change["idx"], doc["admin_levels"])
+            return True
+        return op in (
+            "hyperlane_added",
+            "hyperlane_deleted",
+            "countries_replaced",
+            "resource_definitions_replaced",
+        )
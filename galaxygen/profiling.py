@@ -0,0 +1,231 @@
+"""Lightweight tracing spans for profiling generation and rendering.
+
+Code marks regions with ``with span("name"):``. Spans are free unless a
+:class:`Profiler` is active on the current thread, in which case each one
+records wall time, CPU time and (optionally) peak traced memory. Spans with
+the same name under the same parent are aggregated, so a span inside a loop
+shows up once with a call count rather than once per iteration.
+
+    with Profiler() as profiler:
+        generate_galaxy(...)
+    print(profiler.report())
+"""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+_local = threading.local()
+
+
+class SpanStats:
+    """Aggregated measurements for every entry of one span path."""
+
+    __slots__ = ("name", "calls", "wall", "cpu", "peak_bytes", "children")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        # Largest growth of traced memory over the span's starting point.
+        self.peak_bytes = 0
+        self.children: Dict[str, SpanStats] = {}
+
+    def child(self, name: str) -> "SpanStats":
+        stats = self.children.get(name)
+        if stats is None:
+            stats = self.children[name] = SpanStats(name)
+        return stats
+
+    @property
+    def self_wall(self) -> float:
+        return max(0.0, self.wall - sum(child.wall for child in self.children.values()))
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "wall_seconds": self.wall,
+            "cpu_seconds": self.cpu,
+            "peak_bytes": self.peak_bytes,
+            "children": [child.to_dict() for child in self.children.values()],
+        }
+
+
+class _Frame:
+    __slots__ = ("stats", "wall", "cpu", "memory", "peak")
+
+    def __init__(self, stats: SpanStats, memory: int) -> None:
+        self.stats = stats
+        self.memory = memory
+        # Highest traced memory seen so far inside this frame, including
+        # children (whose entry resets tracemalloc's own peak).
+        self.peak = memory
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+
+
+class Profiler:
+    """Collects spans entered on the current thread while active.
+
+    ``memory`` turns on :mod:`tracemalloc` for per-span peak memory, which
+    slows allocation-heavy code noticeably. ``cprofile`` additionally runs
+    :mod:`cProfile` for function-level detail; see :meth:`dump_cprofile`.
+    """
+
+    def __init__(self, memory: bool = True, cprofile: bool = False) -> None:
+        self.memory = memory
+        self.root = SpanStats("total")
+        self._stack: List[_Frame] = []
+        self._started_tracemalloc = False
+        self._cprofile: Optional[cProfile.Profile] = cProfile.Profile() if cprofile else None
+        self._previous: Optional[Profiler] = None
+
+    def __enter__(self) -> "Profiler":
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._previous = getattr(_local, "profiler", None)
+        _local.profiler = self
+        self._stack = [_Frame(self.root, self._traced())]
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self._close(self._stack.pop())
+        _local.profiler = self._previous
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _traced(self) -> int:
+        return tracemalloc.get_traced_memory()[0] if self.memory else 0
+
+    def _open(self, name: str) -> None:
+        parent = self._stack[-1]
+        memory = 0
+        if self.memory:
+            memory, peak = tracemalloc.get_traced_memory()
+            parent.peak = max(parent.peak, peak)
+            tracemalloc.reset_peak()
+        self._stack.append(_Frame(parent.stats.child(name), memory))
+
+    def _close(self, frame: _Frame) -> None:
+        stats = frame.stats
+        stats.calls += 1
+        stats.wall += time.perf_counter() - frame.wall
+        stats.cpu += time.thread_time() - frame.cpu
+        if self.memory:
+            peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+            stats.peak_bytes = max(stats.peak_bytes, peak - frame.memory)
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak = max(parent.peak, peak)
+
+    # -- reports --------------------------------------------------------
+
+    def _walk(self) -> Iterator[Tuple[Tuple[str, ...], SpanStats]]:
+        pending = [((self.root.name,), self.root)]
+        while pending:
+            path, stats = pending.pop()
+            yield path, stats
+            pending.extend(
+                (path + (child.name,), child) for child in reversed(list(stats.children.values()))
+            )
+
+    def report(self) -> str:
+        """Indented table of spans: calls, wall, CPU and peak memory."""
+        header = f"{'span':<40} {'calls':>7} {'wall s':>9} {'cpu s':>9} {'peak MiB':>9}"
+        lines = [header, "-" * len(header)]
+        for path, stats in self._walk():
+            label = "  " * (len(path) - 1) + stats.name
+            peak = f"{stats.peak_bytes / 2**20:9.1f}" if self.memory else f"{'-':>9}"
+            lines.append(f"{label:<40} {stats.calls:>7} {stats.wall:>9.3f} {stats.cpu:>9.3f} {peak}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return self.root.to_dict()
+
+    def folded(self) -> str:
+        """Collapsed stacks (``a;b;c <microseconds>``) of span self time.
+
+        This is the input format of ``flamegraph.pl`` and speedscope.
+        """
+        lines = []
+        for path, stats in self._walk():
+            micros = int(stats.self_wall * 1_000_000)
+            if micros:
+                lines.append(f"{';'.join(path)} {micros}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """Save the span report; the format follows the suffix.
+
+        ``.json`` writes the span tree, ``.folded`` collapsed stacks and
+        anything else the text table.
+        """
+        path = Path(path)
+        if path.suffix == ".json":
+            content = json.dumps(self.to_dict(), indent=2)
+        elif path.suffix == ".folded":
+            content = self.folded()
+        else:
+            content = self.report() + "\n"
+        path.write_text(content, encoding="utf-8")
+
+    def dump_cprofile(self, path: Path) -> None:
+        """Write cProfile stats (readable by ``pstats``, snakeviz, flameprof)."""
+        if self._cprofile is None:
+            raise RuntimeError("profiler was created without cprofile=True")
+        self._cprofile.dump_stats(str(path))
+
+
+class span:
+    """Context manager marking a traced region; a no-op without a profiler."""
+
+    __slots__ = ("name", "_profiler")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._profiler: Optional[Profiler] = None
+
+    def __enter__(self) -> None:
+        profiler = getattr(_local, "profiler", None)
+        if profiler is not None:
+            self._profiler = profiler
+            profiler._open(self.name)
+
+    def __exit__(self, *exc_info) -> None:
+        profiler = self._profiler
+        if profiler is not None:
+            self._profiler = None
+            profiler._close(profiler._stack.pop())
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator running the function inside ``span(name or func.__name__)``."""
+
+    def decorate(func: F) -> F:
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from typing import Callable, Optional
+
+# ``progress(stage, fraction)`` with ``fraction`` in [0, 1]; called from the
+# working thread or process, so implementations should be cheap.
+ProgressCallback = Callable[[str, float], None]
+
+
+def report(progress: Optional[ProgressCallback], stage: str, fraction: float) -> None:
+    if progress is not None:
+        progress(stage, min(max(fraction, 0.0), 1.0))
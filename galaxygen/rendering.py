@@ -1,15 +1,20 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
 
 import cv2
 import numpy as np
 from PIL import Image
 from scipy.spatial import Voronoi
 
+from .arrays import GalaxyArrays
 from .config import GALAXY_MASK_BLUR, GALAXY_MASK_THRESHOLD, SCALE, STAR_SIZE
+from .metrics import stage
 from .models import CountryDefinition, Galaxy, ResourceDefinition
+from .ownership import OwnershipIndex
+from .profiling import traced
+from .progress import ProgressCallback, report
 
 
 def pixel_conversion(coord: Sequence[int], scale: int = SCALE, center: bool = True) -> List[int]:
@@ -37,40 +42,56 @@ def _create_blank(size: List[int]) -> np.ndarray:
     return img[:, :, ::-1].copy()
 
 
+def _columns(galaxy: Union[Galaxy, GalaxyArrays]) -> Tuple[np.ndarray, np.ndarray, list, OwnershipIndex]:
+    """Star positions, lanes, resource regions and ownership, read without building Star models."""
+    if isinstance(galaxy, GalaxyArrays):
+        return galaxy.positions(), galaxy.lanes, list(galaxy.resource_regions()), galaxy.ownership()
+    positions = np.array([star.as_tuple() for star in galaxy.stars], dtype=np.int64).reshape(-1, 2)
+    lanes = np.array([lane.as_pair() for lane in galaxy.hyperlanes], dtype=np.int64).reshape(-1, 2)
+    regions = [(region.id, region.systems) for region in galaxy.resources]
+    return positions, lanes, regions, OwnershipIndex.from_stars(galaxy.stars)
+
+
+@traced("render_galaxy")
 def render_galaxy(
-    galaxy: Galaxy,
+    galaxy: Union[Galaxy, GalaxyArrays],
     resource_defs: Iterable[ResourceDefinition],
     country_defs: Iterable[CountryDefinition],
     output_dir: Path,
     distribution_path: Optional[Path] = None,
     scale: int = SCALE,
     star_size: int = STAR_SIZE,
+    progress: Optional[ProgressCallback] = None,
 ) -> dict:
     output_dir.mkdir(parents=True, exist_ok=True)
     size = [int(galaxy.width) * scale, int(galaxy.height) * scale]
 
     output_image = _create_blank(size)
     output_mask = _create_blank(size)
+    positions, lanes, resource_regions, ownership = _columns(galaxy)
+    pixels = (positions * scale + int(0.5 * scale)).tolist()
 
     # Draw hyperlanes
-    gray = (104, 104, 104)
-    for idx, lane in enumerate(galaxy.hyperlanes):
-        if lane.a >= len(galaxy.stars) or lane.b >= len(galaxy.stars):
-            continue
+    report(progress, "hyperlanes", 0.0)
+    with stage("render", "hyperlanes"):
+        gray = (104, 104, 104)
+        for idx, (a, b) in enumerate(lanes.tolist()):
+            if a >= len(pixels) or b >= len(pixels):
+                continue
 
-        start = pixel_conversion(galaxy.stars[lane.a].as_tuple(), scale)
-        end = pixel_conversion(galaxy.stars[lane.b].as_tuple(), scale)
+            start, end = pixels[a], pixels[b]
 
-        output_image = cv2.line(output_image, start, end, gray, int(star_size * 0.4), cv2.LINE_AA)
-        output_mask = cv2.line(output_mask, start, end, (idx // 255, idx % 255, 127), int(star_size * 0.4))
+            output_image = cv2.line(output_image, start, end, gray, int(star_size * 0.4), cv2.LINE_AA)
+            output_mask = cv2.line(output_mask, start, end, (idx // 255, idx % 255, 127), int(star_size * 0.4))
 
     # Draw stars
-    for idx, star in enumerate(galaxy.stars):
-        if -1 in star.as_tuple():
-            continue
-        center = pixel_conversion(star.as_tuple(), scale)
-        output_image = cv2.circle(output_image, center, star_size, (255, 255, 255), -1, cv2.LINE_AA)
-        output_mask = cv2.circle(output_mask, center, star_size, (idx // 255, idx % 255, 255), -1)
+    report(progress, "stars", 0.3)
+    with stage("render", "stars"):
+        for idx, (position, center) in enumerate(zip(positions.tolist(), pixels)):
+            if -1 in position:
+                continue
+            output_image = cv2.circle(output_image, center, star_size, (255, 255, 255), -1, cv2.LINE_AA)
+            output_mask = cv2.circle(output_mask, center, star_size, (idx // 255, idx % 255, 255), -1)
 
     output_raw = output_image.copy()
     outputs = {
@@ -79,29 +100,32 @@ def render_galaxy(
         "resources": None,
         "final": output_dir / "output.png",
     }
-    cv2.imwrite(str(output_dir / "output_mask.png"), output_mask)
-    cv2.imwrite(str(output_dir / "output_raw.png"), output_raw)
-
-    if galaxy.resources:
-        regions_cache = get_star_cells([pixel_conversion((star.x, star.y), scale) for star in galaxy.stars])
-        density_mask = None
-        if distribution_path and distribution_path.exists():
-            density = cv2.resize(
-                cv2.cvtColor(cv2.imread(str(distribution_path)), cv2.COLOR_BGR2GRAY),
-                tuple(np.array(size)),
-            )
-            _, density_mask = cv2.threshold(density, GALAXY_MASK_THRESHOLD, 255, cv2.THRESH_BINARY)
-            density_mask = cv2.cvtColor(density_mask, cv2.COLOR_GRAY2BGR)
-            density_mask = cv2.medianBlur(density_mask, GALAXY_MASK_BLUR)
-
-        def apply_overlay(instances, definitions, filename):
+    with stage("render", "write_base"):
+        cv2.imwrite(str(output_dir / "output_mask.png"), output_mask)
+        cv2.imwrite(str(output_dir / "output_raw.png"), output_raw)
+
+    if resource_regions or ownership.countries():
+        report(progress, "overlays", 0.6)
+        with stage("render", "voronoi_cells"):
+            regions_cache = get_star_cells(pixels)
+            density_mask = None
+            if distribution_path and distribution_path.exists():
+                density = cv2.resize(
+                    cv2.cvtColor(cv2.imread(str(distribution_path)), cv2.COLOR_BGR2GRAY),
+                    tuple(np.array(size)),
+                )
+                _, density_mask = cv2.threshold(density, GALAXY_MASK_THRESHOLD, 255, cv2.THRESH_BINARY)
+                density_mask = cv2.cvtColor(density_mask, cv2.COLOR_GRAY2BGR)
+                density_mask = cv2.medianBlur(density_mask, GALAXY_MASK_BLUR)
+
+        def apply_overlay(regions, definitions, filename):
             mask = output_raw.copy()
-            for entry in instances:
-                if entry.id >= len(definitions):
+            for region_id, systems in regions:
+                if not 0 <= region_id < len(definitions):
                     continue
-                definition = definitions[int(entry.id)]
+                definition = definitions[int(region_id)]
                 color = definition.color
-                for star_idx in entry.systems:
+                for star_idx in systems:
                     region = regions_cache[star_idx]
                     mask = cv2.fillPoly(mask, np.int32([region]), (color[2], color[1], color[0]))
                     mask = cv2.polylines(
@@ -117,10 +141,13 @@ def render_galaxy(
             blended = cv2.addWeighted(output_raw, 0.5, mask, 0.5, 0)
             cv2.imwrite(str(output_dir / filename), blended)
 
-        apply_overlay(galaxy.resources, list(resource_defs), "output_resources.png")
-        outputs["resources"] = output_dir / "output_resources.png"
-        apply_overlay(galaxy.ownership, list(country_defs), "output.png")
+        with stage("render", "overlays"):
+            if resource_regions:
+                apply_overlay(resource_regions, list(resource_defs), "output_resources.png")
+                outputs["resources"] = output_dir / "output_resources.png"
+            apply_overlay(ownership.items(level=0), list(country_defs), "output.png")
     else:
         cv2.imwrite(str(output_dir / "output.png"), output_image)
 
+    report(progress, "done", 1.0)
     return outputs
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import random
-from typing import Iterable, List
+from typing import Iterable, List, Union
 
 import numpy as np
 
+from .arrays import GalaxyArrays
 from .models import Galaxy, ResourceDefinition, ResourceRegion
 
 
@@ -46,9 +47,12 @@ def _cluster_size(rarity: float) -> int:
 
 
 def assign_resources(
-    resources: Iterable[ResourceDefinition], galaxy: Galaxy, rng: random.Random
+    resources: Iterable[ResourceDefinition], galaxy: Union[Galaxy, GalaxyArrays], rng: random.Random
 ) -> List[ResourceRegion]:
-    stars = np.array([s.as_tuple() for s in galaxy.stars])
+    if isinstance(galaxy, GalaxyArrays):
+        stars = galaxy.positions()
+    else:
+        stars = np.array([s.as_tuple() for s in galaxy.stars])
     indices = list(range(len(stars)))
     galaxy_radius = _radius((galaxy.width, galaxy.height))
 
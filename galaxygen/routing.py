@@ -0,0 +1,183 @@
+"""Shortest routes over the hyperlane graph with ALT (A*, landmarks, triangle inequality).
+
+Travelling a lane costs its Euclidean length divided by
+:func:`~galaxygen.models.infrastructure_speed_multiplier` of the lane's
+infrastructure level. Preprocessing runs one Dijkstra per landmark and keeps
+the distance table; a query is an A* search whose heuristic is the best
+landmark lower bound ``|d(L, v) - d(L, target)|``, which stays admissible
+for any non-negative lane costs. Only the few landmarks giving the tightest
+bound for the query's endpoints are consulted per node. Because lanes are
+straight, the straight-line distance over the fastest multiplier is a bound
+too; on long routes across open space it is usually the tighter one.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, dijkstra
+
+from .models import infrastructure_speed_multiplier
+
+DEFAULT_LANDMARKS = 16
+# Landmarks consulted per query (the ones with the best bound on the endpoints).
+ACTIVE_LANDMARKS = 4
+
+
+class Route(NamedTuple):
+    stars: List[int]
+    cost: float
+
+    @property
+    def hops(self) -> int:
+        return max(0, len(self.stars) - 1)
+
+
+def lane_costs(positions: np.ndarray, lanes: np.ndarray, levels: Optional[Sequence[int]] = None) -> np.ndarray:
+    """Travel cost of each lane: length over the infrastructure speed multiplier."""
+    lengths = np.hypot(*(positions[lanes[:, 0]] - positions[lanes[:, 1]]).T.astype(np.float64))
+    if levels is None:
+        return lengths
+    multipliers = np.array([infrastructure_speed_multiplier(int(level)) for level in levels])
+    return lengths / multipliers
+
+
+class RoutePlanner:
+    """Point-to-point routing on a fixed galaxy snapshot.
+
+    ``levels`` gives an infrastructure level per lane (default 1, i.e. plain
+    distance). Build once per galaxy version; queries are read-only and safe
+    to run from several threads.
+    """
+
+    def __init__(
+        self,
+        positions: np.ndarray,
+        lanes: np.ndarray,
+        levels: Optional[Sequence[int]] = None,
+        landmarks: int = DEFAULT_LANDMARKS,
+        seed: int = 0,
+    ) -> None:
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        lanes = np.asarray(lanes, dtype=np.int64).reshape(-1, 2)
+        n = len(positions)
+        valid = (lanes[:, 0] != lanes[:, 1]) & (lanes >= 0).all(axis=1) & (lanes < n).all(axis=1)
+        lanes = lanes[valid]
+        costs = lane_costs(positions, lanes, None if levels is None else np.asarray(levels)[valid])
+        lengths = np.hypot(*(positions[lanes[:, 0]] - positions[lanes[:, 1]]).T)
+        # Cost per unit of straight-line distance can be no lower than this.
+        self._min_cost_ratio = float(np.min(costs / np.maximum(lengths, 1e-9), initial=1.0))
+        self._positions = positions.tolist()
+
+        rows = np.concatenate([lanes[:, 0], lanes[:, 1]])
+        cols = np.concatenate([lanes[:, 1], lanes[:, 0]])
+        weights = np.concatenate([costs, costs])
+        # Keep the cheapest of duplicate lanes; a tiny floor keeps zero-length
+        # lanes from being dropped as "no edge" by the sparse matrix.
+        order = np.lexsort((weights, cols, rows))
+        rows, cols, weights = rows[order], cols[order], weights[order]
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+        self.graph = csr_matrix(
+            (np.maximum(weights[first], 1e-9), (rows[first], cols[first])), shape=(n, n)
+        )
+        self._indptr = self.graph.indptr.tolist()
+        self._indices = self.graph.indices.tolist()
+        self._weights = self.graph.data.tolist()
+        self.node_count = n
+        _, self.components = connected_components(self.graph, directed=False)
+        self.landmarks = self._select_landmarks(min(landmarks, n), seed)
+        table = dijkstra(self.graph, directed=False, indices=self.landmarks) if len(self.landmarks) else np.zeros((0, n))
+        # Landmarks in another component give no bound; zero keeps the
+        # heuristic admissible (|0 - 0| = 0).
+        table[~np.isfinite(table)] = 0.0
+        self._table = table.T.copy()  # (stars, landmarks)
+        self._table_rows = self._table.tolist()
+
+    def _select_landmarks(self, count: int, seed: int) -> np.ndarray:
+        """Farthest-point landmarks: each new one is the star farthest from those chosen."""
+        if count == 0:
+            return np.zeros(0, dtype=np.int64)
+        rng = np.random.default_rng(seed)
+        chosen = [int(rng.integers(self.node_count))]
+        nearest = dijkstra(self.graph, directed=False, indices=chosen[0])
+        while len(chosen) < count:
+            # Unreachable stars seed landmarks in components not yet covered.
+            spread = np.where(np.isfinite(nearest), nearest, np.inf)
+            spread[chosen] = -1.0
+            candidate = int(np.argmax(spread))
+            if spread[candidate] <= 0:
+                break
+            chosen.append(candidate)
+            nearest = np.minimum(nearest, dijkstra(self.graph, directed=False, indices=candidate))
+        return np.array(chosen, dtype=np.int64)
+
+    def connected(self, source: int, target: int) -> bool:
+        return bool(self.components[source] == self.components[target])
+
+    def lower_bound(self, source: int, target: int) -> float:
+        if len(self.landmarks) == 0:
+            return 0.0
+        return float(np.max(np.abs(self._table[source] - self._table[target])))
+
+    def route(self, source: int, target: int) -> Optional[Route]:
+        """Cheapest route from ``source`` to ``target``, or None if they are not connected."""
+        for star in (source, target):
+            if not 0 <= star < self.node_count:
+                raise IndexError(f"star {star} is not in the graph")
+        if source == target:
+            return Route([source], 0.0)
+        if not self.connected(source, target):
+            return None
+
+        table = self._table
+        target_row = table[target]
+        if len(self.landmarks):
+            bounds = np.abs(table[source] - target_row)
+            active = np.argsort(-bounds)[:ACTIVE_LANDMARKS].tolist()
+        else:
+            active = []
+        rows = self._table_rows
+        goal = [(i, float(target_row[i])) for i in active]
+        positions, ratio = self._positions, self._min_cost_ratio
+        tx, ty = positions[target]
+
+        def heuristic(star: int) -> float:
+            x, y = positions[star]
+            best = ratio * ((x - tx) ** 2 + (y - ty) ** 2) ** 0.5
+            row = rows[star]
+            for i, b in goal:
+                a = row[i]
+                bound = a - b if a > b else b - a
+                if bound > best:
+                    best = bound
+            return best
+
+        indptr, indices, weights = self._indptr, self._indices, self._weights
+        best_cost: Dict[int, float] = {source: 0.0}
+        parent: Dict[int, int] = {}
+        closed = set()
+        heap = [(heuristic(source), 0.0, source)]
+        while heap:
+            _, cost, star = heapq.heappop(heap)
+            if star in closed:
+                continue
+            if star == target:
+                path = [target]
+                while path[-1] != source:
+                    path.append(parent[path[-1]])
+                return Route(path[::-1], cost)
+            closed.add(star)
+            for position in range(indptr[star], indptr[star + 1]):
+                neighbor = indices[position]
+                if neighbor in closed:
+                    continue
+                candidate = cost + weights[position]
+                if candidate < best_cost.get(neighbor, float("inf")):
+                    best_cost[neighbor] = candidate
+                    parent[neighbor] = star
+                    heapq.heappush(heap, (candidate + heuristic(neighbor), candidate, neighbor))
+        return None
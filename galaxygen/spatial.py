@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from typing import Sequence, Tuple
+
+import numpy as np
+
+BBox = Tuple[float, float, float, float]
+
+
+def normalize_bbox(bbox: Sequence[float]) -> BBox:
+    if len(bbox) != 4:
+        raise ValueError("bbox must have four values: x0,y0,x1,y1")
+    x0, y0, x1, y1 = (float(v) for v in bbox)
+    return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+
+class GridIndex:
+    """Uniform-grid spatial index over a set of points.
+
+    Points are bucketed into square cells and stored sorted by cell id, so the
+    cells of one grid row covered by a query form a single contiguous slice.
+    A bbox query therefore touches one slice per covered row and then filters
+    exactly, costing O(rows + points in the covered cells).
+    """
+
+    def __init__(self, points: np.ndarray, target_per_cell: int = 8) -> None:
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.points = points
+        count = len(points)
+        if count:
+            self.origin = points.min(axis=0)
+            extent = np.maximum(points.max(axis=0) - self.origin, 1.0)
+        else:
+            self.origin = np.zeros(2)
+            extent = np.ones(2)
+        area = float(extent[0] * extent[1])
+        self.cell_size = max(1.0, float(np.sqrt(area * target_per_cell / max(count, 1))))
+        self.cols = int(extent[0] // self.cell_size) + 1
+        self.rows = int(extent[1] // self.cell_size) + 1
+
+        cells = self._cells(points)
+        cell_ids = cells[:, 1] * self.cols + cells[:, 0]
+        self.order = np.argsort(cell_ids, kind="stable")
+        self.offsets = np.zeros(self.rows * self.cols + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cell_ids, minlength=self.rows * self.cols), out=self.offsets[1:])
+
+    def _cells(self, points: np.ndarray) -> np.ndarray:
+        return ((points - self.origin) // self.cell_size).astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def query(self, bbox: Sequence[float]) -> np.ndarray:
+        """Return indices of points inside ``bbox`` (inclusive), in ascending order."""
+        x0, y0, x1, y1 = normalize_bbox(bbox)
+        if not len(self.points):
+            return np.zeros(0, dtype=np.int64)
+        (cx0, cy0), (cx1, cy1) = self._cells(np.array([[x0, y0], [x1, y1]]))
+        cx0, cx1 = max(cx0, 0), min(cx1, self.cols - 1)
+        cy0, cy1 = max(cy0, 0), min(cy1, self.rows - 1)
+        if cx0 > cx1 or cy0 > cy1:
+            return np.zeros(0, dtype=np.int64)
+
+        slices = [
+            self.order[self.offsets[row * self.cols + cx0] : self.offsets[row * self.cols + cx1 + 1]]
+            for row in range(cy0, cy1 + 1)
+        ]
+        candidates = np.concatenate(slices)
+        pts = self.points[candidates]
+        inside = (pts[:, 0] >= x0) & (pts[:, 0] <= x1) & (pts[:, 1] >= y0) & (pts[:, 1] <= y1)
+        return np.sort(candidates[inside])
+
+
+class ViewportIndex:
+    """Star and hyperlane lookup by viewport rectangle.
+
+    Lanes are indexed by midpoint: a lane can only cross a viewport if its
+    midpoint lies within half the longest lane of it, so the midpoint grid is
+    queried with a padded box and candidates are then tested exactly against
+    the rectangle.
+    """
+
+    def __init__(self, positions: np.ndarray, lanes: np.ndarray) -> None:
+        self.positions = np.asarray(positions, dtype=np.int64).reshape(-1, 2)
+        self.lanes = np.asarray(lanes, dtype=np.int64).reshape(-1, 2)
+        self.stars = GridIndex(self.positions)
+        ends_a = self.positions[self.lanes[:, 0]].astype(np.float64)
+        ends_b = self.positions[self.lanes[:, 1]].astype(np.float64)
+        self.lane_start = ends_a
+        self.lane_delta = ends_b - ends_a
+        self.lane_min = np.minimum(ends_a, ends_b)
+        self.lane_max = np.maximum(ends_a, ends_b)
+        half_lengths = np.linalg.norm(ends_b - ends_a, axis=1) / 2
+        self.lane_reach = float(half_lengths.max()) if len(half_lengths) else 0.0
+        self.lane_midpoints = GridIndex((ends_a + ends_b) / 2)
+
+    def query_stars(self, bbox: Sequence[float]) -> np.ndarray:
+        return self.stars.query(bbox)
+
+    def query_lanes(self, bbox: Sequence[float]) -> np.ndarray:
+        x0, y0, x1, y1 = normalize_bbox(bbox)
+        pad = self.lane_reach
+        candidates = self.lane_midpoints.query((x0 - pad, y0 - pad, x1 + pad, y1 + pad))
+        lo = self.lane_min[candidates]
+        hi = self.lane_max[candidates]
+        overlaps = (lo[:, 0] <= x1) & (hi[:, 0] >= x0) & (lo[:, 1] <= y1) & (hi[:, 1] >= y0)
+        candidates = candidates[overlaps]
+
+        # Separating axis along the lane's normal: the segment misses the box
+        # when all four corners lie strictly on one side of its line.
+        start = self.lane_start[candidates]
+        delta = self.lane_delta[candidates]
+        corners = np.array([[x0, y0], [x0, y1], [x1, y0], [x1, y1]])
+        sides = (
+            delta[:, None, 0] * (corners[None, :, 1] - start[:, None, 1])
+            - delta[:, None, 1] * (corners[None, :, 0] - start[:, None, 0])
+        )
+        separated = np.all(sides > 0, axis=1) | np.all(sides < 0, axis=1)
+        return candidates[~separated]
@@ -0,0 +1,245 @@
+"""Per-country and per-resource-region statistics for dashboards.
+
+:class:`GalaxyStats` keeps one compact column per star (position, star type,
+body count, level-0 country) plus resource membership as parallel
+``(star, region)`` arrays. A summary is a handful of ``np.bincount`` calls
+over those columns and is memoized until the next change; the columns
+follow the storage change feed through :meth:`GalaxyStats.apply_change`, so
+polling never rescans storage.
+
+Territory areas are estimated by sampling the galaxy on a grid and giving
+each sample to its nearest star, i.e. the star's Voronoi cell. Samples
+further than ``AREA_REACH`` median star spacings from any star are empty
+space and count for nobody. Areas depend only on positions and are
+recomputed only when a star is added, removed or moved.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .models import Galaxy
+from .ownership import UNOWNED, level0_owner
+from .types import StarType, star_type_code
+
+# Upper bound on grid samples used to estimate areas.
+AREA_SAMPLES = 1 << 18
+# Samples further than this many median nearest-neighbour spacings from every
+# star are not part of any territory.
+AREA_REACH = 2.0
+
+_STAR_TYPES = [star_type.value for star_type in StarType]
+_STATS_FIELDS = ("x", "y", "star_type", "admin_levels", "bodies")
+
+
+def _histogram(counts: np.ndarray) -> Dict[str, int]:
+    return dict(zip(_STAR_TYPES, counts.tolist()))
+
+
+class GalaxyStats:
+    """System, body, star-type and area totals per country and resource region."""
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        positions: np.ndarray,
+        star_types: np.ndarray,
+        body_counts: np.ndarray,
+        countries: np.ndarray,
+        resources: Iterable[dict] = (),
+    ) -> None:
+        self.width = int(width)
+        self.height = int(height)
+        self._lock = threading.Lock()
+        positions = np.asarray(positions, dtype=np.int64).reshape(-1, 2)
+        self._x = positions[:, 0].copy()
+        self._y = positions[:, 1].copy()
+        self._type = np.asarray(star_types, dtype=np.int64).copy()
+        self._bodies = np.asarray(body_counts, dtype=np.int64).copy()
+        self._country = np.asarray(countries, dtype=np.int64).copy()
+        pairs = [(int(star), int(region["id"])) for region in resources for star in region.get("systems", ())]
+        members = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        self._member_star = members[:, 0].copy()
+        self._member_region = members[:, 1].copy()
+        self._areas: Optional[np.ndarray] = None
+        self._summary: Optional[dict] = None
+
+    @classmethod
+    def from_star_docs(
+        cls, width: int, height: int, stars: Iterable[dict], resources: Iterable[dict] = ()
+    ) -> "GalaxyStats":
+        """Build from raw star documents (``x``, ``y``, ``star_type``,
+        ``admin_levels`` and ``bodies`` are read) and resource region documents."""
+        rows = [
+            (
+                doc["x"],
+                doc["y"],
+                star_type_code(doc.get("star_type", StarType.G)),
+                len(doc.get("bodies") or ()),
+                level0_owner(doc.get("admin_levels")),
+            )
+            for doc in stars
+        ]
+        table = np.array(rows, dtype=np.int64).reshape(-1, 5)
+        return cls(width, height, table[:, :2], table[:, 2], table[:, 3], table[:, 4], resources)
+
+    @classmethod
+    def from_galaxy(cls, galaxy: Galaxy) -> "GalaxyStats":
+        return cls.from_star_docs(
+            galaxy.width,
+            galaxy.height,
+            (star.model_dump(include=set(_STATS_FIELDS)) for star in galaxy.stars),
+            (region.model_dump() for region in galaxy.resources),
+        )
+
+    def __len__(self) -> int:
+        return len(self._x)
+
+    # -- areas --------------------------------------------------------------
+
+    def areas(self) -> np.ndarray:
+        """Estimated territory area of every star, in squared galaxy units."""
+        if self._areas is None:
+            self._areas = self._estimate_areas()
+        return self._areas
+
+    def _estimate_areas(self) -> np.ndarray:
+        n = len(self._x)
+        if n == 0:
+            return np.zeros(0)
+        points = np.column_stack([self._x, self._y]).astype(np.float64)
+        tree = cKDTree(points)
+        if n > 1:
+            spacing = float(np.median(tree.query(points, k=2)[0][:, 1]))
+        else:
+            spacing = float(max(self.width, self.height, 1))
+        width = max(self.width, int(self._x.max()) + 1, 1)
+        height = max(self.height, int(self._y.max()) + 1, 1)
+        step = max(1.0, float(np.sqrt(width * height / AREA_SAMPLES)))
+        gx, gy = np.meshgrid(np.arange(step / 2, width, step), np.arange(step / 2, height, step))
+        # Misses come back as index ``n`` and are dropped with the last bin.
+        _, nearest = tree.query(
+            np.column_stack([gx.ravel(), gy.ravel()]), distance_upper_bound=AREA_REACH * max(spacing, 1.0)
+        )
+        return np.bincount(nearest, minlength=n + 1)[:n] * step * step
+
+    # -- queries ------------------------------------------------------------
+
+    def summary(self) -> dict:
+        """Totals for the galaxy, every owning country and every resource region."""
+        with self._lock:
+            if self._summary is None:
+                self._summary = self._summarize()
+            return self._summary
+
+    def _groups(self, stars: np.ndarray, groups: np.ndarray, areas: np.ndarray) -> List[dict]:
+        ids, inverse = np.unique(groups, return_inverse=True)
+        types = len(_STAR_TYPES)
+        systems = np.bincount(inverse, minlength=len(ids))
+        bodies = np.bincount(inverse, weights=self._bodies[stars], minlength=len(ids))
+        area = np.bincount(inverse, weights=areas[stars], minlength=len(ids))
+        histogram = np.bincount(inverse * types + self._type[stars], minlength=len(ids) * types)
+        histogram = histogram.reshape(-1, types)
+        return [
+            {
+                "id": int(group),
+                "systems": int(systems[i]),
+                "bodies": int(bodies[i]),
+                "area": float(area[i]),
+                "star_types": _histogram(histogram[i]),
+            }
+            for i, group in enumerate(ids.tolist())
+        ]
+
+    def _summarize(self) -> dict:
+        areas = self.areas()
+        owned = np.flatnonzero(self._country != UNOWNED)
+        return {
+            "stars": len(self._x),
+            "owned": len(owned),
+            "with_resources": len(np.unique(self._member_star)),
+            "bodies": int(self._bodies.sum()),
+            "area": float(areas.sum()),
+            "star_types": _histogram(np.bincount(self._type, minlength=len(_STAR_TYPES))),
+            "countries": self._groups(owned, self._country[owned], areas),
+            "resources": self._groups(self._member_star, self._member_region, areas),
+        }
+
+    # -- incremental updates ------------------------------------------------
+
+    def apply_change(self, change: dict) -> bool:
+        """Patch the columns for one ``galaxygen.storage`` change; False means rebuild."""
+        with self._lock:
+            self._summary = None
+            return self._apply(change)
+
+    def _apply(self, change: dict) -> bool:
+        op = change.get("op")
+        if op == "batch":
+            return all(self._apply(sub) for sub in change["changes"])
+        if op in ("hyperlane_added", "hyperlane_deleted", "countries_replaced", "resource_definitions_replaced"):
+            return True
+        if op == "star_added":
+            star = change["star"]
+            if change["idx"] != len(self._x):
+                return False
+            self.width = max(self.width, int(change.get("width", 0)))
+            self.height = max(self.height, int(change.get("height", 0)))
+            self._x = np.append(self._x, int(star["x"]))
+            self._y = np.append(self._y, int(star["y"]))
+            self._type = np.append(self._type, star_type_code(star.get("star_type", StarType.G)))
+            self._bodies = np.append(self._bodies, len(star.get("bodies") or ()))
+            self._country = np.append(self._country, level0_owner(star.get("admin_levels")))
+            self._areas = None
+            return True
+        if op == "star_deleted":
+            idx = change["idx"]
+            if not 0 <= idx < len(self._x):
+                return False
+            self._x, self._y, self._type, self._bodies, self._country = (
+                np.delete(values, idx) for values in (self._x, self._y, self._type, self._bodies, self._country)
+            )
+            # Storage drops the star from resource regions and shifts later indices.
+            keep = self._member_star != idx
+            self._member_star = self._member_star[keep]
+            self._member_star -= self._member_star > idx
+            self._member_region = self._member_region[keep]
+            self._areas = None
+            return True
+        if op == "stars_deleted":
+            removed = np.asarray(change["indices"], dtype=np.int64)
+            if len(removed) and not 0 <= removed.min() <= removed.max() < len(self._x):
+                return False
+            gone = np.zeros(len(self._x), dtype=bool)
+            gone[removed] = True
+            self._x, self._y, self._type, self._bodies, self._country = (
+                values[~gone] for values in (self._x, self._y, self._type, self._bodies, self._country)
+            )
+            keep = ~gone[self._member_star]
+            self._member_star = self._member_star[keep]
+            self._member_star -= np.searchsorted(np.unique(removed), self._member_star)
+            self._member_region = self._member_region[keep]
+            self._areas = None
+            return True
+        if op in ("star_updated", "star_fields_updated"):
+            idx = change["idx"]
+            if not 0 <= idx < len(self._x):
+                return False
+            doc = change["star"] if op == "star_updated" else change["fields"]
+            if "star_type" in doc:
+                self._type[idx] = star_type_code(doc["star_type"])
+            if "bodies" in doc:
+                self._bodies[idx] = len(doc["bodies"] or ())
+            if "admin_levels" in doc:
+                self._country[idx] = level0_owner(doc["admin_levels"])
+            x, y = int(doc.get("x", self._x[idx])), int(doc.get("y", self._y[idx]))
+            if (x, y) != (self._x[idx], self._y[idx]):
+                self._x[idx], self._y[idx] = x, y
+                self._areas = None
+            return True
+        return False
@@ -1,10 +1,14 @@
 ﻿from __future__ import annotations
 
-from typing import Iterable, List
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Sequence
 
-from pymongo import ReturnDocument
+import numpy as np
 
-from .db import get_database
+from .backends import get_backend
+from .metrics import STORAGE_SECONDS, timed
 from .models import (
     CelestialBody,
     CountryDefinition,
@@ -14,57 +18,143 @@ from .models import (
     ResourceRegion,
     Star,
 )
+from .ownership import OwnershipIndex, level0_owner
+from .types import StarType, star_type_code
 
-_META_ID = "galaxy"
-
-
-def _strip_doc(doc: dict, *, remove_idx: bool = True) -> dict:
-    data = dict(doc)
-    data.pop("_id", None)
-    if remove_idx:
-        data.pop("idx", None)
-    return data
-
-
-def _ensure_meta(db) -> dict:
-    meta = db["galaxy_meta"].find_one({"_id": _META_ID})
-    if not meta:
-        star_count = db["stars"].count_documents({})
-        hyperlane_count = db["hyperlanes"].count_documents({})
-        resource_count = db["resources"].count_documents({})
-        country_count = db["countries"].count_documents({})
-        meta = {
-            "_id": _META_ID,
-            "width": 0,
-            "height": 0,
-            "star_count": star_count,
-            "hyperlane_count": hyperlane_count,
-            "resource_count": resource_count,
-            "country_count": country_count,
-        }
-        db["galaxy_meta"].insert_one(meta)
-    return meta
 
+logger = logging.getLogger(__name__)
 
+
+def _timed(func):
+    return timed(STORAGE_SECONDS, operation=func.__name__)(func)
+
+
+ChangeListener = Callable[[dict], None]
+
+_listeners: List[ChangeListener] = []
+_write_lock = threading.RLock()
+
+
+def add_change_listener(listener: ChangeListener) -> None:
+    """Call ``listener(change)`` after every mutation made by this process.
+
+    ``change`` holds the new ``epoch`` and ``version``, the ``op`` name and the
+    op's payload (indices plus the documents written or removed), so derived
+    structures can be patched instead of rebuilt. Listeners run synchronously
+    on the writing thread while the write lock is held.
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_change_listener(listener: ChangeListener) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+@contextmanager
+def write_lock() -> Iterator[None]:
+    """Hold off mutations from this process, e.g. while building a structure
+    that will later be kept current through change listeners."""
+    with _write_lock:
+        yield
+
+
+class BatchError(ValueError):
+    """Raised by :func:`apply_batch` when operations fail validation; nothing is written."""
+
+    def __init__(self, errors: List[dict]) -> None:
+        super().__init__(f"{len(errors)} invalid batch operation(s)")
+        self.errors = errors
+
+
+@_timed
 def get_galaxy_meta() -> dict:
-    db = get_database()
-    return _ensure_meta(db)
+    return get_backend().get_meta()
+
+
+@_timed
+def get_galaxy_version() -> tuple[str, int]:
+    """Return ``(epoch, version)``; the version is bumped by every mutation below."""
+    return get_backend().get_version()
+
+
+def _record(op: str, **payload) -> None:
+    epoch, version = get_backend().record_change(op, payload)
+    change = {"epoch": epoch, "version": version, "op": op, **payload}
+    for listener in list(_listeners):
+        try:
+            listener(change)
+        except Exception:
+            logger.exception("galaxy change listener failed for %s", op)
+
+
+@_timed
+def get_changes(since: int, limit: int = 1000, epoch: str | None = None) -> dict:
+    """Return the logged changes after version ``since``.
+
+    The result holds the current ``epoch`` and ``version``, up to ``limit``
+    ``changes`` (each ``{"version", "op", **payload}``), whether ``more`` remain
+    and a ``reset`` flag. ``reset`` means the log cannot bring a client at
+    ``since`` up to date (another epoch, history already trimmed, or a whole
+    galaxy replacement in between) and the galaxy must be reloaded instead.
+    """
+    backend = get_backend()
+    current_epoch, current_version = backend.get_version()
+    result = {"epoch": current_epoch, "version": current_version, "changes": [], "more": False, "reset": False}
+    if (epoch is not None and epoch != current_epoch) or since > current_version:
+        result["reset"] = True
+        return result
+    if since == current_version:
+        return result
+    oldest = backend.oldest_change_version(current_epoch)
+    if oldest is None or oldest > since + 1:
+        result["reset"] = True
+        return result
+    changes = backend.get_changes(current_epoch, since, limit)
+    if any(change["op"] == "galaxy_replaced" for change in changes):
+        result["reset"] = True
+        return result
+    result["changes"] = changes
+    result["more"] = bool(changes) and changes[-1]["version"] < current_version
+    return result
+
+
+def iter_collection(collection: str) -> Iterator[dict]:
+    """Yield raw documents of one of ``backends.COLLECTIONS`` in index order."""
+    return get_backend().iter_docs(collection)
+
+
+def iter_stars(fields: Sequence[str] | None = None) -> Iterator[dict]:
+    """Yield raw star documents in index order without building models."""
+    return get_backend().iter_docs("stars", fields=fields)
+
+
+def iter_hyperlanes() -> Iterator[dict]:
+    return get_backend().iter_docs("hyperlanes")
+
+
+def iter_resources() -> Iterator[dict]:
+    return get_backend().iter_docs("resources")
+
+
+def iter_resource_definitions() -> Iterator[dict]:
+    return get_backend().iter_docs("resource_definitions")
+
 
+def iter_country_definitions() -> Iterator[dict]:
+    return get_backend().iter_docs("countries")
 
+
+@_timed
 def load_galaxy(path=None) -> Galaxy:
-    db = get_database()
-    meta = _ensure_meta(db)
+    backend = get_backend()
+    meta = backend.get_meta()
 
-    stars = [Star(**_strip_doc(doc)) for doc in db["stars"].find().sort("idx", 1)]
-    hyperlanes = [
-        Hyperlane(**_strip_doc(doc)) for doc in db["hyperlanes"].find().sort("idx", 1)
-    ]
-    resources = [
-        ResourceRegion(**_strip_doc(doc)) for doc in db["resources"].find().sort("id", 1)
-    ]
-    countries = [
-        CountryDefinition(**_strip_doc(doc)) for doc in db["countries"].find().sort("idx", 1)
-    ]
+    stars = [Star(**doc) for doc in backend.iter_docs("stars")]
+    hyperlanes = [Hyperlane(**doc) for doc in backend.iter_docs("hyperlanes")]
+    resources = [ResourceRegion(**doc) for doc in backend.iter_docs("resources")]
+    countries = [CountryDefinition(**doc) for doc in backend.iter_docs("countries")]
 
     return Galaxy(
         width=int(meta.get("width", 0)),
@@ -76,122 +166,138 @@ def load_galaxy(path=None) -> Galaxy:
     )
 
 
+@_timed
 def save_galaxy(path, galaxy: Galaxy) -> None:
-    db = get_database()
-    db["galaxy_meta"].update_one(
-        {"_id": _META_ID},
-        {
-            "$set": {
-                "width": int(galaxy.width),
-                "height": int(galaxy.height),
-                "star_count": len(galaxy.stars),
-                "hyperlane_count": len(galaxy.hyperlanes),
-                "resource_count": len(galaxy.resources),
-            }
-        },
-        upsert=True,
-    )
-
-    db["stars"].delete_many({})
-    if galaxy.stars:
-        db["stars"].insert_many(
-            [{**star.model_dump(), "idx": idx} for idx, star in enumerate(galaxy.stars)]
-        )
-
-    db["hyperlanes"].delete_many({})
-    if galaxy.hyperlanes:
-        db["hyperlanes"].insert_many(
-            [
-                {"idx": idx, **lane.model_dump()}
-                for idx, lane in enumerate(galaxy.hyperlanes)
-            ]
+    with _write_lock:
+        get_backend().replace_galaxy(
+            int(galaxy.width),
+            int(galaxy.height),
+            stars=[star.model_dump() for star in galaxy.stars],
+            hyperlanes=[lane.model_dump() for lane in galaxy.hyperlanes],
+            resources=[res.model_dump() for res in galaxy.resources],
         )
-
-    db["resources"].delete_many({})
-    if galaxy.resources:
-        db["resources"].insert_many([res.model_dump() for res in galaxy.resources])
-
-    if galaxy.countries:
-        save_country_definitions(None, galaxy.countries)
+        if galaxy.countries:
+            get_backend().replace_countries([country.model_dump() for country in galaxy.countries])
+        _record("galaxy_replaced")
 
 
+@_timed
 def load_resource_definitions(path=None) -> List[ResourceDefinition]:
-    db = get_database()
     return [
-        ResourceDefinition(**_strip_doc(doc))
-        for doc in db["resource_definitions"].find().sort("idx", 1)
+        ResourceDefinition(**doc)
+        for doc in get_backend().iter_docs("resource_definitions")
     ]
 
 
+@_timed
 def save_resource_definitions(path, resources: Iterable[ResourceDefinition]) -> None:
-    db = get_database()
-    db["resource_definitions"].delete_many({})
-    resource_list = list(resources)
-    if resource_list:
-        db["resource_definitions"].insert_many(
-            [
-                {**resource.model_dump(), "idx": idx}
-                for idx, resource in enumerate(resource_list)
-            ]
-        )
+    docs = [resource.model_dump() for resource in resources]
+    with _write_lock:
+        get_backend().replace_resource_definitions(docs)
+        _record("resource_definitions_replaced", resources=docs)
 
 
+@_timed
 def load_country_definitions(path=None) -> List[CountryDefinition]:
-    db = get_database()
-    return [
-        CountryDefinition(**_strip_doc(doc))
-        for doc in db["countries"].find().sort("idx", 1)
-    ]
+    return [CountryDefinition(**doc) for doc in get_backend().iter_docs("countries")]
 
 
+@_timed
 def save_country_definitions(path, countries: Iterable[CountryDefinition]) -> None:
-    db = get_database()
-    country_list = list(countries)
-    for idx, country in enumerate(country_list):
-        db["countries"].replace_one(
-            {"idx": idx},
-            {**country.model_dump(), "idx": idx},
-            upsert=True,
-        )
-    db["countries"].delete_many({"idx": {"$gte": len(country_list)}})
-    db["galaxy_meta"].update_one(
-        {"_id": _META_ID},
-        {"$set": {"country_count": len(country_list)}},
-        upsert=True,
+    docs = [country.model_dump() for country in countries]
+    with _write_lock:
+        get_backend().replace_countries(docs)
+        _record("countries_replaced", countries=docs)
+
+
+@_timed
+def load_star_positions() -> np.ndarray:
+    """Return an ``(n, 2)`` array of star coordinates in index order."""
+    docs = get_backend().iter_docs("stars", fields=("x", "y"))
+    flat = np.fromiter((v for doc in docs for v in (doc["x"], doc["y"])), dtype=np.int64)
+    return flat.reshape(-1, 2)
+
+
+@_timed
+def load_star_table() -> np.ndarray:
+    """Return an ``(n, 4)`` array of ``x, y, star type code, country`` per star.
+
+    The country is the level-0 admin id, or -1 for unowned stars.
+    """
+    docs = get_backend().iter_docs("stars", fields=("x", "y", "star_type", "admin_levels"))
+    flat = np.fromiter(
+        (
+            v
+            for doc in docs
+            for v in (
+                doc["x"],
+                doc["y"],
+                star_type_code(doc.get("star_type", StarType.G)),
+                level0_owner(doc.get("admin_levels")),
+            )
+        ),
+        dtype=np.int64,
     )
+    return flat.reshape(-1, 4)
+
+
+@_timed
+def load_ownership_index() -> OwnershipIndex:
+    """Build the star-to-country index from every star's ``admin_levels``."""
+    return OwnershipIndex.from_star_docs(get_backend().iter_docs("stars", fields=("admin_levels",)))
 
 
+@_timed
+def load_hyperlane_pairs() -> np.ndarray:
+    """Return an ``(m, 2)`` array of hyperlane endpoints in index order."""
+    docs = get_backend().iter_docs("hyperlanes")
+    flat = np.fromiter((v for doc in docs for v in (doc["a"], doc["b"])), dtype=np.int64)
+    return flat.reshape(-1, 2)
+
+
+@_timed
+def get_stars(indices: Sequence[int], fields: Sequence[str] | None = None) -> List[dict]:
+    """Return raw star documents (with ``idx``) for ``indices``, optionally projected."""
+    if len(indices) == 0:
+        return []
+    return get_backend().get_stars(indices, fields)
+
+
+@_timed
 def get_star_count() -> int:
-    db = get_database()
-    meta = _ensure_meta(db)
-    return int(meta.get("star_count", 0))
+    return int(get_backend().get_meta().get("star_count", 0))
 
 
+@_timed
 def update_star(idx: int, star: Star) -> bool:
-    db = get_database()
-    result = db["stars"].update_one(
-        {"idx": idx},
-        {"$set": {**star.model_dump(), "idx": idx}},
-    )
-    return result.matched_count > 0
+    doc = star.model_dump()
+    with _write_lock:
+        updated = get_backend().update_star(idx, doc)
+        if updated:
+            _record("star_updated", idx=idx, star=doc)
+    return updated
 
 
+@_timed
 def update_star_fields(idx: int, fields: dict) -> bool:
     if not fields:
         return False
-    db = get_database()
-    result = db["stars"].update_one({"idx": idx}, {"$set": fields})
-    return result.matched_count > 0
+    with _write_lock:
+        updated = get_backend().update_star_fields(idx, fields)
+        if updated:
+            _record("star_fields_updated", idx=idx, fields=dict(fields))
+    return updated
 
 
+@_timed
 def get_star(idx: int) -> Star | None:
-    db = get_database()
-    doc = db["stars"].find_one({"idx": idx})
+    doc = get_backend().get_star(idx)
     if not doc:
         return None
-    return Star(**_strip_doc(doc))
+    return Star(**doc)
 
 
+@_timed
 def add_body(star_idx: int, body: CelestialBody) -> int | None:
     star = get_star(star_idx)
     if not star:
@@ -201,6 +307,7 @@ def add_body(star_idx: int, body: CelestialBody) -> int | None:
     return len(star.bodies) - 1
 
 
+@_timed
 def update_body(star_idx: int, body_idx: int, body: CelestialBody) -> bool:
     star = get_star(star_idx)
     if not star or body_idx < 0 or body_idx >= len(star.bodies):
@@ -209,6 +316,7 @@ def update_body(star_idx: int, body_idx: int, body: CelestialBody) -> bool:
     return update_star(star_idx, star)
 
 
+@_timed
 def delete_body(star_idx: int, body_idx: int) -> bool:
     star = get_star(star_idx)
     if not star or body_idx < 0 or body_idx >= len(star.bodies):
@@ -217,121 +325,199 @@ def delete_body(star_idx: int, body_idx: int) -> bool:
     return update_star(star_idx, star)
 
 
+@_timed
 def add_star(star: Star, width: int, height: int) -> int:
-    db = get_database()
-    meta = db["galaxy_meta"].find_one_and_update(
-        {"_id": _META_ID},
-        {
-            "$setOnInsert": {
-                "hyperlane_count": 0,
-                "resource_count": 0,
-                "country_count": 0,
-            },
-            "$inc": {"star_count": 1},
-            "$max": {"width": int(width), "height": int(height)},
-        },
-        upsert=True,
-        return_document=ReturnDocument.BEFORE,
-    )
-    idx = int(meta.get("star_count", 0)) if meta else 0
-    db["stars"].insert_one({**star.model_dump(), "idx": idx})
+    doc = star.model_dump()
+    with _write_lock:
+        idx = get_backend().add_star(doc, width, height)
+        _record("star_added", idx=idx, star=doc, width=int(width), height=int(height))
     return idx
 
 
+@_timed
 def delete_star(idx: int) -> bool:
-    db = get_database()
-    deleted = db["stars"].delete_one({"idx": idx})
-    if deleted.deleted_count == 0:
-        return False
+    with _write_lock:
+        deleted = get_backend().delete_star(idx)
+        if deleted is not None:
+            _record("star_deleted", idx=idx, star=deleted)
+    return deleted is not None
 
-    stars_to_shift = list(db["stars"].find({"idx": {"$gt": idx}}).sort("idx", 1))
-    for star in stars_to_shift:
-        db["stars"].update_one({"_id": star["_id"]}, {"$set": {"idx": star["idx"] - 1}})
-
-    lanes = list(db["hyperlanes"].find().sort("idx", 1))
-    updated_lanes = []
-    for lane in lanes:
-        a = int(lane["a"])
-        b = int(lane["b"])
-        if a == idx or b == idx:
-            continue
-        if a > idx:
-            a -= 1
-        if b > idx:
-            b -= 1
-        if a == b:
-            continue
-        updated_lanes.append({"idx": len(updated_lanes), "a": a, "b": b})
-
-    db["hyperlanes"].delete_many({})
-    if updated_lanes:
-        db["hyperlanes"].insert_many(updated_lanes)
-
-    resources = list(db["resources"].find().sort("id", 1))
-    updated_resources = []
-    for region in resources:
-        systems = [
-            (system - 1 if system > idx else system)
-            for system in region.get("systems", [])
-            if system != idx
-        ]
-        updated_resources.append({"id": int(region["id"]), "systems": systems})
-
-    db["resources"].delete_many({})
-    if updated_resources:
-        db["resources"].insert_many(updated_resources)
-
-    db["galaxy_meta"].update_one(
-        {"_id": _META_ID},
-        {
-            "$inc": {"star_count": -1},
-            "$set": {
-                "hyperlane_count": len(updated_lanes),
-                "resource_count": len(updated_resources),
-            },
-        },
-    )
-    return True
 
+@_timed
+def delete_stars(indices: Iterable[int]) -> List[int]:
+    """Delete several stars in one backend operation; returns the indices deleted.
+
+    Indices refer to the galaxy before the deletion. The change log gets a
+    single ``stars_deleted`` record rather than one ``star_deleted`` per star.
+    """
+    with _write_lock:
+        deleted = [int(doc["idx"]) for doc in get_backend().delete_stars(list(indices))]
+        if deleted:
+            _record("stars_deleted", indices=deleted)
+    return deleted
 
+
+@_timed
 def add_hyperlane(a: int, b: int) -> int:
-    db = get_database()
-    existing = db["hyperlanes"].find_one({"$or": [{"a": a, "b": b}, {"a": b, "b": a}]})
-    if existing:
-        return int(existing["idx"])
-
-    meta = db["galaxy_meta"].find_one_and_update(
-        {"_id": _META_ID},
-        {
-            "$setOnInsert": {
-                "width": 0,
-                "height": 0,
-                "star_count": 0,
-                "resource_count": 0,
-                "country_count": 0,
-            },
-            "$inc": {"hyperlane_count": 1},
-        },
-        upsert=True,
-        return_document=ReturnDocument.BEFORE,
-    )
-    idx = int(meta.get("hyperlane_count", 0)) if meta else 0
-    db["hyperlanes"].insert_one({"idx": idx, "a": a, "b": b})
+    with _write_lock:
+        idx, created = get_backend().add_hyperlane(a, b)
+        if created:
+            _record("hyperlane_added", idx=idx, a=a, b=b)
     return idx
 
 
+@_timed
 def delete_hyperlane(idx: int) -> bool:
-    db = get_database()
-    deleted = db["hyperlanes"].delete_one({"idx": idx})
-    if deleted.deleted_count == 0:
-        return False
-
-    lanes_to_shift = list(db["hyperlanes"].find({"idx": {"$gt": idx}}).sort("idx", 1))
-    for lane in lanes_to_shift:
-        db["hyperlanes"].update_one({"_id": lane["_id"]}, {"$set": {"idx": lane["idx"] - 1}})
-
-    db["galaxy_meta"].update_one(
-        {"_id": _META_ID},
-        {"$inc": {"hyperlane_count": -1}},
-    )
-    return True
+    with _write_lock:
+        deleted = get_backend().delete_hyperlane(idx)
+        if deleted is not None:
+            _record("hyperlane_deleted", idx=idx, a=int(deleted["a"]), b=int(deleted["b"]))
+    return deleted is not None
+
+
+_STAR_OPS = ("update_star_meta", "set_admin_level", "add_body", "update_body", "delete_body")
+_LANE_OPS = ("add_hyperlane", "delete_hyperlane")
+
+
+class _BatchPlan:
+    """In-memory view of the stars and lanes a batch touches, edited op by op."""
+
+    def __init__(self, operations: Sequence[dict]) -> None:
+        backend = get_backend()
+        indices = sorted({op["idx"] for op in operations if op["op"] in _STAR_OPS})
+        self.stars = {doc.pop("idx"): doc for doc in backend.get_stars(indices)} if indices else {}
+        self.dirty: dict[int, set] = {}
+        self.star_count = int(backend.get_meta().get("star_count", 0))
+        self.lanes: List[tuple[int, int]] | None = None
+        self.lane_keys: set = set()
+        self.lane_start: int | None = None
+        self.lane_changes: List[dict] = []
+        if any(op["op"] in _LANE_OPS for op in operations):
+            self.lanes = [(int(doc["a"]), int(doc["b"])) for doc in backend.iter_docs("hyperlanes")]
+            self.lane_keys = {frozenset(pair) for pair in self.lanes}
+
+    def star(self, idx: int) -> dict:
+        if idx not in self.stars:
+            raise LookupError(f"Star {idx} not found")
+        return self.stars[idx]
+
+    def touch(self, idx: int, *fields: str) -> None:
+        # An op that sets no fields (an empty ``update_star_meta``) leaves the star untouched.
+        if fields:
+            self.dirty.setdefault(idx, set()).update(fields)
+
+    def bodies(self, idx: int, body_idx: int | None = None) -> list:
+        bodies = self.star(idx).setdefault("bodies", [])
+        if body_idx is not None and not 0 <= body_idx < len(bodies):
+            raise LookupError(f"Body {body_idx} on star {idx} not found")
+        return bodies
+
+    def apply(self, op: dict) -> dict:
+        kind = op["op"]
+        if kind == "update_star_meta":
+            star = self.star(op["idx"])
+            fields = {key: op[key] for key in ("name", "description", "star_type") if op.get(key) is not None}
+            if "star_type" in fields:
+                fields["star_type"] = StarType(fields["star_type"])
+            star.update(fields)
+            self.touch(op["idx"], *fields)
+            return {"ok": True}
+        if kind == "set_admin_level":
+            star = self.star(op["idx"])
+            levels = list(star.get("admin_levels") or [])
+            levels.extend([None] * (op["level"] + 1 - len(levels)))
+            levels[op["level"]] = op["country"]
+            star["admin_levels"] = levels
+            self.touch(op["idx"], "admin_levels")
+            return {"ok": True}
+        if kind == "add_body":
+            bodies = self.bodies(op["idx"])
+            bodies.append(CelestialBody.model_validate(op["body"]).model_dump())
+            self.touch(op["idx"], "bodies")
+            return {"index": len(bodies) - 1}
+        if kind == "update_body":
+            self.bodies(op["idx"], op["body_idx"])[op["body_idx"]] = CelestialBody.model_validate(op["body"]).model_dump()
+            self.touch(op["idx"], "bodies")
+            return {"ok": True}
+        if kind == "delete_body":
+            del self.bodies(op["idx"], op["body_idx"])[op["body_idx"]]
+            self.touch(op["idx"], "bodies")
+            return {"ok": True}
+        if kind == "add_hyperlane":
+            a, b = op["a"], op["b"]
+            if a == b:
+                raise ValueError("Hyperlane endpoints must be different")
+            if not (0 <= a < self.star_count and 0 <= b < self.star_count):
+                raise LookupError("Star index out of range")
+            if frozenset((a, b)) in self.lane_keys:
+                return {"index": next(i for i, pair in enumerate(self.lanes) if set(pair) == {a, b}), "created": False}
+            self._mark_lanes(len(self.lanes))
+            self.lanes.append((a, b))
+            self.lane_keys.add(frozenset((a, b)))
+            self.lane_changes.append({"op": "hyperlane_added", "idx": len(self.lanes) - 1, "a": a, "b": b})
+            return {"index": len(self.lanes) - 1, "created": True}
+        if kind == "delete_hyperlane":
+            idx = op["idx"]
+            if not 0 <= idx < len(self.lanes):
+                raise LookupError(f"Hyperlane {idx} not found")
+            self._mark_lanes(idx)
+            a, b = self.lanes.pop(idx)
+            self.lane_keys.discard(frozenset((a, b)))
+            self.lane_changes.append({"op": "hyperlane_deleted", "idx": idx, "a": a, "b": b})
+            return {"ok": True}
+        raise ValueError(f"Unknown operation {kind!r}")
+
+    def _mark_lanes(self, idx: int) -> None:
+        self.lane_start = idx if self.lane_start is None else min(self.lane_start, idx)
+
+    def star_changes(self) -> List[dict]:
+        changes = []
+        for idx in sorted(self.dirty):
+            doc = self.stars[idx]
+            if "bodies" in self.dirty[idx]:
+                changes.append({"op": "star_updated", "idx": idx, "star": doc})
+            else:
+                fields = {field: doc[field] for field in sorted(self.dirty[idx])}
+                changes.append({"op": "star_fields_updated", "idx": idx, "fields": fields})
+        return changes
+
+
+@_timed
+def apply_batch(operations: Sequence[dict]) -> List[dict]:
+    """Validate and apply an ordered list of edits as a single change.
+
+    Each operation is a dict with an ``op`` of ``update_star_meta``,
+    ``set_admin_level``, ``add_body``, ``update_body``, ``delete_body``,
+    ``add_hyperlane`` or ``delete_hyperlane`` and that op's arguments. Ops see
+    the effects of earlier ops in the list. Every op is checked before
+    anything is written; any failure raises :class:`BatchError` listing
+    ``{"index", "detail"}`` per bad op. Otherwise stars and hyperlanes are each
+    written in one bulk call and one ``batch`` change holding the individual
+    changes is recorded. Returns one result dict per op.
+    """
+    with _write_lock:
+        plan = _BatchPlan(operations)
+        results, errors = [], []
+        for position, op in enumerate(operations):
+            try:
+                results.append(plan.apply(op))
+            except (LookupError, ValueError) as exc:
+                errors.append({"index": position, "detail": str(exc)})
+        if errors:
+            raise BatchError(errors)
+
+        changes = plan.lane_changes + plan.star_changes()
+        if not changes:
+            return results
+        backend = get_backend()
+        backend.update_stars_fields(
+            {
+                change["idx"]: change["fields"] if "fields" in change else change["star"]
+                for change in changes
+                if change["op"].startswith("star")
+            }
+        )
+        if plan.lane_start is not None:
+            backend.replace_hyperlanes_from(plan.lane_start, plan.lanes[plan.lane_start :])
+        _record("batch", changes=changes)
+    return results
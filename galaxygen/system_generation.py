@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, List, Optional, Union
 
 import numpy as np
 
@@ -8,6 +8,7 @@ from .random_names import generate_random_word
 from .types import PlanetType, StarType
 
 if TYPE_CHECKING:
+    from .arrays import GalaxyArrays
     from .models import Galaxy
 
 GRAVITATIONAL_CONSTANT = 6.67430e-11
@@ -68,8 +69,7 @@ def _body_name(body_type: str) -> str:
     return name
 
 
-def _planet_for_star(star_type: StarType, star_idx: int, order: int, galaxy_stars, galaxy_seed: int = 0) -> Optional[dict]:
-    star = galaxy_stars[star_idx]
+def _planet_for_star(star_type: StarType, star, order: int, galaxy_seed: int = 0) -> Optional[dict]:
     if star[0] < 0 or star[1] < 0:
         return None
     rng = _rng_for_star(star, order, galaxy_seed)
@@ -140,7 +140,7 @@ def _planet_for_star(star_type: StarType, star_idx: int, order: int, galaxy_star
     }
 
 
-def generate_system_profile(galaxy: Galaxy, star_idx: int, galaxy_seed: int = 0) -> Optional[dict]:
+def generate_system_profile(galaxy: Union[Galaxy, GalaxyArrays], star_idx: int, galaxy_seed: int = 0) -> Optional[dict]:
     if star_idx < 0 or star_idx >= len(galaxy.stars):
         return None
     star_coord = galaxy.stars[star_idx].as_tuple()
@@ -154,7 +154,7 @@ def generate_system_profile(galaxy: Galaxy, star_idx: int, galaxy_seed: int = 0)
     max_bodies = int(rng.integers(5, 10))
     bodies: List[dict] = []
     for order in range(max_bodies):
-        body = _planet_for_star(classification, star_idx, order, [s.as_tuple() for s in galaxy.stars], galaxy_seed)
+        body = _planet_for_star(classification, star_coord, order, galaxy_seed)
         if body:
             body["name"] = _body_name(body["type"])
             bodies.append(body)
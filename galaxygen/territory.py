@@ -0,0 +1,282 @@
+"""Territory borders and neighbouring countries from the stars' Voronoi cells.
+
+A country's territory is the union of its stars' Voronoi cells, so its
+borders are exactly the Voronoi ridges between two stars with different
+owners. :class:`Territory` runs the Voronoi diagram once per set of star
+positions and keeps its ridges: the pair of stars each separates
+(``ridge_points``) and the segment's two ends, with ridges running off to
+infinity cut at the galaxy bounds. Ownership changes only re-select ridges
+with a couple of array comparisons; they never rerun the diagram.
+
+Border segments are joined into polylines per pair of owners and returned in
+a compact :class:`Borders` layout: one flat coordinate array plus offsets,
+as the geometry blob does.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+from scipy.spatial import QhullError, Voronoi
+
+from .ownership import ADMIN_LEVELS, UNOWNED, admin_row
+
+
+class Borders(NamedTuple):
+    """Border polylines between owners at one admin level.
+
+    Polyline ``i`` is ``points[offsets[i]:offsets[i + 1]]`` and separates
+    ``pairs[i] = (a, b)`` with ``a < b``; ``a`` is ``UNOWNED`` for the edge
+    of a country facing unclaimed space.
+    """
+
+    points: np.ndarray  # (p, 2) float
+    offsets: np.ndarray  # (polylines + 1,) int
+    pairs: np.ndarray  # (polylines, 2) int
+    lengths: np.ndarray  # (polylines,) float
+
+
+def _clip(starts: np.ndarray, ends: np.ndarray, bounds: Tuple[float, float, float, float]):
+    """Liang-Barsky clipping of segments to ``(x0, y0, x1, y1)``; returns ``keep, t0, t1``."""
+    x0, y0, x1, y1 = bounds
+    delta = ends - starts
+    p = np.stack([-delta[:, 0], delta[:, 0], -delta[:, 1], delta[:, 1]], axis=1)
+    q = np.stack([starts[:, 0] - x0, x1 - starts[:, 0], starts[:, 1] - y0, y1 - starts[:, 1]], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = q / p
+    t0 = np.max(np.where(p < 0, ratio, 0.0), axis=1)
+    t1 = np.min(np.where(p > 0, ratio, 1.0), axis=1)
+    parallel_outside = ((p == 0) & (q < 0)).any(axis=1)
+    return (t0 <= t1) & ~parallel_outside, t0, t1
+
+
+class Territory:
+    """Voronoi ridges of a star layout, and borders and neighbours per admin level."""
+
+    def __init__(self, positions: np.ndarray, levels: np.ndarray, width: int = 0, height: int = 0) -> None:
+        self._lock = threading.Lock()
+        self.positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        self.levels = np.asarray(levels, dtype=np.int64).reshape(-1, ADMIN_LEVELS).copy()
+        self._borders: Dict[int, Borders] = {}
+        self._build_ridges(width, height)
+
+    def _build_ridges(self, width: int, height: int) -> None:
+        points = self.positions
+        if len(points):
+            low, high = points.min(axis=0), points.max(axis=0)
+            self.bounds = (
+                min(0.0, low[0]),
+                min(0.0, low[1]),
+                max(float(width), high[0]),
+                max(float(height), high[1]),
+            )
+        else:
+            self.bounds = (0.0, 0.0, float(width), float(height))
+        self.ridge_points = np.zeros((0, 2), dtype=np.int64)
+        self._starts = np.zeros((0, 2))
+        self._ends = np.zeros((0, 2))
+        self._start_ids = np.zeros(0, dtype=np.int64)
+        self._end_ids = np.zeros(0, dtype=np.int64)
+        if len(points) < 2:
+            return
+        if np.linalg.matrix_rank(points - points.mean(axis=0)) < 2:
+            # Qhull needs a 2-d layout; stars on one line are split by the
+            # perpendicular bisectors between neighbours along that line.
+            self._build_line_ridges()
+            return
+        try:
+            voronoi = Voronoi(points)
+        except QhullError:
+            # Duplicate stars; joggling the input still gives usable ridges
+            # between the distinct ones.
+            try:
+                voronoi = Voronoi(points, qhull_options="QJ")
+            except QhullError:
+                return
+
+        ridge_points = np.asarray(voronoi.ridge_points, dtype=np.int64)
+        ridge_vertices = np.asarray(voronoi.ridge_vertices, dtype=np.int64)
+        vertices = voronoi.vertices
+        # Every ridge keeps at least one finite end; put it first.
+        infinite = ridge_vertices[:, 0] < 0
+        ridge_vertices[infinite] = ridge_vertices[infinite][:, ::-1]
+        infinite = ridge_vertices[:, 1] < 0
+        starts = vertices[ridge_vertices[:, 0]]
+        ends = vertices[np.maximum(ridge_vertices[:, 1], 0)].copy()
+
+        # An infinite ridge runs from its finite vertex along the bisector of
+        # its two stars, away from the stars' centre (as in voronoi_plot_2d).
+        a, b = points[ridge_points[infinite, 0]], points[ridge_points[infinite, 1]]
+        tangent = b - a
+        tangent /= np.maximum(np.linalg.norm(tangent, axis=1, keepdims=True), 1e-12)
+        normal = np.stack([-tangent[:, 1], tangent[:, 0]], axis=1)
+        midpoint = (a + b) / 2
+        direction = np.sign(np.einsum("ij,ij->i", midpoint - points.mean(axis=0), normal))[:, None] * normal
+        x0, y0, x1, y1 = self.bounds
+        reach = 2 * ((x1 - x0) + (y1 - y0) + 1)
+        ends[infinite] = starts[infinite] + direction * reach
+
+        keep, t0, t1 = _clip(starts, ends, self.bounds)
+        delta = ends - starts
+        self.ridge_points = ridge_points[keep]
+        self._starts = (starts + t0[:, None] * delta)[keep]
+        self._ends = (starts + t1[:, None] * delta)[keep]
+        # Ends are joined into polylines by id. A clipped or infinite end is a
+        # point of its own, not the Voronoi vertex it was cut from.
+        unique = len(vertices) + 2 * np.arange(len(ridge_points))
+        start_ids = np.where(t0 > 0, unique, ridge_vertices[:, 0])
+        end_ids = np.where(infinite | (t1 < 1), unique + 1, ridge_vertices[:, 1])
+        self._start_ids = start_ids[keep]
+        self._end_ids = end_ids[keep]
+
+    def _build_line_ridges(self) -> None:
+        points = self.positions
+        centred = points - points.mean(axis=0)
+        # The line's direction is the main singular vector; all-equal stars
+        # have no extent and nothing to separate.
+        _, singular, axes = np.linalg.svd(centred, full_matrices=False)
+        if singular[0] <= 1e-12:
+            return
+        tangent = axes[0]
+        along = centred @ tangent
+        order = np.argsort(along, kind="stable")
+        # Stars at the same spot along the line share a cell; skip those pairs.
+        distinct = np.diff(along[order]) > 1e-9
+        ridge_points = np.stack([order[:-1], order[1:]], axis=1)[distinct]
+        midpoint = (points[ridge_points[:, 0]] + points[ridge_points[:, 1]]) / 2
+        normal = np.array([-tangent[1], tangent[0]])
+        x0, y0, x1, y1 = self.bounds
+        reach = 2 * ((x1 - x0) + (y1 - y0) + 1)
+        starts, ends = midpoint - normal * reach, midpoint + normal * reach
+
+        keep, t0, t1 = _clip(starts, ends, self.bounds)
+        delta = ends - starts
+        self.ridge_points = ridge_points[keep]
+        self._starts = (starts + t0[:, None] * delta)[keep]
+        self._ends = (starts + t1[:, None] * delta)[keep]
+        # Parallel bisectors never meet, so every ridge is a polyline of its own.
+        ids = 2 * np.arange(len(self.ridge_points), dtype=np.int64)
+        self._start_ids, self._end_ids = ids, ids + 1
+
+    # -- queries ------------------------------------------------------------
+
+    def _ridge_owners(self, level: int) -> Tuple[np.ndarray, np.ndarray]:
+        owners = self.levels[:, level][self.ridge_points]
+        return owners.min(axis=1), owners.max(axis=1)
+
+    def borders(self, level: int = 0) -> Borders:
+        with self._lock:
+            if level not in self._borders:
+                self._borders[level] = self._trace(level)
+            return self._borders[level]
+
+    def _trace(self, level: int) -> Borders:
+        low, high = self._ridge_owners(level)
+        border = np.flatnonzero((low != high) & (high != UNOWNED))
+        order = border[np.lexsort((high[border], low[border]))]
+        coordinates: Dict[int, np.ndarray] = {}
+        points: List[np.ndarray] = []
+        offsets, pairs = [0], []
+        groups = np.flatnonzero(np.diff(low[order]) | np.diff(high[order])) + 1
+        for group in np.split(order, groups):
+            if not len(group):
+                continue
+            starts, ends = self._start_ids[group].tolist(), self._end_ids[group].tolist()
+            for idx, ridge in enumerate(group.tolist()):
+                coordinates[starts[idx]] = self._starts[ridge]
+                coordinates[ends[idx]] = self._ends[ridge]
+            for line in _chain(starts, ends):
+                points.append(np.array([coordinates[point] for point in line]))
+                offsets.append(offsets[-1] + len(line))
+                pairs.append((int(low[group[0]]), int(high[group[0]])))
+        flat = np.concatenate(points) if points else np.zeros((0, 2))
+        offsets = np.array(offsets, dtype=np.int64)
+        segment = np.linalg.norm(np.diff(flat, axis=0), axis=1) if len(flat) > 1 else np.zeros(0)
+        # Sum segment lengths per polyline, skipping the jumps between polylines.
+        cumulative = np.concatenate([[0.0], np.cumsum(segment)])
+        lengths = cumulative[offsets[1:] - 1] - cumulative[offsets[:-1]]
+        return Borders(flat, offsets, np.array(pairs, dtype=np.int64).reshape(-1, 2), lengths)
+
+    def neighbors(self, level: int = 0) -> Dict[int, List[int]]:
+        """Owned countries sharing a border with each owned country."""
+        low, high = self._ridge_owners(level)
+        touching = (low != high) & (low != UNOWNED)
+        pairs = np.unique(np.stack([low[touching], high[touching]], axis=1), axis=0)
+        result: Dict[int, List[int]] = {
+            int(country): [] for country in np.unique(self.levels[:, level]) if country != UNOWNED
+        }
+        for a, b in pairs.tolist():
+            result[a].append(b)
+            result[b].append(a)
+        return {country: sorted(others) for country, others in result.items()}
+
+    def border_lengths(self, level: int = 0) -> Dict[int, float]:
+        """Total border length of each owned country, including edges facing unclaimed space."""
+        borders = self.borders(level)
+        owned = self.levels[:, level]
+        totals: Dict[int, float] = {int(country): 0.0 for country in np.unique(owned) if country != UNOWNED}
+        for (a, b), length in zip(borders.pairs.tolist(), borders.lengths.tolist()):
+            for country in (a, b):
+                if country != UNOWNED:
+                    totals[country] += length
+        return totals
+
+    # -- incremental updates --------------------------------------------------
+
+    def apply_change(self, change: dict) -> bool:
+        """Follow ownership edits; moved, added or removed stars need a new diagram (False)."""
+        with self._lock:
+            return self._apply(change)
+
+    def _apply(self, change: dict) -> bool:
+        op = change.get("op")
+        if op == "batch":
+            return all(self._apply(sub) for sub in change["changes"])
+        if op in ("star_updated", "star_fields_updated"):
+            idx = change["idx"]
+            if not 0 <= idx < len(self.positions):
+                return False
+            doc = change["star"] if op == "star_updated" else change["fields"]
+            x, y = self.positions[idx]
+            if doc.get("x", x) != x or doc.get("y", y) != y:
+                return False
+            if "admin_levels" in doc:
+                row = admin_row(doc["admin_levels"])
+                changed = [level for level in range(ADMIN_LEVELS) if row[level] != self.levels[idx, level]]
+                self.levels[idx] = row
+                for level in changed:
+                    self._borders.pop(level, None)
+            return True
+        return op in (
+            "hyperlane_added",
+            "hyperlane_deleted",
+            "countries_replaced",
+            "resource_definitions_replaced",
+        )
+
+
+def _chain(starts: List[int], ends: List[int]) -> List[List[int]]:
+    """Join segments ``starts[i] - ends[i]`` into as few polylines as possible."""
+    incident: Dict[int, List[int]] = defaultdict(list)
+    for segment, (a, b) in enumerate(zip(starts, ends)):
+        incident[a].append(segment)
+        incident[b].append(segment)
+    used = [False] * len(starts)
+    # Open chains start at odd-degree points; closed loops anywhere.
+    seeds = [point for point, segments in incident.items() if len(segments) % 2] + list(incident)
+    lines = []
+    for seed in seeds:
+        point, line = seed, [seed]
+        while True:
+            following = next((s for s in incident[point] if not used[s]), None)
+            if following is None:
+                break
+            used[following] = True
+            point = ends[following] if starts[following] == point else starts[following]
+            line.append(point)
+        if len(line) > 1:
+            lines.append(line)
+    return lines
@@ -13,8 +13,17 @@ class StarType(str, Enum):
     M = "M"
 
 
+# Stable integer codes used by the array and binary encodings; append only.
+STAR_TYPE_CODES = {star_type: code for code, star_type in enumerate(StarType)}
+
+
+def star_type_code(value) -> int:
+    """``STAR_TYPE_CODES`` entry for a :class:`StarType` or its string value."""
+    return STAR_TYPE_CODES[StarType(value)]
+
+
 class PlanetType(str, Enum):
     TERRESTRIAL = "terrestrial"
     GAS_GIANT = "gas_giant"
     ICE_GIANT = "ice_giant"
-    ASTEROID_BELT = "asteroid_belt"
\ No newline at end of file
+    ASTEROID_BELT = "asteroid_belt"
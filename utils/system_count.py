@@ -1,39 +1,41 @@
-import numpy as np
-import json, codecs
-import random
 import time
 
-# Region Defs define the systems of each region ('ownership' or 'resources' from the galaxy json)
-def get_region_sys_counts(region_defs):
-    out_dict = {}
-    for region in region_defs:
-        out_dict[int(region['id'])] = len(region['systems'])
-    return out_dict
+from galaxygen.stats import GalaxyStats
+from galaxygen.storage import (
+    get_galaxy_meta,
+    iter_resources,
+    iter_stars,
+    load_country_definitions,
+    load_resource_definitions,
+)
 
 if __name__ == "__main__":
     start_time = time.time()
 
-    galaxy = json.load(open("galaxy.json"))
-    
-    resources = json.load(open("resources.json"))
-    resource_systems = 0
+    meta = get_galaxy_meta()
+    stats = GalaxyStats.from_star_docs(
+        int(meta.get("width", 0)),
+        int(meta.get("height", 0)),
+        iter_stars(fields=("x", "y", "star_type", "admin_levels", "bodies")),
+        iter_resources(),
+    ).summary()
+
+    resources = load_resource_definitions()
     print("-- RESOURCES --")
-    for k, v in get_region_sys_counts(galaxy['resources']).items():
-        print(f"{resources[k]['name']}: {v} systems")
-        resource_systems += v
+    for region in stats["resources"]:
+        name = resources[region["id"]].name if region["id"] < len(resources) else region["id"]
+        print(f"{name}: {region['systems']} systems")
 
-    countries = json.load(open("countries.json"))
-    country_systems = 0
+    countries = load_country_definitions()
     print()
     print("-- COUNTRIES --")
-    for k, v in get_region_sys_counts(galaxy['ownership']).items():
-        print(f"{countries[k]['name']}: {v} systems")
-        country_systems += v
+    for country in stats["countries"]:
+        name = countries[country["id"]].name if country["id"] < len(countries) else country["id"]
+        print(f"{name}: {country['systems']} systems")
 
-    
     print()
-    print(f"Total Stars: {len(galaxy['stars'])}")
-    print(f"Total Stars Occupied: {country_systems}")
-    print(f"Total Stars w/ Resources: {resource_systems}")
+    print(f"Total Stars: {stats['stars']}")
+    print(f"Total Stars Occupied: {stats['owned']}")
+    print(f"Total Stars w/ Resources: {stats['with_resources']}")
     print()
-    print("--- %s seconds ---" % (time.time() - start_time))
\ No newline at end of file
+    print("--- %s seconds ---" % (time.time() - start_time))